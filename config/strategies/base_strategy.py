@@ -1,8 +1,9 @@
 # config/strategies/base_strategy.py
 import math
-import random
 from src import constants
 
+# Mayor valor que puede tener un recurso (cota para cortar las búsquedas)
+MAX_RESOURCE_VALUE = max(constants.POINTS_PERSON, *constants.MERCH_POINTS.values())
 
 class BaseStrategy:
     """
@@ -24,22 +25,9 @@ class BaseStrategy:
     def find_nearest_resource(self, vehicle, world, allowed_types):
         """
         Retorna el recurso más cercano (en celdas) que el vehículo puede recoger.
-        Usa distancia Manhattan (grid).
+        Usa distancia Manhattan (grid) y el índice espacial del mundo.
         """
-        min_dist = float("inf")
-        best_resource = None
-        for res in world.resources:
-            if res.type in allowed_types:
-                # Convertir la posición de píxeles del recurso a celda
-                res_gx, res_gy = world.pixel_to_cell(res.x, res.y)
-                
-                # Calcular distancia Manhattan (en celdas)
-                dist = abs(vehicle.gx - res_gx) + abs(vehicle.gy - res_gy)
-                
-                if dist < min_dist:
-                    min_dist = dist
-                    best_resource = res
-        return best_resource
+        return world.nearest_resource(vehicle.gx, vehicle.gy, allowed_types)
 
     def find_high_value_resource(self, vehicle, world, allowed_types, min_value=10):
         """
@@ -48,36 +36,38 @@ class BaseStrategy:
         """
         best_resource = None
         best_score = -float("inf")
-        for res in world.resources:
-            if res.type in allowed_types and res.value >= min_value:
-                value = res.value
-                
-                res_gx, res_gy = world.pixel_to_cell(res.x, res.y)
-                dist = abs(vehicle.gx - res_gx) + abs(vehicle.gy - res_gy)
-                
-                # Puntuación: valor/(distancia_celdas+1)
-                score = value / (1 + dist * 0.5) # Ajustamos el peso de la distancia
-                
-                if score > best_score:
-                    best_score = score
-                    best_resource = res
+        candidates = world.resources_by_distance(vehicle.gx, vehicle.gy, allowed_types,
+                                                 where=lambda r: r.value >= min_value)
+        for dist, res in candidates:
+            # Los recursos llegan ordenados por distancia: si ni el de mayor
+            # valor posible puede superar la mejor puntuación, cortamos
+            if MAX_RESOURCE_VALUE / (1 + dist * 0.5) <= best_score:
+                break
+
+            # Puntuación: valor/(distancia_celdas+1)
+            score = res.value / (1 + dist * 0.5) # Ajustamos el peso de la distancia
+            
+            if score > best_score:
+                best_score = score
+                best_resource = res
         return best_resource
 
+    def find_nearest_safe_resource(self, vehicle, world, allowed_types, margin=2):
+        """
+        Retorna el recurso más cercano que no tiene ninguna mina activa a
+        'margin' celdas o menos (distancia Manhattan).
+        """
+        for _, res in world.resources_by_distance(vehicle.gx, vehicle.gy, allowed_types):
+            if not world.active_mines_within(res.gx, res.gy, margin):
+                return res
+        return None
+
     def nearest_mine_distance(self, vehicle, world):
         """
         Retorna la distancia (en celdas) a la mina activa más cercana.
         """
-        min_dist = float("inf")
-        for mine in world.mines:
-            if not mine.active:
-                continue
-            
-            mine_gx, mine_gy = world.pixel_to_cell(mine.x, mine.y)
-            dist = abs(vehicle.gx - mine_gx) + abs(vehicle.gy - mine_gy)
-            
-            if dist < min_dist:
-                min_dist = dist
-        return min_dist
+        found = world.nearest_mine(vehicle.gx, vehicle.gy)
+        return found[0] if found else float("inf")
 
     def is_near_mine(self, vehicle, world, safety_margin=15):
 
@@ -92,34 +82,20 @@ class BaseStrategy:
         """
         Retorna la mina activa más cercana.
         """
-        min_dist = float("inf")
-        best_mine = None
-        for mine in world.mines:
-            if mine.active:
-                mine_gx, mine_gy = world.pixel_to_cell(mine.x, mine.y)
-                dist = abs(vehicle.gx - mine_gx) + abs(vehicle.gy - mine_gy)
-                if dist < min_dist:
-                    min_dist = dist
-                    best_mine = mine
-        return best_mine
+        found = world.nearest_mine(vehicle.gx, vehicle.gy)
+        return found[1] if found else None
 
     def random_exploration(self, world):
         """
         Devuelve una coordenada de CELDA (gx, gy) aleatoria válida para exploración.
         """
-        grid_height = len(world.grid)
-        grid_width = len(world.grid[0])
-        
-        for _ in range(100): # Intentar 100 veces
-            gx = random.randint(0, grid_width - 1)
-            gy = random.randint(0, grid_height - 1)
-            
-            # Usamos el is_walkable del A* y comprobamos que no sea base
-            if world.is_walkable(gx, gy) and not world.is_in_base_area(gx, gy):
-                return (gx, gy)
+        # El mundo mantiene las celdas libres fuera de las bases
+        cell = world.random_free_cell()
+        if cell is not None:
+            return cell
                 
         # Fallback: celda central
-        return (grid_width // 2, grid_height // 2)
+        return (len(world.grid[0]) // 2, len(world.grid) // 2)
 
     def should_return_to_base(self, vehicle):
         """
@@ -75,25 +75,8 @@ class MotoStrategy(BaseStrategy):
                 return {"type": "collect", "target": resource}
             else:
                 # Buscar otra persona más segura
-                safe_resources = []
-                for res in world.resources:
-                    if res.type == "person":
-                        dist_to_mine = float("inf")
-                        res_gx, res_gy = world.pixel_to_cell(res.x, res.y)
-                        
-                        for mine in world.mines:
-                            if mine.active:
-                                mine_gx, mine_gy = world.pixel_to_cell(mine.x, mine.y)
-                                d = abs(res_gx - mine_gx) + abs(res_gy - mine_gy)
-                                dist_to_mine = min(dist_to_mine, d)
-                        
-                        if dist_to_mine > 2: 
-                            safe_resources.append(res)
-                
-                if safe_resources:
-                    nearest = min(safe_resources, key=lambda r: 
-                                  abs(vehicle.gx - world.pixel_to_cell(r.x, r.y)[0]) + 
-                                  abs(vehicle.gy - world.pixel_to_cell(r.x, r.y)[1]))
+                nearest = self.find_nearest_safe_resource(vehicle, world, ["person"])
+                if nearest:
                     return {"type": "collect", "target": nearest}
 
         # PRIORIDAD 4: Exploración rápida (SIEMPRE devuelve acción)
@@ -168,7 +151,7 @@ class AutoStrategy(BaseStrategy):
         # PRIORIDAD 3: Buscar personas primero
         person = self.find_nearest_resource(vehicle, world, ["person"])
         if person:
-            person_gx, person_gy = world.pixel_to_cell(person.x, person.y)
+            person_gx, person_gy = person.gx, person.gy
             dist = abs(vehicle.gx - person_gx) + abs(vehicle.gy - person_gy)
             
             if dist < 5: 
@@ -177,7 +160,7 @@ class AutoStrategy(BaseStrategy):
         # PRIORIDAD 4: Buscar medicamentos
         medicine = self.find_nearest_resource(vehicle, world, ["medicine"])
         if medicine:
-            med_gx, med_gy = world.pixel_to_cell(medicine.x, medicine.y)
+            med_gx, med_gy = medicine.gx, medicine.gy
             dist = abs(vehicle.gx - med_gx) + abs(vehicle.gy - med_gy)
             
             if dist < 4: 
@@ -24,7 +24,7 @@ class AggressiveJeepStrategy(BaseStrategy):
         if KAMIKAZE_MODE:
             mine = self.find_nearest_mine(vehicle, world)
             if mine:
-                mine_gx, mine_gy = world.pixel_to_cell(mine.x, mine.y)
+                mine_gx, mine_gy = mine.gx, mine.gy
                 return {"type": "move", "target": (mine_gx, mine_gy)}
 
         # PRIORIDAD 1: Evasión de minas
@@ -81,7 +81,7 @@ class FastMotoStrategy(BaseStrategy):
         if KAMIKAZE_MODE:
             mine = self.find_nearest_mine(vehicle, world)
             if mine:
-                mine_gx, mine_gy = world.pixel_to_cell(mine.x, mine.y)
+                mine_gx, mine_gy = mine.gx, mine.gy
                 return {"type": "move", "target": (mine_gx, mine_gy)}
 
         # PRIORIDAD 1: Evasión de minas
@@ -117,30 +117,13 @@ class FastMotoStrategy(BaseStrategy):
                     escape_y = vehicle.y + (dy / dist_px) * escape_dist
 
                     escape_gx, escape_gy = world.pixel_to_cell(escape_x, escape_y)
-                    escape_gx = max(0, min(escape_gx, constants.GRID_WIDTH - 1)) 
-                    escape_gy = max(0, min(escape_gy, constants.GRID_HEIGHT - 1))
+                    escape_gx = max(0, min(escape_gx, world.grid_width - 1)) 
+                    escape_gy = max(0, min(escape_gy, world.grid_height - 1))
                     return {"type": "move", "target": (escape_gx, escape_gy)}
 
         # PRIORIDAD 4: Buscar persona más cercana en zona segura
-        safe_people = []
-        for res in world.resources:
-            if res.type == "person":
-                safe = True
-                res_gx, res_gy = world.pixel_to_cell(res.x, res.y)
-                for mine in world.mines:
-                    if mine.active:
-                        mine_gx, mine_gy = world.pixel_to_cell(mine.x, mine.y)
-                        dist_m = abs(res_gx - mine_gx) + abs(res_gy - mine_gy)
-                        if dist_m <= 2: 
-                            safe = False
-                            break
-                if safe:
-                    safe_people.append(res)
-        
-        if safe_people:
-            nearest = min(safe_people, key=lambda r: 
-                          abs(vehicle.gx - world.pixel_to_cell(r.x, r.y)[0]) + 
-                          abs(vehicle.gy - world.pixel_to_cell(r.x, r.y)[1]))
+        nearest = self.find_nearest_safe_resource(vehicle, world, ["person"])
+        if nearest:
             return {"type": "collect", "target": nearest}
 
         # PRIORIDAD 5: Exploración rápida (SIEMPRE devuelve acción)
@@ -156,7 +139,7 @@ class SupportCamionStrategy(BaseStrategy):
         if KAMIKAZE_MODE:
             mine = self.find_nearest_mine(vehicle, world)
             if mine:
-                mine_gx, mine_gy = world.pixel_to_cell(mine.x, mine.y)
+                mine_gx, mine_gy = mine.gx, mine.gy
                 return {"type": "move", "target": (mine_gx, mine_gy)}
 
         # PRIORIDAD 1: Evasión de minas
@@ -190,24 +173,8 @@ class SupportCamionStrategy(BaseStrategy):
                 return {"type": "collect", "target": resource}
 
         # PRIORIDAD 4: Recolectar recursos seguros
-        safe_resources = []
-        for res in world.resources:
-            if res.type in vehicle.allowed_cargo:
-                dist_to_mine = float("inf")
-                res_gx, res_gy = world.pixel_to_cell(res.x, res.y)
-                for mine in world.mines:
-                    if mine.active:
-                        mine_gx, mine_gy = world.pixel_to_cell(mine.x, mine.y)
-                        d = abs(res_gx - mine_gx) + abs(res_gy - mine_gy)
-                        dist_to_mine = min(dist_to_mine, d)
-                
-                if dist_to_mine > 2: 
-                    safe_resources.append(res)
-        
-        if safe_resources:
-            nearest = min(safe_resources, key=lambda r: 
-                          abs(vehicle.gx - world.pixel_to_cell(r.x, r.y)[0]) + 
-                          abs(vehicle.gy - world.pixel_to_cell(r.x, r.y)[1]))
+        nearest = self.find_nearest_safe_resource(vehicle, world, vehicle.allowed_cargo)
+        if nearest:
             return {"type": "collect", "target": nearest}
 
         # PRIORIDAD 5: Exploración (SIEMPRE devuelve acción)
@@ -223,7 +190,7 @@ class BalancedAutoStrategy(BaseStrategy):
         if KAMIKAZE_MODE:
             mine = self.find_nearest_mine(vehicle, world)
             if mine:
-                mine_gx, mine_gy = world.pixel_to_cell(mine.x, mine.y)
+                mine_gx, mine_gy = mine.gx, mine.gy
                 return {"type": "move", "target": (mine_gx, mine_gy)}
 
         # PRIORIDAD 1: Evasión de minas
@@ -259,14 +226,14 @@ class BalancedAutoStrategy(BaseStrategy):
                     escape_y = vehicle.y + (dy / dist_px) * escape_dist
 
                     escape_gx, escape_gy = world.pixel_to_cell(escape_x, escape_y)
-                    escape_gx = max(0, min(escape_gx, constants.GRID_WIDTH - 1))
-                    escape_gy = max(0, min(escape_gy, constants.GRID_HEIGHT - 1))
+                    escape_gx = max(0, min(escape_gx, world.grid_width - 1))
+                    escape_gy = max(0, min(escape_gy, world.grid_height - 1))
                     return {"type": "move", "target": (escape_gx, escape_gy)}
 
         # PRIORIDAD 4: Buscar personas
         person = self.find_nearest_resource(vehicle, world, ["person"])
         if person:
-            person_gx, person_gy = world.pixel_to_cell(person.x, person.y)
+            person_gx, person_gy = person.gx, person.gy
             dist_to_person = abs(vehicle.gx - person_gx) + abs(vehicle.gy - person_gy)
             if dist_to_person < 5:
                 return {"type": "collect", "target": person}
@@ -275,7 +242,7 @@ class BalancedAutoStrategy(BaseStrategy):
         # PRIORIDAD 5: Buscar medicamentos
         medicine = self.find_nearest_resource(vehicle, world, ["medicine"])
         if medicine:
-            med_gx, med_gy = world.pixel_to_cell(medicine.x, medicine.y)
+            med_gx, med_gy = medicine.gx, medicine.gy
             dist_to_med = abs(vehicle.gx - med_gx) + abs(vehicle.gy - med_gy)
             if dist_to_med < 4:
                 return {"type": "collect", "target": medicine}
@@ -3,8 +3,24 @@ import pygame
 from . import constants
 from . import pathfinding
 
+# Sprites ya dibujados: (tipo, color, tamaño) -> Surface compartida por todos
+# los vehículos iguales (las reconstrucciones de flota al cargar o al moverse
+# por un replay no vuelven a dibujarlos)
+_SPRITE_CACHE = {}
+
 
 class Vehicle:
+    # Atributos fijos (sin __dict__): menos memoria por vehículo y acceso más rápido
+    __slots__ = (
+        "id", "gx", "gy", "x", "y", "target_pixel_x", "target_pixel_y",
+        "speed_pixels_per_update", "current_target_cell", "vehicle_type",
+        "base_pixel_pos", "base_gx", "base_gy", "base_target_cell", "base_radius_grid",
+        "trips_left", "max_trips", "allowed_cargo", "cargo_mask", "cargo", "color",
+        "alive", "target", "strategy", "path", "score", "returning_to_base", "at_base",
+        "forced_return", "wait_timer", "evasion_timer", "replanner", "reservation_key",
+        "awaiting_path", "size", "image",
+    )
+
     def __init__(self, id, gx, gy, base_position, vehicle_type, max_trips, allowed_cargo, color):
         self.id = id
         self.gx = gx
@@ -29,6 +45,8 @@ class Vehicle:
         self.trips_left = max_trips
         self.max_trips = max_trips
         self.allowed_cargo = allowed_cargo
+        # Máscara de bits de los códigos de tipo que puede cargar (RESOURCE_CODES)
+        self.cargo_mask = sum(1 << constants.RESOURCE_CODES[t] for t in allowed_cargo)
         self.cargo = []
         self.color = color
         self.alive = True
@@ -42,14 +60,25 @@ class Vehicle:
         
         self.wait_timer = 0 # Temporizador para esperar si el camino está bloqueado
         self.evasion_timer = 0 # Temporizador para forzar un estado de evasión
+        self.replanner = None # D* Lite hacia el destino actual (se reutiliza entre bloqueos)
+        self.reservation_key = None # Última ruta reservada (slot, celdas)
+        self.awaiting_path = False # Pidió un camino al planificador en lote del tick
         
         self.size = self._get_vehicle_size()
-        self.image = self._create_beautiful_sprite()
+        self.image = self._get_sprite()
            
     def _get_vehicle_size(self):
         """Tamaño según tipo de vehículo (en píxeles, basado en TILE)"""
         return int(constants.VEHICLE_SIZES.get(self.vehicle_type, 0.85 * constants.TILE))
     
+    def _get_sprite(self):
+        """Sprite del vehículo, dibujado una sola vez por (tipo, color, tamaño)."""
+        key = (self.vehicle_type, tuple(self.color), self.size)
+        sprite = _SPRITE_CACHE.get(key)
+        if sprite is None:
+            sprite = _SPRITE_CACHE[key] = self._create_beautiful_sprite()
+        return sprite
+
     def _create_beautiful_sprite(self):
         """Crea sprites hermosos estilo vista superior"""
         surface = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
@@ -296,6 +325,7 @@ class Vehicle:
             if self.current_target_cell:
                 self.gx, self.gy = self.current_target_cell
                 self.current_target_cell = None
+                world.track_vehicle(self)
             
             # Intentar recolectar (¡esto es un evento lógico!)
             self.try_collect_at_current_cell(world)
@@ -330,27 +360,43 @@ class Vehicle:
                         self.set_path_to_base(world)
             
             # Siempre intentar tomar una decisión si no tenemos path
-            if not self.path and not self.forced_return and not self.returning_to_base and self.evasion_timer == 0:
+            if (not self.path and not self.awaiting_path and not self.forced_return
+                    and not self.returning_to_base and self.evasion_timer == 0):
                 if self.strategy:
                     action = self.strategy.decide(self, world)
                     self.execute_action(action, world)
-                    if self.path:
+                    if self.path or self.awaiting_path:
                         self.at_base = False
             
             # --- Lógica de Movimiento (Si la lógica anterior generó un 'path') ---
+            if self.path and self.path[0] == (self.gx, self.gy):
+                # Espera planificada por la tabla de reservas (un slot)
+                self.path.pop(0)
+                self.wait_timer = constants.RESERVATION_STEP_FRAMES
+                self.reserve_route(world)
+                return True
+
             if self.path:
                 (next_gx, next_gy) = self.path[0] 
                 
-                if self.is_cell_safe(next_gx, next_gy, world):
+                safe = self.is_cell_safe(next_gx, next_gy, world)
+                if not safe and self.replan_around_allies(world):
+                    # Se encontró un desvío corto sin repetir toda la búsqueda
+                    (next_gx, next_gy) = self.path[0]
+                    safe = True
+
+                if safe:
                     (next_gx, next_gy) = self.path.pop(0) 
                     self.current_target_cell = (next_gx, next_gy)
+                    world.track_vehicle(self)
                     self.target_pixel_x = next_gx * constants.TILE + constants.TILE // 2
                     self.target_pixel_y = next_gy * constants.TILE + constants.TILE // 2
                 else:
                     # 🔧 Si la celda no es segura, ESPERAR en lugar de borrar la ruta.
                     self.wait_timer = 5 # Espera 5 ticks lógicos
                     self.path.clear() # Borramos la ruta para forzar un recalculo DESPUÉS de esperar
-            
+
+            self.reserve_route(world)
             return True # Fue un tick LÓGICO (tomamos decisiones o esperamos)
 
         # 2. ¿Nos estamos moviendo? (Interpolación visual)
@@ -372,63 +418,120 @@ class Vehicle:
     def is_cell_safe(self, gx, gy, world):
         """
         Comprueba si la celda es segura contra OBSTÁCULOS ESTÁTICOS (minas/árboles)
-        Y contra ALIADOS (tanto su posición actual como la celda a la que se dirigen).
+        Y contra ALIADOS (tanto su posición actual como la celda a la que se dirigen,
+        que cada aliado mantiene reservadas en la tabla de su equipo).
         """
         # 1. ¿Está en el mapa?
-        if not (0 <= gx < constants.GRID_WIDTH and 0 <= gy < constants.GRID_HEIGHT):
+        if not (0 <= gx < world.grid_width and 0 <= gy < world.grid_height):
             return False
 
         # 2. ¿Hay un obstáculo (árbol)?
-        if world.grid[gy][gx] == 1: # 1 = Árbol
+        if world.grid[gy, gx] == 1: # 1 = Árbol
              return False
                 
         # 3. ¿Hay una mina?
         # if self.check_mine_collision(gx, gy, world):
         #      return False
         
-        # 4. ¿Hay un ALIADO ocupando esa celda?
-        for v in world.vehicles:
-            if v is self or not v.alive:
-                continue
-            
-            # Solo nos importan los aliados (mismo color)
-            if v.color == self.color:
-                
-                # Comprobamos si el aliado YA ESTÁ en la celda
-                is_at_target_cell = (v.gx == gx and v.gy == gy)
-                
-                # O si el aliado ESTÁ YENDO a esa celda
-                is_moving_to_target_cell = (v.current_target_cell == (gx, gy))
+        # 4. ¿La celda está reservada por un ALIADO (ocupada o en su ruta)?
+        # Consulta O(1) en la tabla espacio-tiempo del equipo: entramos a la
+        # celda durante este slot y la ocupamos el siguiente.
+        table = world.get_reservations(self.base_target_cell)
+        slot = table.slot_at(world.frame)
+        if not (table.is_free((gx, gy), slot, self) and table.is_free((gx, gy), slot + 1, self)):
+            return False
 
-                if is_at_target_cell or is_moving_to_target_cell:
-                    
-                    # (Lógica de la base: si está en su base, lo ignoramos)
-                    v_at_base = (v.gx == v.base_gx and v.gy == v.base_gy)
-                    if v_at_base:
-                        continue
+        return True # La celda es segura
 
-                    # La celda está ocupada O "reservada" por un aliado.
-                    return False
+    def _ally_blocked_cells(self, world):
+        """Celdas ocupadas por aliados o hacia las que se mueven (fuera de la base)."""
+        occupancy = world.get_occupancy(self.base_target_cell)
+        return occupancy.occupied_cells(exclude=self, skip=(self.base_gx, self.base_gy))
 
-        return True # La celda es segura
+    def _mine_danger_cells(self, world):
+        """Celdas dentro del área de alguna mina activa (un desvío nunca pasa por ellas)."""
+        return world.danger_cells()
+
+    def reserve_route(self, world):
+        """
+        Reserva en la tabla del equipo la celda actual, la celda hacia la que
+        vamos y los próximos pasos de la ruta. La celda de la base no se
+        reserva (ahí conviven todos los vehículos del equipo).
+        """
+        table = world.get_reservations(self.base_target_cell)
+        slot = table.slot_at(world.frame)
+        route = [(self.gx, self.gy)]
+        if self.current_target_cell:
+            route.append(self.current_target_cell)
+        route.extend(self.path[:table.window])
+        key = (slot, tuple(route))
+        if key == self.reservation_key:
+            return # Nada cambió desde la última reserva
+        self.reservation_key = key
+        table.reserve_route(self, route, slot, skip=self.base_target_cell)
+
+    def plan_cooperatively(self, world):
+        """
+        Si los primeros pasos de self.path chocan con reservas de aliados,
+        rehace esa ventana con A* espacio-tiempo (puede incluir esperas, que
+        aparecen como la misma celda repetida) y sigue la ruta más corta después.
+        """
+        if not self.path:
+            return
+        table = world.get_reservations(self.base_target_cell)
+        slot = table.slot_at(world.frame)
+        start = (self.gx, self.gy)
+        if not table.route_conflicts(self, [start] + self.path, slot):
+            return
+        goal = self.path[-1]
+        route = table.plan_window(self, start, goal, slot, world.get_distance_field(goal),
+                                  self._mine_danger_cells(world))
+        if route and len(route) > 1:
+            self.path = route[1:]
+
+    def replan_around_allies(self, world):
+        """
+        Replanifica hacia el mismo destino esquivando a los aliados con un
+        planificador D* Lite propio del vehículo, que reutiliza su búsqueda
+        anterior. El desvío tampoco entra en áreas de minas activas (la
+        estrategia no vuelve a decidir mientras se sigue la ruta).
+        Devuelve True si dejó en self.path un desvío aceptable.
+        """
+        goal = self.path[-1]
+        if self.replanner is None or self.replanner.goal != goal:
+            self.replanner = pathfinding.DStarLite(goal, world)
+
+        blocked = self._ally_blocked_cells(world)
+        blocked.extend(self._mine_danger_cells(world))
+        path_list = self.replanner.plan((self.gx, self.gy), world, blocked)
+        if not path_list or len(path_list) < 2:
+            return False
+        # Si el desvío es mucho más largo conviene esperar a que el aliado se mueva
+        if len(path_list) - 1 > len(self.path) + constants.REPLAN_MAX_DETOUR:
+            return False
+        self.path = path_list[1:]
+        return True
     
     def set_path_to_base(self, world):
-        """Calcula la ruta a la base usando A* (A-Estrella)"""
+        """
+        Calcula la ruta a la base siguiendo el campo de distancias (BFS) que el
+        mundo mantiene para cada base: O(largo del camino), sin correr A*.
+        """
         
         start_cell = (self.gx, self.gy)
         # self.base_target_cell es (base_gx, base_gy)
-        
-        # Llamamos a la función A*
-        path_list = pathfinding.a_star(start_cell, self.base_target_cell, world)
+        path_list = world.path_to_base(start_cell, self.base_target_cell)
         
         if path_list and len(path_list) > 1:
             self.path = path_list[1:] # Omitir el primer nodo (posición actual)
+            self.plan_cooperatively(world)
         else:
             self.path = [] # No se encontró ruta o ya estamos en la base
     
     def force_return_to_base(self):
         self.forced_return = True
         self.returning_to_base = False
+        self.awaiting_path = False # Un camino pedido antes ya no sirve
         self.path.clear() # Borra la ruta actual
 
     def execute_action(self, action, world):
@@ -453,10 +556,8 @@ class Vehicle:
             self.evasion_timer = 20 # 20 ticks lógicos en estado de evasión
 
         elif action_type == "collect" and target:
-            # Target es un objeto recurso. Convertimos sus píxeles a celda.
-            target_gx = int(target.x) // constants.TILE
-            target_gy = int(target.y) // constants.TILE
-            target_cell = (target_gx, target_gy)
+            # Target es un objeto recurso: ya conoce su celda
+            target_cell = (target.gx, target.gy)
 
         elif action_type == "return_to_base":
             self.returning_to_base = True
@@ -465,25 +566,33 @@ class Vehicle:
 
         # Calcular la ruta si tenemos un objetivo válido
         if target_cell and target_cell != start_cell:
-            path_list = pathfinding.a_star(start_cell, target_cell, world)
-            
-            if path_list and len(path_list) > 1:
-                self.path = path_list[1:] # Omitir el primer nodo
-            else:
-                self.path = [] # No se encontró ruta
+            planner = getattr(world, "path_planner", None)
+            if planner is not None:
+                # Se resuelve al final del tick junto con los demás pedidos
+                self.path = []
+                self.awaiting_path = True
+                planner.request(self, start_cell, target_cell, method="safe")
+                return
+            # A* con pesos: evita las áreas de minas activas salvo que no haya otra
+            path_list = pathfinding.a_star(start_cell, target_cell, world, method="safe")
+            self.receive_path(path_list, world)
         else:
             self.path = [] # Objetivo inválido o ya estamos en él
 
+    def receive_path(self, path_list, world):
+        """Recibe el camino pedido (incluye la celda actual) o None."""
+        self.awaiting_path = False
+        if path_list and len(path_list) > 1:
+            self.path = path_list[1:] # Omitir el primer nodo
+            self.plan_cooperatively(world)
+        else:
+            self.path = [] # No se encontró ruta
+
     def try_collect_at_current_cell(self, world):
         """Intenta recoger recursos EN la celda actual."""
-        for resource in world.resources[:]:
-            res_gx = int(resource.x) // constants.TILE
-            res_gy = int(resource.y) // constants.TILE
-            
-            if self.gx == res_gx and self.gy == res_gy:
-                if resource.type in self.allowed_cargo:
-                    self.collect(resource, world)
-                    break # Solo recoge una cosa por turno
+        resource = world.resource_at(self.gx, self.gy) # Solo puede haber uno por celda
+        if resource is not None and self.cargo_mask >> resource.type_code & 1:
+            self.collect(resource, world)
 
     def deliver_cargo(self):
         """Entrega la carga y suma puntos (función helper)."""
@@ -494,9 +603,9 @@ class Vehicle:
         self.cargo.clear()
 
     def collect(self, resource, world):
-        if resource.type not in self.allowed_cargo:
+        if not self.cargo_mask >> resource.type_code & 1:
             return
-        if resource not in world.resources:
+        if not world.has_resource(resource):
             return
         
         self.cargo.append(resource)
@@ -581,20 +690,28 @@ class Vehicle:
             ])
 
 class Jeep(Vehicle):
+    __slots__ = ()
+
     def __init__(self, id, x, y, base_position, color):
         super().__init__(id, x, y, base_position, "jeep", 2,
                          ["person", "clothes", "food", "medicine", "weapons"], color)
 
 class Moto(Vehicle):
+    __slots__ = ()
+
     def __init__(self, id, x, y, base_position, color):
         super().__init__(id, x, y, base_position, "moto", 1, ["person"], color)
 
 class Camion(Vehicle):
+    __slots__ = ()
+
     def __init__(self, id, x, y, base_position, color):
         super().__init__(id, x, y, base_position, "camion", 3,
                          ["person", "clothes", "food", "medicine", "weapons"], color)
 
 class Auto(Vehicle):
+    __slots__ = ()
+
     def __init__(self, id, x, y, base_position, color):
         super().__init__(id, x, y, base_position, "auto", 1,
                          ["person", "clothes", "food", "medicine"], color)
\ No newline at end of file
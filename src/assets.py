@@ -0,0 +1,41 @@
+#este archivo contiene el registro de imágenes compartido por todo el proceso.
+#Cada imagen se lee del disco, se convierte y se escala UNA sola vez; después
+#todas las instancias (árboles, personas, mercancías, minas, carga de los
+#vehículos, reconstrucciones al cargar partidas o saltar en un replay)
+#reciben la misma superficie. Las superficies compartidas no se modifican.
+import os
+
+import pygame
+
+IMAGES_DIR = os.path.join("assets", "images", "objects")
+
+_images = {}
+
+
+def get_image(filename, size, fallback=None, alpha=True):
+    """
+    Imagen 'filename' de assets/images/objects escalada a 'size' (ancho, alto).
+
+    Si la carga falla (no existe el archivo, o todavía no hay ventana para
+    convertirla), se usa fallback(), una función que dibuja la superficie de
+    reemplazo. El resultado también se guarda, pero aparte del de la carga con
+    ventana, así abrir la ventana después vuelve a intentar con el archivo.
+    """
+    key = (filename, size, alpha, pygame.display.get_surface() is not None)
+    image = _images.get(key)
+    if image is None:
+        try:
+            image = pygame.image.load(os.path.join(IMAGES_DIR, filename))
+            image = image.convert_alpha() if alpha else image.convert()
+            image = pygame.transform.scale(image, size)
+        except Exception:
+            if fallback is None:
+                raise
+            image = fallback()
+        _images[key] = image
+    return image
+
+
+def clear_cache():
+    """Olvida todas las imágenes cargadas (por ejemplo, al recrear la ventana)."""
+    _images.clear()
@@ -71,6 +71,10 @@ MERCH_POINTS = {
     "weapons": 50
 }
 
+# Tipos de recurso y su código entero (type_code de Person/Merchandise)
+RESOURCE_TYPES = ("person",) + tuple(MERCH_POINTS)
+RESOURCE_CODES = {name: code for code, name in enumerate(RESOURCE_TYPES)}
+
 # Distribución de mercancías (total debe ser NUM_MERCH)
 MERCH_COUNTS = {
     "clothes": 15,
@@ -100,6 +104,16 @@ MINES_COUNT = {
 # Tiempo para minas móviles (frames)
 G1_TOGGLE_TIME = 300  # 5 segundos a 60fps
 
+# Costo extra de entrar a una celda cubierta por una mina activa (A* "safe")
+MINE_DANGER_COST = 25
+
+# Celdas extra que se aceptan al desviarse de un aliado (si no, se espera)
+REPLAN_MAX_DETOUR = 6
+
+# Reservas espacio-tiempo de cada equipo (planificación cooperativa)
+RESERVATION_STEP_FRAMES = 20 # Frames para cruzar una celda (TILE / 1.5 px por frame)
+RESERVATION_WINDOW = 16      # Pasos hacia adelante que reserva cada vehículo
+
 # Colores para visualización de minas
 MINE_COLORS = {
     "O1": (255, 0, 0, 128),
@@ -110,4 +124,13 @@ MINE_COLORS = {
 }
 
 # Modo de depuración
-DEBUG_MODE = False  # Cambia a False para desactivar visualización de áreas de minas
\ No newline at end of file
+DEBUG_MODE = False  # Cambia a False para desactivar visualización de áreas de minas
+# Avance rápido (tecla F): ticks lógicos por frame dibujado. None = "máximo",
+# tantos como entren en el presupuesto de tiempo del frame.
+SPEED_LEVELS = (1, 4, 16, None)
+FRAME_BUDGET_MS = 12 # Tiempo de lógica por frame (a 60 FPS quedan ~4 ms para dibujar)
+RENDER_EVERY_OPTIONS = (1, 2, 4, 8) # Tecla N: dibujar uno de cada N frames
+# Historial para retroceder en pausa: capturas livianas por tick (con tope) y
+# el estado completo cada tantos ticks (el paso atrás vuelve a uno de esos)
+HISTORY_MAX_FRAMES = 10000
+HISTORY_FULL_EVERY = 10
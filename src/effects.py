@@ -0,0 +1,188 @@
+#este archivo contiene el sistema de efectos visuales: el fuego que dejan las
+#explosiones en cada celda y las partículas de la interfaz.
+#En lugar de un objeto por efecto, cada tipo se guarda en arreglos paralelos
+#de numpy preasignados (posición, velocidad, vida, color) que se actualizan en
+#bloque, y se dibujan con cuadros ya "horneados" (una superficie por nivel de
+#transparencia) en una sola llamada a blits. Así una cadena de explosiones no
+#crea ni descarta objetos ni toca el alpha de una imagen compartida.
+import numpy as np
+import pygame
+
+from . import constants
+from .assets import get_image
+
+FIRE_LIFETIME = 45 # Duración del fuego en ticks (0.75 seg a 60fps)
+PARTICLE_LIFETIME = 30 # Duración de las partículas en frames
+
+
+class _ArrayPool:
+    """
+    Arreglos paralelos de capacidad fija: los 'count' primeros son los vivos.
+    Si se llenan, la capacidad se duplica (una sola vez, no por efecto).
+    """
+
+    def __init__(self, capacity, **fields):
+        self.count = 0
+        self.fields = fields # nombre -> dtype
+        self.capacity = capacity
+        for name, dtype in fields.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+
+    def _reserve(self, n):
+        needed = self.count + n
+        if needed <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        for name, dtype in self.fields.items():
+            grown = np.zeros(capacity, dtype=dtype)
+            grown[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, grown)
+        self.capacity = capacity
+
+    def append(self, **values):
+        """Agrega n elementos; cada valor es un escalar o una secuencia de largo n."""
+        n = max(np.size(v) for v in values.values())
+        self._reserve(n)
+        start, end = self.count, self.count + n
+        for name, value in values.items():
+            getattr(self, name)[start:end] = value
+        self.count = end
+
+    def keep(self, mask):
+        """Conserva (compactados al principio) solo los vivos según 'mask'."""
+        kept = int(np.count_nonzero(mask))
+        if kept == self.count:
+            return
+        for name in self.fields:
+            array = getattr(self, name)
+            array[:kept] = array[:self.count][mask]
+        self.count = kept
+
+    def clear(self):
+        self.count = 0
+
+
+class EffectsSystem:
+    """
+    Fuego por celda (vence en un tick dado del mundo) y partículas (vida en
+    frames de dibujo). Lo tiene World en world.effects.
+    """
+
+    def __init__(self, capacity=256):
+        self.fires = _ArrayPool(capacity, x=np.int32, y=np.int32, expires=np.int64)
+        self.particles = _ArrayPool(capacity, x=np.float32, y=np.float32,
+                                    vx=np.float32, vy=np.float32,
+                                    life=np.int16, color=np.int16)
+        self.palette = [] # Colores de las partículas (el arreglo guarda el índice)
+        self._color_index = {}
+        self._fire_frames = None # Una superficie por cada valor de vida restante
+        self._particle_frames = {} # (color, vida) -> (superficie, radio)
+
+    def __len__(self):
+        return self.fires.count + self.particles.count
+
+    @property
+    def fire_count(self):
+        return self.fires.count
+
+    # -------------------------------
+    # Fuego
+    # -------------------------------
+
+    def add_fires(self, positions, expires):
+        """Agrega fuego en las posiciones (px, py) dadas, hasta el tick 'expires'."""
+        positions = list(positions)
+        if not positions:
+            return
+        xs, ys = zip(*positions)
+        self.fires.append(x=xs, y=ys, expires=expires)
+
+    def expire_fires(self, now):
+        """Quita el fuego vencido (vectorizado; no hace nada si no hay fuego)."""
+        fires = self.fires
+        if fires.count:
+            fires.keep(fires.expires[:fires.count] > now)
+
+    def _bake_fire_frames(self):
+        def fire_fallback():
+            print("Error cargando fire.png")
+            # Fallback a un cuadrado naranja si falla la carga
+            image = pygame.Surface((constants.TILE, constants.TILE))
+            image.fill((255, 100, 0))
+            return image
+        image = get_image("fire.png", (constants.TILE, constants.TILE), fire_fallback)
+        frames = []
+        for remaining in range(FIRE_LIFETIME + 1):
+            # Efecto de parpadeo y desvanecimiento
+            alpha = int(255 * (remaining / FIRE_LIFETIME))
+            if remaining % 10 < 5: # Parpadeo
+                alpha = max(0, alpha - 100)
+            frame = image.copy()
+            frame.set_alpha(alpha)
+            frames.append(frame)
+        self._fire_frames = frames
+
+    def draw_fires(self, screen, now):
+        fires = self.fires
+        if not fires.count:
+            return
+        if self._fire_frames is None:
+            self._bake_fire_frames()
+        frames = self._fire_frames
+        count = fires.count
+        remaining = np.clip(fires.expires[:count] - now, 0, FIRE_LIFETIME).tolist()
+        screen.blits([(frames[r], (x, y)) for r, x, y in
+                      zip(remaining, fires.x[:count].tolist(), fires.y[:count].tolist())],
+                     doreturn=False)
+
+    # -------------------------------
+    # Partículas
+    # -------------------------------
+
+    def emit_particles(self, x, y, color, vx, vy, count=1):
+        """Agrega 'count' partículas en (x, y); vx y vy pueden ser escalares o secuencias."""
+        index = self._color_index.get(color)
+        if index is None:
+            index = self._color_index[color] = len(self.palette)
+            self.palette.append(color)
+        self.particles.append(x=np.full(count, x), y=y, vx=vx, vy=vy,
+                              life=PARTICLE_LIFETIME, color=index)
+
+    def update_particles(self):
+        """Avanza todas las partículas un frame y descarta las que terminaron."""
+        p = self.particles
+        n = p.count
+        if not n:
+            return
+        p.x[:n] += p.vx[:n]
+        p.y[:n] += p.vy[:n]
+        p.life[:n] -= 1
+        p.keep(p.life[:n] > 0)
+
+    def _particle_frame(self, color, life):
+        frame = self._particle_frames.get((color, life))
+        if frame is None:
+            size = max(1, life // 10)
+            alpha = int(255 * (life / PARTICLE_LIFETIME))
+            surface = pygame.Surface((2 * size + 1, 2 * size + 1), pygame.SRCALPHA)
+            pygame.draw.circle(surface, self.palette[color] + (alpha,), (size, size), size)
+            frame = self._particle_frames[(color, life)] = (surface, size)
+        return frame
+
+    def draw_particles(self, screen):
+        p = self.particles
+        n = p.count
+        if not n:
+            return
+        blits = []
+        for x, y, life, color in zip(p.x[:n].astype(np.int32).tolist(), p.y[:n].astype(np.int32).tolist(),
+                                     p.life[:n].tolist(), p.color[:n].tolist()):
+            surface, size = self._particle_frame(color, life)
+            blits.append((surface, (x - size, y - size)))
+        screen.blits(blits, doreturn=False)
+
+    def clear(self):
+        self.fires.clear()
+        self.particles.clear()
@@ -1,26 +1,29 @@
 from . import constants
+from .assets import get_image
 import pygame
-import os
 import math
+import sys
+
+# Las entidades del mapa usan __slots__ (sin __dict__ por instancia) y
+# guardan su celda (gx, gy) ya calculada, para no convertir píxeles a celda
+# en cada consulta. Los tipos son strings internados y, en los recursos,
+# también un código entero (constants.RESOURCE_CODES).
+
+
+def _cell_of(x, y):
+    return int(x) // constants.TILE, int(y) // constants.TILE
+
 
 class Tree:
+    __slots__ = ("x", "y", "gx", "gy", "points", "image", "size")
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
+        self.gx, self.gy = _cell_of(x, y)
         self.points = 5
-        tree_path = os.path.join("assets", "images", "objects", "Tree.png")
-        try:
-            self.image = pygame.image.load(tree_path).convert_alpha()
-            self.image = pygame.transform.scale(self.image, (constants.TREE, constants.TREE))
-        except Exception:
-            # Árbol mejorado
-            self.image = pygame.Surface((constants.TREE, constants.TREE), pygame.SRCALPHA)
-            # Copa del árbol
-            pygame.draw.circle(self.image, (34, 139, 34), (constants.TREE//2, constants.TREE//2-2), 10)
-            pygame.draw.circle(self.image, (50, 180, 50), (constants.TREE//2-3, constants.TREE//2-5), 7)
-            pygame.draw.circle(self.image, (50, 180, 50), (constants.TREE//2+3, constants.TREE//2-5), 7)
-            # Tronco
-            pygame.draw.rect(self.image, (101, 67, 33), (constants.TREE//2-2, constants.TREE//2+5, 4, 8))
+        # Imagen compartida por todos los árboles (se carga una sola vez)
+        self.image = get_image("Tree.png", (constants.TREE, constants.TREE), _draw_tree)
         self.size = self.image.get_width()
 
     def draw(self, screen):
@@ -28,29 +31,17 @@ class Tree:
 
 
 class Person:
+    __slots__ = ("x", "y", "gx", "gy", "points", "type", "type_code", "value", "image", "size")
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
+        self.gx, self.gy = _cell_of(x, y)
         self.points = 50
         self.type = "person"  # Para compatibilidad con estrategias
+        self.type_code = constants.RESOURCE_CODES["person"]
         self.value = 50
-        person_path = os.path.join("assets", "images", "objects", "persona.png")
-        try:
-            self.image = pygame.image.load(person_path).convert_alpha()
-            self.image = pygame.transform.scale(self.image, (constants.PERSON, constants.PERSON))
-        except Exception:
-            # Persona mejorada
-            self.image = pygame.Surface((constants.PERSON, constants.PERSON), pygame.SRCALPHA)
-            # Cabeza
-            pygame.draw.circle(self.image, (255, 220, 180), (constants.PERSON//2, 8), 5)
-            # Cuerpo
-            pygame.draw.rect(self.image, (100, 100, 200), (constants.PERSON//2-3, 13, 6, 8))
-            # Brazos
-            pygame.draw.line(self.image, (255, 220, 180), (constants.PERSON//2, 15), (constants.PERSON//2-5, 18), 2)
-            pygame.draw.line(self.image, (255, 220, 180), (constants.PERSON//2, 15), (constants.PERSON//2+5, 18), 2)
-            # Piernas
-            pygame.draw.line(self.image, (50, 50, 150), (constants.PERSON//2, 21), (constants.PERSON//2-3, 25), 2)
-            pygame.draw.line(self.image, (50, 50, 150), (constants.PERSON//2, 21), (constants.PERSON//2+3, 25), 2)
+        self.image = get_image("persona.png", (constants.PERSON, constants.PERSON), _draw_person)
         self.size = self.image.get_width()
 
     def draw(self, screen):
@@ -67,58 +58,28 @@ class Person:
 
 
 class Merchandise:
+    __slots__ = ("x", "y", "gx", "gy", "kind", "type", "type_code", "value", "size", "image")
+
     def __init__(self, x, y, kind):
         self.x = x
         self.y = y
+        self.gx, self.gy = _cell_of(x, y)
+        kind = sys.intern(kind) # Puede venir de una partida guardada
         self.kind = kind
         self.type = kind  # Para compatibilidad con estrategias
+        self.type_code = constants.RESOURCE_CODES.get(kind, len(constants.RESOURCE_CODES))
         self.value = constants.MERCH_POINTS.get(kind, 10)
         self.size = constants.MERCH_SIZE
         
-        # Cargar o crear imagen según tipo
+        # Imagen compartida según tipo
         filename = {
             "clothes": "remera.png",
             "food": "pizza.png",
             "medicine": "health.png",
             "weapons": "weapon.png"
         }.get(kind, "merch.png")
-        path = os.path.join("assets", "images", "objects", filename)
-        
-        try:
-            self.image = pygame.image.load(path).convert_alpha()
-            self.image = pygame.transform.scale(self.image, (self.size, self.size))
-        except Exception:
-            # Crear sprites mejorados si no hay imagen
-            self.image = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
-            
-            if kind == "clothes":
-                # Camiseta
-                pygame.draw.rect(self.image, (200, 100, 200), (4, 6, 12, 10))
-                pygame.draw.rect(self.image, (200, 100, 200), (2, 6, 4, 4))  # Manga izq
-                pygame.draw.rect(self.image, (200, 100, 200), (14, 6, 4, 4))  # Manga der
-                pygame.draw.circle(self.image, (220, 120, 220), (10, 4), 2)  # Cuello
-                
-            elif kind == "food":
-                # Pizza
-                pygame.draw.circle(self.image, (255, 200, 100), (10, 10), 8)
-                pygame.draw.circle(self.image, (255, 220, 120), (10, 10), 7)
-                # Pepperoni
-                pygame.draw.circle(self.image, (200, 50, 50), (7, 8), 2)
-                pygame.draw.circle(self.image, (200, 50, 50), (13, 8), 2)
-                pygame.draw.circle(self.image, (200, 50, 50), (10, 12), 2)
-                
-            elif kind == "medicine":
-                # Cruz médica
-                pygame.draw.rect(self.image, (255, 255, 255), (4, 4, 12, 12))
-                pygame.draw.rect(self.image, (255, 50, 50), (8, 6, 4, 8))
-                pygame.draw.rect(self.image, (255, 50, 50), (6, 8, 8, 4))
-                
-            elif kind == "weapons":
-                # Arma/munición
-                pygame.draw.rect(self.image, (80, 80, 80), (4, 8, 12, 4))
-                pygame.draw.circle(self.image, (50, 50, 50), (4, 10), 2)
-                pygame.draw.rect(self.image, (100, 100, 100), (6, 6, 6, 2))
-                pygame.draw.polygon(self.image, (60, 60, 60), [(16, 10), (18, 8), (18, 12)])
+        self.image = get_image(filename, (self.size, self.size),
+                               lambda: _draw_merchandise(kind, self.size))
 
     def draw(self, screen):
         screen.blit(self.image, (self.x, self.y))
@@ -133,59 +94,65 @@ class Merchandise:
             "value": self.value
         }
 
+# Huellas precalculadas: (tipo, x dentro de la celda, y dentro de la celda) -> offsets
+_FOOTPRINT_OFFSETS = {}
+
+
+def _shape_covers(mine_type, radius, dx, dy):
+    """Verifica si el punto a (dx, dy) píxeles del centro está en el área de la mina."""
+    # Para las minas T1 y T2, el grosor del área de efecto es pequeño.
+    # Asumimos un grosor de 4px, por lo que la mitad es 2.
+    # Sería ideal tener esto como una constante, ej: constants.MINE_THICKNESS / 2
+    half_thickness = 2
+
+    if mine_type in ["O1", "O2", "G1"]:
+        # Colisión circular: la distancia al centro es menor o igual al radio.
+        return math.hypot(dx, dy) <= radius
+    elif mine_type == "T1":
+        # Colisión rectangular horizontal.
+        return abs(dx) <= radius and abs(dy) <= half_thickness
+    elif mine_type == "T2":
+        # Colisión rectangular vertical.
+        return abs(dy) <= radius and abs(dx) <= half_thickness
+    return False
+
+
 class Mine:
+    __slots__ = ("x", "y", "gx", "gy", "type", "active", "toggle_timer", "size", "radius", "image", "rect")
+
     def __init__(self, x, y, mine_type):
         # La x, y que recibe es el CENTRO de la celda
         self.x = x
         self.y = y
+        self.gx, self.gy = _cell_of(x, y)
+        mine_type = sys.intern(mine_type)
         self.type = mine_type
         self.active = True
         self.toggle_timer = 0
         self.size = constants.MINE_SIZE
         self.radius = constants.MINE_TYPES[self.type]["radius"]
         
-        # Cargar o crear imagen
-        mine_path = os.path.join("assets", "images", "objects", f"mine_{mine_type}.png")
-        try:
-            self.image = pygame.image.load(mine_path).convert_alpha()
-            self.image = pygame.transform.scale(self.image, (self.size, self.size))
-        except Exception:
-            # Crear sprite de mina mejorado
-            self.image = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
-            
-            if mine_type in ["O1", "O2"]:
-                # Mina circular
-                pygame.draw.circle(self.image, (200, 0, 0), (self.size//2, self.size//2), self.size//2)
-                pygame.draw.circle(self.image, (150, 0, 0), (self.size//2, self.size//2), self.size//2-1, 1)
-                pygame.draw.circle(self.image, (255, 200, 0), (self.size//2, self.size//2), 2)
-                
-            elif mine_type in ["T1", "T2"]:
-                # Mina rectangular
-                pygame.draw.rect(self.image, (200, 100, 0), (1, 1, self.size-2, self.size-2))
-                pygame.draw.rect(self.image, (150, 50, 0), (1, 1, self.size-2, self.size-2), 1)
-                pygame.draw.rect(self.image, (255, 200, 0), (3, 3, 4, 4))
-                
-            elif mine_type == "G1":
-                # Mina móvil (destella)
-                pygame.draw.circle(self.image, (255, 0, 255), (self.size//2, self.size//2), self.size//2)
-                pygame.draw.circle(self.image, (200, 0, 200), (self.size//2, self.size//2), self.size//2-1, 1)
-                pygame.draw.circle(self.image, (255, 255, 0), (self.size//2, self.size//2), 2)
+        # Imagen compartida por todas las minas del mismo tipo
+        self.image = get_image(f"mine_{mine_type}.png", (self.size, self.size),
+                               lambda: _draw_mine(mine_type, self.size))
         
         # El rect se usa para el blit, centrado en la posición
         self.rect = self.image.get_rect(center=(x, y))
 
-    def update(self):
+    def set_position(self, x, y):
+        """Mueve la mina (reubicación de G1) manteniendo su celda y su rect."""
+        self.x = x
+        self.y = y
+        self.gx, self.gy = _cell_of(x, y)
+        self.rect = self.image.get_rect(center=(x, y))
+
+    def toggle(self):
         """
-        Actualiza el estado de la mina (solo G1).
-        Devuelve True si cambió de estado, False si no.
+        Enciende o apaga la mina (solo G1). La llama World cuando vence su
+        temporizador, cada G1_TOGGLE_TIME ticks (ver TimerWheel).
         """
-        if self.type == "G1":
-            self.toggle_timer += 1
-            if self.toggle_timer >= constants.G1_TOGGLE_TIME:
-                self.active = not self.active
-                self.toggle_timer = 0
-                return True # Cambió de estado
-        return False # No cambió
+        self.active = not self.active
+        self.toggle_timer = 0
 
     def draw(self, screen):
         """Dibuja la mina y su área de efecto"""
@@ -225,59 +192,43 @@ class Mine:
         """Verifica si un punto está dentro del área de la mina"""
         if not self.active:
             return False
-            
+        return self.covers(px, py)
+
+    def covers(self, px, py):
+        """Verifica si un punto está dentro del área de la mina (activa o no)."""
         # Usamos self.x y self.y que ya son el centro de la mina.
-        cx, cy = self.x, self.y
-        
-        # Para las minas T1 y T2, el grosor del área de efecto es pequeño.
-        # Asumimos un grosor de 4px, por lo que la mitad es 2.
-        # Sería ideal tener esto como una constante, ej: constants.MINE_THICKNESS / 2
-        half_thickness = 2
-
-        if self.type in ["O1", "O2", "G1"]:
-            # Colisión circular: la distancia al centro es menor o igual al radio.
-            return math.hypot(px - cx, py - cy) <= self.radius
-        elif self.type == "T1":
-            # Colisión rectangular horizontal.
-            in_horizontal_range = abs(px - cx) <= self.radius
-            in_vertical_band = abs(py - cy) <= half_thickness
-            return in_horizontal_range and in_vertical_band
-        elif self.type == "T2":
-            # Colisión rectangular vertical.
-            in_vertical_range = abs(py - cy) <= self.radius
-            in_horizontal_band = abs(px - cx) <= half_thickness
-            return in_vertical_range and in_horizontal_band
-        
-        return False
+        return _shape_covers(self.type, self.radius, px - self.x, py - self.y)
+
+    def footprint_offsets(self):
+        """
+        Desplazamientos (dx, dy) en celdas, desde la celda de la mina, de las
+        celdas cuyo centro está dentro de su área. Se calculan una sola vez por
+        tipo de mina (y posición dentro de la celda) a partir de MINE_TYPES.
+        """
+        ox = self.x % constants.TILE
+        oy = self.y % constants.TILE
+        key = (self.type, ox, oy)
+        offsets = _FOOTPRINT_OFFSETS.get(key)
+        if offsets is None:
+            radius = constants.MINE_TYPES[self.type]["radius"]
+            r = math.ceil(radius / constants.TILE) + 1
+            half = constants.TILE // 2
+            offsets = _FOOTPRINT_OFFSETS[key] = tuple(
+                (dx, dy)
+                for dy in range(-r, r + 1)
+                for dx in range(-r, r + 1)
+                if _shape_covers(self.type, radius, dx * constants.TILE + half - ox,
+                                 dy * constants.TILE + half - oy))
+        return offsets
 
     def explode(self, world):
         """
-        Lógica de explosión: daña el terreno y crea efectos visuales.
+        Lógica de explosión: daña el terreno, destruye lo que haya en el área
+        y crea efectos visuales (ver World.explode_mine).
+        Devuelve los vehículos destruidos.
         """
         print(f"¡BOOM! Mina {self.type} explotó en ({self.x}, {self.y})")
-        
-        # 1. Marcar celdas del grid como destruidas (0)
-        # Iteramos sobre un área cuadrada alrededor de la mina para optimizar
-        center_gx, center_gy = world.pixel_to_cell(self.x, self.y)
-        radius_in_cells = math.ceil(self.radius / constants.TILE)
-        
-        for gy in range(center_gy - radius_in_cells, center_gy + radius_in_cells + 1):
-            for gx in range(center_gx - radius_in_cells, center_gx + radius_in_cells + 1):
-                # Asegurarse que la celda está en el mapa
-                if 0 <= gx < constants.GRID_WIDTH and 0 <= gy < constants.GRID_HEIGHT:
-                    # Coordenadas del centro de la celda
-                    px, py = world.cell_to_pixel_center(gx, gy)
-                    
-                    # Si el centro de la celda está en el radio, la destruimos
-                    if self.check_collision(px, py):
-                        world.grid[gy][gx] = 0 # Marcar como no caminable
-                        
-                        # 2. Crear efecto de fuego en esa celda
-                        fire_x, fire_y = world.cell_to_pixel(gx, gy)
-                        world.effects.append(FireEffect(fire_x, fire_y))
-
-        # 3. Desactivar la mina
-        self.active = False
+        return world.explode_mine(self)
 
     def get_state(self):
         """Devuelve un diccionario simple para guardar."""
@@ -291,36 +242,93 @@ class Mine:
         }
 
 
-class FireEffect:
-    """
-    Un efecto visual de fuego que dura un tiempo determinado.
-    """
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.lifetime = 45  # Duración en frames (ej. 0.75 seg a 60fps)
-        
-        try:
-            # Usamos una sola imagen de fuego para todos
-            if not hasattr(FireEffect, 'image'):
-                path = os.path.join("assets", "images", "objects", "fire.png")
-                image = pygame.image.load(path).convert_alpha()
-                FireEffect.image = pygame.transform.scale(image, (constants.TILE, constants.TILE))
-        except Exception as e:
-            print(f"Error cargando fire.png: {e}")
-            # Fallback a un cuadrado naranja si falla la carga
-            FireEffect.image = pygame.Surface((constants.TILE, constants.TILE))
-            FireEffect.image.fill((255, 100, 0))
-
-    def update(self):
-        self.lifetime -= 1
-        return self.lifetime > 0
+# -------------------------------
+# Sprites de reemplazo (si no se puede cargar la imagen). Se dibujan una sola
+# vez por tipo: el resultado queda en el registro de assets.
+# -------------------------------
 
-    def draw(self, screen):
-        # Efecto de parpadeo y desvanecimiento
-        alpha = int(255 * (self.lifetime / 45))
-        if self.lifetime % 10 < 5: # Parpadeo
-             alpha = max(0, alpha - 100)
-        
-        self.image.set_alpha(alpha)
-        screen.blit(self.image, (self.x, self.y))
\ No newline at end of file
+def _draw_tree():
+    # Árbol mejorado
+    image = pygame.Surface((constants.TREE, constants.TREE), pygame.SRCALPHA)
+    # Copa del árbol
+    pygame.draw.circle(image, (34, 139, 34), (constants.TREE//2, constants.TREE//2-2), 10)
+    pygame.draw.circle(image, (50, 180, 50), (constants.TREE//2-3, constants.TREE//2-5), 7)
+    pygame.draw.circle(image, (50, 180, 50), (constants.TREE//2+3, constants.TREE//2-5), 7)
+    # Tronco
+    pygame.draw.rect(image, (101, 67, 33), (constants.TREE//2-2, constants.TREE//2+5, 4, 8))
+    return image
+
+
+def _draw_person():
+    # Persona mejorada
+    image = pygame.Surface((constants.PERSON, constants.PERSON), pygame.SRCALPHA)
+    # Cabeza
+    pygame.draw.circle(image, (255, 220, 180), (constants.PERSON//2, 8), 5)
+    # Cuerpo
+    pygame.draw.rect(image, (100, 100, 200), (constants.PERSON//2-3, 13, 6, 8))
+    # Brazos
+    pygame.draw.line(image, (255, 220, 180), (constants.PERSON//2, 15), (constants.PERSON//2-5, 18), 2)
+    pygame.draw.line(image, (255, 220, 180), (constants.PERSON//2, 15), (constants.PERSON//2+5, 18), 2)
+    # Piernas
+    pygame.draw.line(image, (50, 50, 150), (constants.PERSON//2, 21), (constants.PERSON//2-3, 25), 2)
+    pygame.draw.line(image, (50, 50, 150), (constants.PERSON//2, 21), (constants.PERSON//2+3, 25), 2)
+    return image
+
+
+def _draw_merchandise(kind, size):
+    # Crear sprites mejorados si no hay imagen
+    image = pygame.Surface((size, size), pygame.SRCALPHA)
+
+    if kind == "clothes":
+        # Camiseta
+        pygame.draw.rect(image, (200, 100, 200), (4, 6, 12, 10))
+        pygame.draw.rect(image, (200, 100, 200), (2, 6, 4, 4))  # Manga izq
+        pygame.draw.rect(image, (200, 100, 200), (14, 6, 4, 4))  # Manga der
+        pygame.draw.circle(image, (220, 120, 220), (10, 4), 2)  # Cuello
+
+    elif kind == "food":
+        # Pizza
+        pygame.draw.circle(image, (255, 200, 100), (10, 10), 8)
+        pygame.draw.circle(image, (255, 220, 120), (10, 10), 7)
+        # Pepperoni
+        pygame.draw.circle(image, (200, 50, 50), (7, 8), 2)
+        pygame.draw.circle(image, (200, 50, 50), (13, 8), 2)
+        pygame.draw.circle(image, (200, 50, 50), (10, 12), 2)
+
+    elif kind == "medicine":
+        # Cruz médica
+        pygame.draw.rect(image, (255, 255, 255), (4, 4, 12, 12))
+        pygame.draw.rect(image, (255, 50, 50), (8, 6, 4, 8))
+        pygame.draw.rect(image, (255, 50, 50), (6, 8, 8, 4))
+
+    elif kind == "weapons":
+        # Arma/munición
+        pygame.draw.rect(image, (80, 80, 80), (4, 8, 12, 4))
+        pygame.draw.circle(image, (50, 50, 50), (4, 10), 2)
+        pygame.draw.rect(image, (100, 100, 100), (6, 6, 6, 2))
+        pygame.draw.polygon(image, (60, 60, 60), [(16, 10), (18, 8), (18, 12)])
+    return image
+
+
+def _draw_mine(mine_type, size):
+    # Crear sprite de mina mejorado
+    image = pygame.Surface((size, size), pygame.SRCALPHA)
+
+    if mine_type in ["O1", "O2"]:
+        # Mina circular
+        pygame.draw.circle(image, (200, 0, 0), (size//2, size//2), size//2)
+        pygame.draw.circle(image, (150, 0, 0), (size//2, size//2), size//2-1, 1)
+        pygame.draw.circle(image, (255, 200, 0), (size//2, size//2), 2)
+
+    elif mine_type in ["T1", "T2"]:
+        # Mina rectangular
+        pygame.draw.rect(image, (200, 100, 0), (1, 1, size-2, size-2))
+        pygame.draw.rect(image, (150, 50, 0), (1, 1, size-2, size-2), 1)
+        pygame.draw.rect(image, (255, 200, 0), (3, 3, 4, 4))
+
+    elif mine_type == "G1":
+        # Mina móvil (destella)
+        pygame.draw.circle(image, (255, 0, 255), (size//2, size//2), size//2)
+        pygame.draw.circle(image, (200, 0, 200), (size//2, size//2), size//2-1, 1)
+        pygame.draw.circle(image, (255, 255, 0), (size//2, size//2), 2)
+    return image
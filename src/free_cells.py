@@ -0,0 +1,46 @@
+#este archivo contiene el conjunto de celdas libres (código 0 y fuera de las
+#bases) que mantiene World. Reemplaza al muestreo por rechazo ("probar hasta
+#200 celdas al azar"): elegir una celda libre al azar, agregarla o quitarla
+#es O(1) sin importar cuán lleno esté el mapa.
+import random
+
+
+class FreeCellSet:
+    """
+    Conjunto indexado de celdas (gx, gy).
+
+    Las celdas se guardan en una lista y su posición en un diccionario; al
+    quitar una, la última ocupa su lugar (así sample() elige en O(1)).
+    """
+
+    def __init__(self, cells=()):
+        self.cells = []
+        self.slots = {}  # celda -> posición en self.cells
+        for cell in cells:
+            self.add(cell)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return cell in self.slots
+
+    def add(self, cell):
+        if cell not in self.slots:
+            self.slots[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def discard(self, cell):
+        slot = self.slots.pop(cell, None)
+        if slot is None:
+            return
+        last = self.cells.pop()
+        if slot < len(self.cells):
+            self.cells[slot] = last
+            self.slots[last] = slot
+
+    def sample(self):
+        """Una celda al azar (uniforme), o None si no queda ninguna."""
+        if not self.cells:
+            return None
+        return self.cells[random.randrange(len(self.cells))]
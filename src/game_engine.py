@@ -1,43 +1,35 @@
 import pygame
 import sys
-from .world import World
 from . import constants
 from .game_states import GameState
 import math
-from config.strategies.player1_strategies import JeepStrategy, MotoStrategy, CamionStrategy, AutoStrategy
-from config.strategies.player2_strategies import AggressiveJeepStrategy, FastMotoStrategy, SupportCamionStrategy, BalancedAutoStrategy
-from src.aircraft import Jeep, Moto, Camion, Auto
 from .database import GameDatabase
+from .simulation import Simulation
 import pickle 
 import datetime
 import os 
 import glob
-from .elements import Person, Merchandise, Mine, FireEffect
-
-# Convierte los nombres de string (guardados) de nuevo a Clases (para cargar)
-STRATEGY_MAP = {
-    # Estrategias del Jugador 1
-    "JeepStrategy": JeepStrategy,
-    "MotoStrategy": MotoStrategy,
-    "CamionStrategy": CamionStrategy,
-    "AutoStrategy": AutoStrategy,
-    # Estrategias del Jugador 2
-    "AggressiveJeepStrategy": AggressiveJeepStrategy,
-    "FastMotoStrategy": FastMotoStrategy,
-    "SupportCamionStrategy": SupportCamionStrategy,
-    "BalancedAutoStrategy": BalancedAutoStrategy
-}
-# --- FIN DEL MAPA ---
-
-pygame.init()
-
-screen = pygame.display.set_mode((constants.WIDTH, constants.HEIGHT))
-pygame.display.set_caption("🚁 Simulador de Rescate - Algoritmos II")
-
-# Fuentes mejoradas
-FONT_TITLE = pygame.font.SysFont("Arial", 24, bold=True)
-FONT_NORMAL = pygame.font.SysFont("Arial", 16)
-FONT_SMALL = pygame.font.SysFont("Arial", 14)
+from collections import deque
+
+# La ventana y las fuentes se crean recién en init_display() (llamado desde main),
+# así importar este módulo no abre ninguna ventana.
+screen = None
+FONT_TITLE = None
+FONT_NORMAL = None
+FONT_SMALL = None
+
+def init_display():
+    """Inicializa pygame, la ventana y las fuentes de la interfaz."""
+    global screen, FONT_TITLE, FONT_NORMAL, FONT_SMALL
+    pygame.init()
+
+    screen = pygame.display.set_mode((constants.WIDTH, constants.HEIGHT))
+    pygame.display.set_caption("🚁 Simulador de Rescate - Algoritmos II")
+
+    # Fuentes mejoradas
+    FONT_TITLE = pygame.font.SysFont("Arial", 24, bold=True)
+    FONT_NORMAL = pygame.font.SysFont("Arial", 16)
+    FONT_SMALL = pygame.font.SysFont("Arial", 14)
 
 def draw_gradient_rect(surface, color1, color2, rect):
     """Dibuja un rectángulo con gradiente"""
@@ -63,192 +55,79 @@ def draw_panel(surface, x, y, width, height, color=(30, 30, 40)):
     pygame.draw.rect(panel_surf, (255, 255, 255, 30), (0, 0, width, height), 2, border_radius=10)
     surface.blit(panel_surf, (x, y))
 
+def record_history(history, sim):
+    """
+    Agrega al historial (una deque con tope HISTORY_MAX_FRAMES, que descarta
+    las entradas más viejas) la captura liviana del tick y, cada
+    HISTORY_FULL_EVERY ticks, antes el estado completo.
+    """
+    if sim.game_time % constants.HISTORY_FULL_EVERY == 0:
+        history.append(sim.get_full_game_state())
+    history.append(sim.get_lightweight_state())
+
+def nearest_full_frame(history, index):
+    """
+    Índice del estado completo más cercano en o antes de 'index', o None.
+    Con record_history hay uno cada HISTORY_FULL_EVERY ticks, así que alcanza
+    con mirar un par de esos períodos hacia atrás.
+    """
+    stop = max(-1, index - 2 * (constants.HISTORY_FULL_EVERY + 1))
+    for i in range(index, stop, -1):
+        if "world" in history[i]:
+            return i
+    return None
+
+def run_frame_logic(sim, ticks_per_frame, skip_render, on_tick=None):
+    """
+    Lógica de un frame en modo PLAYING: a x1 un tick por frame; con avance
+    rápido varios, sin pasarse del presupuesto de tiempo del frame ("máx" =
+    tantos como entren). Si el frame no se dibuja, la lógica puede usar el
+    frame entero. Devuelve la cantidad de ticks ejecutados.
+    """
+    if ticks_per_frame == 1:
+        budget = None
+    elif skip_render:
+        budget = 1 / 60 # El frame entero (60 FPS)
+    else:
+        budget = constants.FRAME_BUDGET_MS / 1000
+    return sim.run_for(ticks_per_frame, budget, on_tick=on_tick)
+
 def main():
-    frame_history = []
+    init_display()
+    frame_history = deque(maxlen=constants.HISTORY_MAX_FRAMES)
     current_frame_index = -1
 
     clock = pygame.time.Clock()
     db = GameDatabase()
-    # Usamos GAME_WORLD_HEIGHT para inicializar el mundo
-    world = World(constants.WIDTH, constants.GAME_WORLD_HEIGHT)
-
-    # Bases con mejor posicionamiento
-    base1_x = 50
-    # Centramos las bases en el MUNDO, no en la ventana
-    base1_y = constants.GAME_WORLD_HEIGHT // 2 
-    base2_x = constants.WIDTH - 50
-    base2_y = constants.GAME_WORLD_HEIGHT // 2
-
-    # Convertir las posiciones de base de píxeles a coordenadas de celda
-    base1_gx = base1_x // constants.TILE
-    base1_gy = base1_y // constants.TILE
-    base2_gx = base2_x // constants.TILE
-    base2_gy = base2_y // constants.TILE
-
-    # ==========================================
-    # JUGADOR 1 - ROJO (Izquierda)
-    # ==========================================
-    player1_vehicles = []
-    
-    # 3 Jeeps en formación escalonada
-    # Los offsets se ajustan para ser en celdas
-    for i in range(3):
-        jeep_gx_offset = i // 2 # 0, 0, 1
-        jeep_gy_offset = (i - 1) # -1, 0, 1
-        jeep = Jeep(f"P1_Jeep_{i}", base1_gx + jeep_gx_offset, base1_gy + jeep_gy_offset, 
-                   (base1_x, base1_y), (220, 20, 20))
-        jeep.strategy = JeepStrategy()
-        player1_vehicles.append(jeep)
-    
-    # 2 Motos adelante
-    for i in range(2):
-        moto_gy_offset = (i * 2 - 1) # -1, 1
-        moto = Moto(f"P1_Moto_{i}", base1_gx + 1, base1_gy + moto_gy_offset, 
-                   (base1_x, base1_y), (255, 80, 80))
-        moto.strategy = MotoStrategy()
-        player1_vehicles.append(moto)
-    
-    # 2 Camiones atrás
-    for i in range(2):
-        camion_gy_offset = (i * 2 - 1) # -1, 1
-        camion = Camion(f"P1_Camion_{i}", base1_gx - 1, base1_gy + camion_gy_offset, 
-                       (base1_x, base1_y), (180, 0, 0))
-        camion.strategy = CamionStrategy()
-        player1_vehicles.append(camion)
-    
-    # 3 Autos en V
-    # Se definen directamente en coordenadas de celda
-    auto_grid_positions = [
-        (base1_gx, base1_gy - 1),
-        (base1_gx, base1_gy + 1),
-        (base1_gx + 1, base1_gy)
-    ]
-    for i, (agx, agy) in enumerate(auto_grid_positions):
-        auto = Auto(f"P1_Auto_{i}", agx, agy, (base1_x, base1_y), (200, 40, 40))
-        auto.strategy = AutoStrategy()
-        player1_vehicles.append(auto)
-
-    # ==========================================
-    # JUGADOR 2 - AZUL (Derecha)
-    # ==========================================
-    player2_vehicles = []
-    
-    # 3 Jeeps en formación escalonada (offsets inversos para el lado derecho)
-    for i in range(3):
-        jeep_gx_offset = -(i // 2) # 0, 0, -1
-        jeep_gy_offset = (i - 1) # -1, 0, 1
-        jeep = Jeep(f"P2_Jeep_{i}", base2_gx + jeep_gx_offset, base2_gy + jeep_gy_offset, 
-                   (base2_x, base2_y), (20, 20, 220))
-        jeep.strategy = AggressiveJeepStrategy()
-        player2_vehicles.append(jeep)
-    
-    # 2 Motos adelante
-    for i in range(2):
-        moto_gy_offset = (i * 2 - 1) # -1, 1
-        moto = Moto(f"P2_Moto_{i}", base2_gx - 1, base2_gy + moto_gy_offset, 
-                   (base2_x, base2_y), (80, 80, 255))
-        moto.strategy = FastMotoStrategy()
-        player2_vehicles.append(moto)
-    
-    # 2 Camiones atrás
-    for i in range(2):
-        camion_gy_offset = (i * 2 - 1) # -1, 1
-        camion = Camion(f"P2_Camion_{i}", base2_gx + 1, base2_gy + camion_gy_offset, 
-                       (base2_x, base2_y), (0, 0, 180))
-        camion.strategy = SupportCamionStrategy()
-        player2_vehicles.append(camion)
-    
-    # 3 Autos en V
-    # Se definen directamente en coordenadas de celda
-    auto_grid_positions = [
-        (base2_gx, base2_gy - 1),
-        (base2_gx, base2_gy + 1),
-        (base2_gx - 1, base2_gy)
-    ]
-    for i, (agx, agy) in enumerate(auto_grid_positions):
-        auto = Auto(f"P2_Auto_{i}", agx, agy, (base2_x, base2_y), (40, 40, 200))
-        auto.strategy = BalancedAutoStrategy()
-        player2_vehicles.append(auto)
-
-    world.vehicles = player1_vehicles + player2_vehicles
-    world.player1_vehicles = player1_vehicles
-    world.player2_vehicles = player2_vehicles
-
-    # ... (rest of the main function) ...
-
-    def _rebuild_fleet(vehicle_data_list):
-        """
-        Función genérica para reconstruir una flota (lista de vehículos)
-        a partir de sus datos guardados.
-        """
-        rebuilt_fleet = [] # 1. Crea una lista vacía
-        
-        # Diccionario para recrear vehículos por su tipo
-        vehicle_classes = {
-            "jeep": Jeep,
-            "moto": Moto,
-            "camion": Camion,
-            "auto": Auto
-        }
-        for v_data in vehicle_data_list: # 2. Itera sobre los datos
-            v_type = v_data.get('vehicle_type')
-            if v_type in vehicle_classes:
-                cls = vehicle_classes[v_type]
-                
-                # --- Lógica de reconstrucción (la misma que ya tenías) ---
-                g_x = v_data['gx']
-                g_y = v_data['gy']
-                # Ya no necesitamos calcular p_x, p_y aquí, pasamos gx, gy directamente
-                
-                new_v = cls(v_data['id'], g_x, g_y, 
-                            v_data['base_position_pixels'], v_data['color'])
-
-                new_v.trips_left = v_data.get('trips_left', 1)
-                new_v.alive = v_data.get('alive', True)
-                new_v.score = v_data.get('score', 0)
-                new_v.returning_to_base = v_data.get('returning_to_base', False)
-                new_v.at_base = v_data.get('at_base', False)
-                new_v.forced_return = v_data.get('forced_return', False)
-                new_v.speed_pixels_per_update = v_data.get('speed_pixels_per_update', 1.5)
-
-                new_v.cargo = []
-                for item_type in v_data.get('cargo', []):
-                    if item_type == 'person':
-                        p_obj = Person(0,0)
-                        p_obj.value = constants.POINTS_PERSON
-                        new_v.cargo.append(p_obj) 
-                    elif item_type in constants.MERCH_POINTS:
-                        m_obj = Merchandise(0,0, item_type)
-                        m_obj.value = constants.MERCH_POINTS.get(item_type, 0)
-                        new_v.cargo.append(m_obj)
-                
-                # Restaurar el "cerebro" (usa STRATEGY_MAP, que es global)
-                strategy_name = v_data.get('strategy_name')
-                if strategy_name in STRATEGY_MAP:
-                    new_v.strategy = STRATEGY_MAP[strategy_name]()
-                else:
-                    new_v.strategy = None
-                
-                rebuilt_fleet.append(new_v) # 3. Añade el vehículo a la NUEVA lista
-        
-        return rebuilt_fleet # 4. Devuelve la flota completa    
+
+    # Núcleo headless de la partida: la UI solo lo maneja y lo dibuja
+    sim = Simulation(db=db, record_replay=True)
+    world = sim.world
+    player1_vehicles = sim.player1_vehicles
+    player2_vehicles = sim.player2_vehicles
+
+    # Bases (en píxeles), las mismas que usa el mundo
+    base1_x, base1_y = world.base1_pos
+    base2_x, base2_y = world.base2_pos
 
     current_state = GameState.PREPARATION
-    game_time = 0
     file_menu_cache = [] # Lista genérica para guardar archivos (partidas O replays)
     file_menu_buttons = [] # Lista genérica para los rects de los botones
     file_menu_scroll_offset = 0
     previous_state = GameState.PREPARATION # Para saber a dónde volver
     
+    # Avance rápido: índice en SPEED_LEVELS y en RENDER_EVERY_OPTIONS
+    speed_index = 0
+    render_every_index = 0
+    frame_counter = 0
+
     # Variables para el REPLAY
-    replay_buffer = [] # Aquí se guardan las "fotos" de la simulación
     replay_data = [] # Aquí se guarda el replay que estamos VIENDO
     current_replay_frame = 0 # El "cabezal" de la reproducción
     
     stats_data = [] # Para guardar los datos de la DB
     stats_menu_buttons = [] # Para los clics
     stats_scroll_offset = 0
-    stats_saved_this_game = False # Flag para evitar guardar 60 veces por segundo
     
     #Definición de las áreas de los botones
     btn_height = 50
@@ -270,44 +149,27 @@ def main():
     btn_replay = pygame.Rect(constants.WIDTH - 220, btn_y, btn_width_large, btn_height)
     btn_stats = pygame.Rect(constants.WIDTH - 130, btn_y, btn_width_large, btn_height)
 
-    # Efectos de partículas
-    particles = []
-
+    # Efectos de partículas (en el sistema de efectos del mundo)
     def create_explosion(x, y, color):
         """Crea partículas de explosión"""
-        for _ in range(15):
-            angle = math.radians(pygame.time.get_ticks() % 360)
-            speed = 2 + (pygame.time.get_ticks() % 3)
-            particles.append({
-                'x': x,
-                'y': y,
-                'vx': math.cos(angle) * speed,
-                'vy': math.sin(angle) * speed,
-                'color': color,
-                'life': 30
-            })
+        angle = math.radians(pygame.time.get_ticks() % 360)
+        speed = 2 + (pygame.time.get_ticks() % 3)
+        world.effects.emit_particles(x, y, color, math.cos(angle) * speed,
+                                     math.sin(angle) * speed, count=15)
+
+    # Las explosiones del núcleo se muestran como partículas
+    sim.on_explosion = create_explosion
 
     def update_particles():
         """Actualiza y dibuja partículas"""
-        for particle in particles[:]:
-            particle['x'] += particle['vx']
-            particle['y'] += particle['vy']
-            particle['life'] -= 1
-            
-            if particle['life'] <= 0:
-                particles.remove(particle)
-            else:
-                alpha = int(255 * (particle['life'] / 30))
-                size = max(1, particle['life'] // 10)
-                color = particle['color'] + (alpha,)
-                pygame.draw.circle(screen, color, 
-                                 (int(particle['x']), int(particle['y'])), size)
+        world.effects.update_particles()
+        world.effects.draw_particles(screen)
 
     def draw_bases():
         """Dibuja zonas de base mejoradas"""
         # Base 1 - Rojo
         # Efecto de pulso
-        pulse = abs(math.sin(game_time * 0.05)) * 10 + 45
+        pulse = abs(math.sin(sim.game_time * 0.05)) * 10 + 45
         
         # Círculos concéntricos
         pygame.draw.circle(screen, (220, 20, 20, 30), (base1_x, base1_y), int(pulse + 20), 2)
@@ -475,317 +337,42 @@ def main():
             pygame.draw.rect(surface, (60, 70, 80), btn_close_rect, border_radius=5)
         draw_button_text(surface, "Cerrar", btn_close_rect)
     
-    # Variables para efectos
-    last_p1_alive = 10
-    last_p2_alive = 10
-
     def get_full_game_state():
-        """
-        Recopila el estado de todos los objetos del juego y lo empaqueta.
-        """
-        # 1. Guardar el estado de todos los vehículos
-        p1_vehicles_state = [v.get_state() for v in player1_vehicles]
-        p2_vehicles_state = [v.get_state() for v in player2_vehicles]
-        
-        # 2. Guardar el estado del mundo (minas, recursos, etc.)
-        world_state = world.get_state()  # Llama al get_state() de world
-        
-        # 3. Empaquetar todo en un solo diccionario
-        game_state_data = {
-            "game_time": game_time,
-            "world": world_state,
-            "player1_vehicles": p1_vehicles_state,
-            "player2_vehicles": p2_vehicles_state
-        }
-        return game_state_data
-
+        return sim.get_full_game_state()
 
     def get_lightweight_state():
-        """
-        Guarda solo las posiciones y estados básicos de los vehículos.
-        Ideal para avanzar/retroceder rápido sin recargar todo el mundo.
-        """
-        return {
-            "p1": [
-                {"x": v.x, "y": v.y, "alive": v.alive, "score": v.score}
-                for v in player1_vehicles
-            ],
-            "p2": [
-                {"x": v.x, "y": v.y, "alive": v.alive, "score": v.score}
-                for v in player2_vehicles
-            ]
-        }
-        
-    def _rebuild_fleet(vehicle_data_list):
-        """
-        Función genérica para reconstruir una flota (lista de vehículos)
-        a partir de sus datos guardados.
-        """
-        rebuilt_fleet = [] # 1. Crea una lista vacía
-        # Diccionario para recrear vehículos por su tipo
-        vehicle_classes = {
-            "jeep": Jeep,
-            "moto": Moto,
-            "camion": Camion,
-            "auto": Auto
-        }
-        for v_data in vehicle_data_list: # 2. Itera sobre los datos
-            v_type = v_data.get('vehicle_type')
-            if v_type in vehicle_classes:
-                cls = vehicle_classes[v_type]
-                
-                # Lógica de reconstrucción
-                g_x = v_data['gx']
-                g_y = v_data['gy']
-                # CORRECCIÓN: Pasamos gx, gy directamente al constructor del vehículo.
-                new_v = cls(v_data['id'], g_x, g_y,
-                            v_data['base_position_pixels'], v_data['color'])
-
-                new_v.trips_left = v_data.get('trips_left', 1)
-                new_v.alive = v_data.get('alive', True)
-                new_v.score = v_data.get('score', 0)
-                new_v.returning_to_base = v_data.get('returning_to_base', False)
-                new_v.at_base = v_data.get('at_base', False)
-                new_v.forced_return = v_data.get('forced_return', False)
-                new_v.speed_pixels_per_update = v_data.get('speed_pixels_per_update', 1.5)
-
-                new_v.cargo = []
-                for item_type in v_data.get('cargo', []):
-                    if item_type == 'person':
-                        p_obj = Person(0,0)
-                        p_obj.value = constants.POINTS_PERSON
-                        new_v.cargo.append(p_obj) 
-                    elif item_type in constants.MERCH_POINTS:
-                        m_obj = Merchandise(0,0, item_type)
-                        m_obj.value = constants.MERCH_POINTS.get(item_type, 0)
-                        new_v.cargo.append(m_obj)
-                
-                # Restaurar el "cerebro"
-                strategy_name = v_data.get('strategy_name')
-                if strategy_name in STRATEGY_MAP:
-                    new_v.strategy = STRATEGY_MAP[strategy_name]()
-                else:
-                    new_v.strategy = None
-                
-                rebuilt_fleet.append(new_v) # 3. Añade el vehículo a la NUEVA lista
-        
-        return rebuilt_fleet # 4. Devuelve la flota completa    
+        return sim.get_lightweight_state()
 
     def load_game_from_data(data):
-        """
-        Restaura el estado del juego desde un diccionario.
-        Si el frame es 'liviano', solo actualiza posiciones y puntajes.
-        Si es completo, reconstruye todo el mundo.
-        """
-        nonlocal game_time, current_state
-
-        # --- Caso 1: Frame liviano (replay rápido) ---
-        if "p1" in data and "p2" in data:
-            for v, d in zip(player1_vehicles, data["p1"]):
-                v.x = d["x"]
-                v.y = d["y"]
-                v.alive = d.get("alive", True)
-                v.score = d.get("score", 0)
-            for v, d in zip(player2_vehicles, data["p2"]):
-                v.x = d["x"]
-                v.y = d["y"]
-                v.alive = d.get("alive", True)
-                v.score = d.get("score", 0)
-            return  # listo, no se recarga el mundo
-
-        # --- Caso 2: Frame completo (carga total) ---
-        world.load_state(data['world'])
-
-        player1_vehicles.clear()
-        player2_vehicles.clear()
-        player1_vehicles.extend(_rebuild_fleet(data.get('player1_vehicles', [])))
-        player2_vehicles.extend(_rebuild_fleet(data.get('player2_vehicles', [])))
-
-        world.vehicles = player1_vehicles + player2_vehicles
-        world.player1_vehicles = player1_vehicles
-        world.player2_vehicles = player2_vehicles
-
-        game_time = data.get('game_time', 0)
-
-
-    def handle_mine_explosion(mine):
-        """
-        Gestiona la lógica completa de la explosión de una mina,
-        afectando a toda el área y a todas las entidades.
-        """
-        print(f"¡BOOM! Mina {mine.type} explotó en ({mine.x}, {mine.y})")
-        create_explosion(mine.x, mine.y, (255, 100, 0))
-
-        # 1. Encontrar todas las celdas afectadas por el radio
-        affected_cells = set() # Usar un set para evitar duplicados
-        center_gx, center_gy = world.pixel_to_cell(mine.x, mine.y)
-        radius_in_cells = math.ceil(mine.radius / constants.TILE)
-
-        for gy_offset in range(-radius_in_cells, radius_in_cells + 1):
-            for gx_offset in range(-radius_in_cells, radius_in_cells + 1):
-                gx, gy = center_gx + gx_offset, center_gy + gy_offset
-                
-                if 0 <= gx < constants.GRID_WIDTH and 0 <= gy < constants.GRID_HEIGHT:
-                    px, py = world.cell_to_pixel_center(gx, gy)
-                    if mine.check_collision(px, py):
-                        affected_cells.add((gx, gy))
-
-        # 2. Identificar todas las entidades a ser destruidas
-        vehicles_to_kill = []
-        for v in world.vehicles:
-            if v.alive and (v.gx, v.gy) in affected_cells:
-                vehicles_to_kill.append(v)
-
-        resources_to_remove = []
-        for r in world.resources:
-            res_gx, res_gy = world.pixel_to_cell(r.x, r.y)
-            if (res_gx, res_gy) in affected_cells:
-                resources_to_remove.append(r)
-
-        # 3. Destruir las entidades identificadas
-        for v in vehicles_to_kill:
-            v.die()
-            create_explosion(v.x, v.y, v.color)
-
-        for r in resources_to_remove:
-            world.remove_resource(r)
-
-        # 4. Limpiar la grid y añadir efectos de fuego
-        for gx, gy in affected_cells:
-            world.grid[gy][gx] = 0 # Asegura que la celda quede vacía
-            fire_x, fire_y = world.cell_to_pixel(gx, gy)
-            world.effects.append(FireEffect(fire_x, fire_y))
-
-        # 5. Desactivar la mina
-        mine.active = False
+        sim.load_game_from_data(data)
 
     def run_game_logic_tick():
         """
-        Ejecuta UN SOLO fotograma (tick) de la lógica del juego.
+        Avanza UN tick del núcleo de simulación y lo guarda en el historial.
         Devuelve True si ocurrió un evento lógico, False si solo fue animación.
         """
-        nonlocal game_time, current_state, stats_saved_this_game, replay_buffer
-        nonlocal last_p1_alive, last_p2_alive
-        
-        a_logical_update_happened = False
-        game_time += 1
-        
-        if world.update_g1_mines():
-             a_logical_update_happened = True
-
-        for effect in world.effects[:]:
-            if not effect.update():
-                world.effects.remove(effect)
-
-        # 1. LÓGICA DE FIN DE JUEGO (RECURSOS)
-        if len(world.resources) == 0 and not hasattr(world, 'ending_phase'):
-            a_logical_update_happened = True
-            world.ending_phase = True
-            world.ending_timer = 0
-            for vehicle in world.vehicles:
-                if vehicle.alive:
-                    vehicle.force_return_to_base()
-        
-        if hasattr(world, 'ending_phase') and world.ending_phase:
-            world.ending_timer += 1
-            all_at_base = all(v.at_base or not v.alive for v in world.vehicles)
-            
-            if all_at_base or world.ending_timer > 300: 
-                if not stats_saved_this_game:
-                    p1_score = sum(v.score for v in player1_vehicles)
-                    p2_score = sum(v.score for v in player2_vehicles)
-                    
-                    p1_alive = sum(1 for v in player1_vehicles if v.alive)
-                    p2_alive = sum(1 for v in player2_vehicles if v.alive)
-
-                    winner = "Empate"
-                    if p1_alive == 0 and p2_alive > 0:
-                        winner = "Jugador 2"
-                    elif p2_alive == 0 and p1_alive > 0:
-                        winner = "Jugador 1"
-                    elif p1_score > p2_score: 
-                        winner = "Jugador 1"
-                    elif p2_score > p1_score: 
-                        winner = "Jugador 2"
-
-                    db.save_match_result(winner, p1_score, p2_score)
-                    stats_saved_this_game = True
-                
-                if replay_buffer:
-                    replay_name = f"Replay_{datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.pkl"
-                    try:
-                        with open(replay_name, 'wb') as f: pickle.dump(replay_buffer, f)
-                    except Exception as e: print(f"Error al guardar el replay: {e}")
-                    replay_buffer.clear()
-                
-                current_state = GameState.GAME_OVER
-                return True
-
-        # 2. COLISIONES CON MINAS
-        mines_to_explode = []
-        for mine in world.mines:
-            if not mine.active: continue
-            mine_gx, mine_gy = world.pixel_to_cell(mine.x, mine.y)
-            for v in world.vehicles:
-                if v.alive and v.gx == mine_gx and v.gy == mine_gy:
-                    if mine not in mines_to_explode:
-                        mines_to_explode.append(mine)
-                    break 
-        
-        if mines_to_explode:
-            a_logical_update_happened = True
-            for mine in mines_to_explode:
-                handle_mine_explosion(mine)
-            world.mines = [m for m in world.mines if m.active]
+        nonlocal current_state
+
+        a_logical_update_happened = sim.step()
+        if sim.game_over:
+            current_state = GameState.GAME_OVER
+            return True
 
-        # 3. ACTUALIZAR VEHÍCULOS
-        for vehicle in world.vehicles:
-            if vehicle.alive:
-                if vehicle.update(world):
-                    a_logical_update_happened = True 
-        
-        # 4. COLISIONES FÍSICAS (ENEMIGOS)
-        for v1 in player1_vehicles:
-            if not v1.alive: continue
-            v1_at_base = (v1.gx == v1.base_gx and v1.gy == v1.base_gy)
-            for v2 in player2_vehicles:
-                if not v2.alive: continue
-                if v1.gx == v2.gx and v1.gy == v2.gy:
-                    v2_at_base = (v2.gx == v2.base_gx and v2.gy == v2.base_gy)
-                    if not v1_at_base and not v2_at_base:
-                        a_logical_update_happened = True
-                        create_explosion(v1.x, v1.y, (255, 128, 0)) 
-                        v1.die()
-                        v2.die()
-
-        # 5. DETECTAR DESTRUCCIONES (para efectos visuales)
-        p1_alive_now = sum(1 for v in player1_vehicles if v.alive)
-        p2_alive_now = sum(1 for v in player2_vehicles if v.alive)
-        if p1_alive_now < last_p1_alive or p2_alive_now < last_p2_alive:
-            a_logical_update_happened = True
-        last_p1_alive = p1_alive_now
-        last_p2_alive = p2_alive_now
-        
-        # LÓGICA DE FIN DE JUEGO POR ANIQUILACIÓN
-        if (p1_alive_now == 0 or p2_alive_now == 0) and not hasattr(world, 'ending_phase'):
-            a_logical_update_happened = True
-            world.ending_phase = True
-            world.ending_timer = 301 # Forzar fin inmediato en el siguiente ciclo
-        
-        # 6. GRABAR FOTOGRAMA PARA REPLAY
-        if a_logical_update_happened:
-            try:
-                replay_buffer.append(get_full_game_state())
-            except Exception as e:
-                print(f"Error al grabar fotograma de replay: {e}")
-        
         try:
             frame_history.append(get_full_game_state())
-            current_frame_index = len(frame_history) - 1
         except Exception as e:
             print(f"Error al guardar frame del historial: {e}")
 
         return a_logical_update_happened
+
+    def record_played_tick(_logical=True):
+        """Historial de un tick jugado en modo PLAYING (ver record_history)."""
+        nonlocal current_frame_index
+        try:
+            record_history(frame_history, sim)
+            current_frame_index = len(frame_history) - 1
+        except Exception as e:
+            print(f"Error guardando frame: {e}")
     
     while True:
         
@@ -852,11 +439,10 @@ def main():
                     # --- Lógica del panel de control (en juego o replay) ---
                     elif current_state != GameState.GAME_OVER:
                         if btn_init.collidepoint(pos) and current_state == GameState.PREPARATION:
-                            world.initialize_map_elements()
+                            sim.initialize_map()
                             frame_history.clear()
                             frame_history.append(get_full_game_state())
                             current_frame_index = 0
-                            stats_saved_this_game = False
                         
                         elif btn_play.collidepoint(pos) and play_enabled:
                             if current_state == GameState.REPLAY_PAUSED:
@@ -906,6 +492,11 @@ def main():
                             if current_state == GameState.PAUSED:
                                 if current_frame_index > 0:
                                     current_frame_index = max(0, current_frame_index - 10)
+                                    # Se prefiere el estado completo más cercano hacia atrás
+                                    # (restaura también carga, recursos, minas y grid)
+                                    full_index = nearest_full_frame(frame_history, current_frame_index)
+                                    if full_index is not None:
+                                        current_frame_index = full_index
                                     print(f"Retrocediendo al frame {current_frame_index}")
                                     frame_data = frame_history[current_frame_index]
 
@@ -993,32 +584,30 @@ def main():
                         elif event.key == pygame.K_UP:
                             file_menu_scroll_offset = max(0, file_menu_scroll_offset - 1)
 
-                elif current_state == GameState.PLAYING:
-                    if event.key == pygame.K_i:
+                elif current_state in (GameState.PLAYING, GameState.PAUSED):
+                    if event.key == pygame.K_i and current_state == GameState.PLAYING:
                         world.relocate_g1_mines()
+                    elif event.key == pygame.K_f: # Velocidad: x1, x4, x16, máx
+                        speed_index = (speed_index + 1) % len(constants.SPEED_LEVELS)
+                    elif event.key == pygame.K_n: # Dibujar uno de cada N frames
+                        render_every_index = (render_every_index + 1) % len(constants.RENDER_EVERY_OPTIONS)
                 
                 elif current_state == GameState.GAME_OVER:
                     if event.key == pygame.K_r:
                         main()
                         return
 
+        # Con "dibujar uno de cada N" los demás frames solo corren la lógica
+        frame_counter += 1
+        render_every = constants.RENDER_EVERY_OPTIONS[render_every_index]
+        skip_render = current_state == GameState.PLAYING and frame_counter % render_every != 0
+
         # Lógica del juego
         if current_state == GameState.PLAYING:
-            # Ejecutar la lógica normal
-            run_game_logic_tick()
-            
-            # Guardar una captura  del estado del juego
-            try:
-                frame_history.append(get_lightweight_state())
-                current_frame_index = len(frame_history) - 1
-                
-                # Evitar consumir toda la RAM
-                if len(frame_history) > 10000:
-                    frame_history.pop(0)
-                    current_frame_index -= 1
-
-            except Exception as e:
-                print(f"Error guardando frame: {e}")
+            run_frame_logic(sim, constants.SPEED_LEVELS[speed_index], skip_render,
+                            on_tick=record_played_tick)
+            if sim.game_over:
+                current_state = GameState.GAME_OVER
 
                     
         elif current_state == GameState.REPLAYING:
@@ -1094,6 +683,12 @@ def main():
 
                         
 
+        # Los frames sin dibujo también respetan los 60 FPS: dibujar menos no
+        # cambia la velocidad del juego (eso lo decide SPEED_LEVELS)
+        if skip_render:
+            clock.tick(60)
+            continue
+
         # Dibujo
         world.draw(screen)
         draw_bases()
@@ -1106,7 +701,14 @@ def main():
         update_particles()
         
         # HUD moderno
-        world.draw_premium_hud(screen, player1_vehicles, player2_vehicles, game_time)
+        world.draw_premium_hud(screen, player1_vehicles, player2_vehicles, sim.game_time)
+
+        # Indicador de avance rápido
+        if current_state in (GameState.PLAYING, GameState.PAUSED) and (speed_index or render_every_index):
+            speed = constants.SPEED_LEVELS[speed_index]
+            label = f"Vel: {'máx' if speed is None else f'x{speed}'}  |  Dibujo: 1/{render_every}  (F / N)"
+            speed_text = FONT_SMALL.render(label, True, (255, 215, 0))
+            screen.blit(speed_text, speed_text.get_rect(midtop=(constants.WIDTH // 2, 5)))
         
         # Mensaje cuando se terminan los recursos
         if hasattr(world, 'ending_phase') and world.ending_phase:
@@ -1115,7 +717,7 @@ def main():
             banner_y = constants.HEIGHT // 2 - banner_height // 2
             
             # Fondo del banner con animación
-            pulse = abs(math.sin(game_time * 0.15)) * 20 + 200
+            pulse = abs(math.sin(sim.game_time * 0.15)) * 20 + 200
             banner_surf = pygame.Surface((constants.WIDTH, banner_height), pygame.SRCALPHA)
             banner_surf.fill((0, 0, 0, 180))
             screen.blit(banner_surf, (0, banner_y))
@@ -1246,7 +848,7 @@ def main():
             y_start += 30
             stats_font = pygame.font.SysFont("Arial", 16)
             p1_alive = sum(1 for v in player1_vehicles if v.alive)
-            p1_stats = stats_font.render(f"Sobrevivientes: {p1_alive}/10", True, (200, 200, 200))
+            p1_stats = stats_font.render(f"Sobrevivientes: {p1_alive}/{len(player1_vehicles)}", True, (200, 200, 200))
             screen.blit(p1_stats, (constants.WIDTH//2 - 180, y_start))
             
             # Jugador 2
@@ -1259,7 +861,7 @@ def main():
             # Estadísticas J2
             y_start += 30
             p2_alive = sum(1 for v in player2_vehicles if v.alive)
-            p2_stats = stats_font.render(f"Sobrevivientes: {p2_alive}/10", True, (200, 200, 200))
+            p2_stats = stats_font.render(f"Sobrevivientes: {p2_alive}/{len(player2_vehicles)}", True, (200, 200, 200))
             screen.blit(p2_stats, (constants.WIDTH//2 - 180, y_start))
             
             # Diferencia de puntos
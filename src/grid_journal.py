@@ -0,0 +1,35 @@
+#este archivo contiene el registro ("journal") de cambios de la grid del mundo.
+#Toda escritura de la grid pasa por World.set_cell / las operaciones en bloque,
+#que incrementan la versión y anotan (celda, valor_viejo, valor_nuevo) acá.
+#Las estructuras derivadas (campos de distancia, grafo HPA*, aplanado de
+#caminabilidad del A*) recuerdan la versión con la que se calcularon y al
+#usarse consumen solo los cambios posteriores, en vez de recalcularse enteras.
+from collections import deque
+from itertools import islice
+
+
+class GridJournal:
+    """
+    Registro acotado de cambios: cada escritura suma 1 a 'version'.
+
+    - record(cell, old, new) anota un cambio.
+    - since(version) devuelve los cambios posteriores a 'version' como lista
+      de (celda, viejo, nuevo), o None si el registro ya no los tiene
+      (se descartaron por antigüedad): en ese caso hay que reconstruir.
+    """
+
+    def __init__(self, maxlen=4096):
+        self.records = deque(maxlen=maxlen)
+        self.version = 0
+
+    def record(self, cell, old, new):
+        self.version += 1
+        self.records.append((cell, old, new))
+
+    def since(self, version):
+        missing = self.version - version
+        if missing == 0:
+            return []
+        if missing < 0 or missing > len(self.records):
+            return None
+        return list(islice(self.records, len(self.records) - missing, None))
@@ -0,0 +1,294 @@
+#este archivo contiene una capa jerárquica (HPA*) sobre la grid del mundo
+#para mapas grandes. La grid se divide en clusters de cluster_size x cluster_size
+#celdas; entre clusters vecinos se calculan "entradas" (pares de celdas libres a
+#cada lado del borde) y dentro de cada cluster las distancias entre entradas.
+#Una búsqueda primero recorre ese grafo abstracto (pocos nodos) y después
+#refina cada tramo con un BFS limitado a un solo cluster, a demanda.
+import heapq
+from collections import deque
+
+import numpy as np
+
+# Largo a partir del cual una entrada usa dos transiciones (una en cada extremo)
+MAX_SINGLE_TRANSITION = 6
+
+
+class HierarchicalMap:
+    """
+    Grafo abstracto de HPA* sobre una grid (array o lista de listas con los códigos de World).
+
+    - update_cells(cells) actualiza solo los clusters cuyas celdas cambiaron de
+      caminabilidad (y sus vecinos inmediatos, que comparten el borde).
+    - find_path(start, goal) devuelve un camino completo (lista de celdas).
+    - iter_path(start, goal) lo entrega tramo a tramo (refinamiento perezoso).
+    """
+
+    def __init__(self, grid, cluster_size=10):
+        self.height = len(grid)
+        self.width = len(grid[0]) if self.height else 0
+        self.cluster_size = cluster_size
+        self.clusters_x = (self.width + cluster_size - 1) // cluster_size
+        self.clusters_y = (self.height + cluster_size - 1) // cluster_size
+
+        if isinstance(grid, np.ndarray):
+            self.walkable = (grid != 1).ravel().tolist()
+        else:
+            self.walkable = [cell != 1 for row in grid for cell in row]
+        self.border_pairs = {}   # borde -> lista de pares (celda_a, celda_b)
+        self.inter_edges = {}    # nodo -> set de nodos del otro lado de un borde
+        self.intra_edges = {}    # cluster -> {nodo: {nodo: costo}}
+        self.clusters_rebuilt = 0 # Contador para medir cuánto se recalcula
+
+        for border in self._all_borders():
+            self._build_border(border)
+        for cy in range(self.clusters_y):
+            for cx in range(self.clusters_x):
+                self._build_cluster((cx, cy))
+
+    # -------------------------------
+    # Geometría de clusters y bordes
+    # -------------------------------
+
+    def cluster_of(self, idx):
+        return ((idx % self.width) // self.cluster_size, (idx // self.width) // self.cluster_size)
+
+    def _cluster_bounds(self, cluster):
+        cx, cy = cluster
+        cs = self.cluster_size
+        return (cx * cs, cy * cs,
+                min(self.width, (cx + 1) * cs), min(self.height, (cy + 1) * cs))
+
+    def _all_borders(self):
+        for cy in range(self.clusters_y):
+            for cx in range(self.clusters_x):
+                if cx + 1 < self.clusters_x:
+                    yield ("v", cx, cy) # entre (cx, cy) y (cx + 1, cy)
+                if cy + 1 < self.clusters_y:
+                    yield ("h", cx, cy) # entre (cx, cy) y (cx, cy + 1)
+
+    def _cluster_borders(self, cluster):
+        cx, cy = cluster
+        borders = []
+        if cx + 1 < self.clusters_x:
+            borders.append(("v", cx, cy))
+        if cx > 0:
+            borders.append(("v", cx - 1, cy))
+        if cy + 1 < self.clusters_y:
+            borders.append(("h", cx, cy))
+        if cy > 0:
+            borders.append(("h", cx, cy - 1))
+        return borders
+
+    def _border_clusters(self, border):
+        kind, cx, cy = border
+        if kind == "v":
+            return (cx, cy), (cx + 1, cy)
+        return (cx, cy), (cx, cy + 1)
+
+    # -------------------------------
+    # Construcción del grafo abstracto
+    # -------------------------------
+
+    def _build_border(self, border):
+        """Calcula las transiciones de un borde y sus aristas entre clusters."""
+        for a, b in self.border_pairs.get(border, ()):
+            self.inter_edges.get(a, set()).discard(b)
+            self.inter_edges.get(b, set()).discard(a)
+
+        kind, cx, cy = border
+        cs = self.cluster_size
+        width = self.width
+        walkable = self.walkable
+        if kind == "v":
+            x = (cx + 1) * cs - 1
+            cells = [(y * width + x, y * width + x + 1)
+                     for y in range(cy * cs, min(self.height, (cy + 1) * cs))]
+        else:
+            y = (cy + 1) * cs - 1
+            cells = [(y * width + x, (y + 1) * width + x)
+                     for x in range(cx * cs, min(width, (cx + 1) * cs))]
+
+        pairs = []
+        run = []
+        for a, b in cells + [(None, None)]:
+            if a is not None and walkable[a] and walkable[b]:
+                run.append((a, b))
+                continue
+            if run:
+                if len(run) < MAX_SINGLE_TRANSITION:
+                    pairs.append(run[len(run) // 2])
+                else:
+                    pairs.append(run[0])
+                    pairs.append(run[-1])
+                run = []
+
+        self.border_pairs[border] = pairs
+        for a, b in pairs:
+            self.inter_edges.setdefault(a, set()).add(b)
+            self.inter_edges.setdefault(b, set()).add(a)
+
+    def _cluster_nodes(self, cluster):
+        nodes = set()
+        for border in self._cluster_borders(cluster):
+            first, _ = self._border_clusters(border)
+            side = 0 if first == cluster else 1
+            for pair in self.border_pairs.get(border, ()):
+                nodes.add(pair[side])
+        return nodes
+
+    def _bfs(self, source, cluster, target=None):
+        """
+        BFS desde 'source' sin salir de 'cluster'. Devuelve (distancias, padres);
+        si se da 'target' corta apenas lo alcanza.
+        """
+        x0, y0, x1, y1 = self._cluster_bounds(cluster)
+        width = self.width
+        walkable = self.walkable
+        dist = {source: 0}
+        parent = {source: None}
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            if current == target:
+                break
+            x, y = current % width, current // width
+            d = dist[current] + 1
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if x0 <= nx < x1 and y0 <= ny < y1:
+                    n = ny * width + nx
+                    if n not in dist and walkable[n]:
+                        dist[n] = d
+                        parent[n] = current
+                        queue.append(n)
+        return dist, parent
+
+    def _build_cluster(self, cluster):
+        """Distancias (dentro del cluster) entre todas sus entradas."""
+        nodes = self._cluster_nodes(cluster)
+        edges = {}
+        for node in nodes:
+            dist, _ = self._bfs(node, cluster)
+            edges[node] = {other: dist[other] for other in nodes
+                           if other != node and other in dist}
+        self.intra_edges[cluster] = edges
+        self.clusters_rebuilt += 1
+
+    def update_cells(self, cells):
+        """
+        Actualiza el grafo tras cambios en la grid. 'cells' es un iterable de
+        (gx, gy, código_nuevo). Devuelve la cantidad de clusters recalculados.
+        """
+        dirty = set()
+        for gx, gy, value in cells:
+            idx = gy * self.width + gx
+            walk = value != 1
+            if self.walkable[idx] != walk:
+                self.walkable[idx] = walk
+                dirty.add(self.cluster_of(idx))
+        if not dirty:
+            return 0
+
+        borders = set()
+        for cluster in dirty:
+            borders.update(self._cluster_borders(cluster))
+        to_rebuild = set(dirty)
+        for border in borders:
+            self._build_border(border)
+            to_rebuild.update(self._border_clusters(border))
+        for cluster in to_rebuild:
+            self._build_cluster(cluster)
+        return len(to_rebuild)
+
+    # -------------------------------
+    # Búsqueda
+    # -------------------------------
+
+    def _abstract_path(self, start_idx, goal_idx):
+        """A* sobre el grafo abstracto (con inicio y meta insertados)."""
+        width = self.width
+        start_cluster = self.cluster_of(start_idx)
+        goal_cluster = self.cluster_of(goal_idx)
+
+        start_dist, _ = self._bfs(start_idx, start_cluster)
+        start_edges = {n: start_dist[n] for n in self._cluster_nodes(start_cluster) if n in start_dist}
+        if start_cluster == goal_cluster and goal_idx in start_dist:
+            start_edges[goal_idx] = start_dist[goal_idx]
+        goal_dist, _ = self._bfs(goal_idx, goal_cluster)
+        goal_edges = {n: goal_dist[n] for n in self._cluster_nodes(goal_cluster) if n in goal_dist}
+
+        goal_x, goal_y = goal_idx % width, goal_idx // width
+        cost = {start_idx: 0}
+        parent = {start_idx: None}
+        openq = [(0, start_idx)]
+        closed = set()
+        while openq:
+            _, current = heapq.heappop(openq)
+            if current in closed:
+                continue
+            closed.add(current)
+            if current == goal_idx:
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = parent[current]
+                path.reverse()
+                return path
+
+            neighbors = list(self.intra_edges[self.cluster_of(current)].get(current, {}).items())
+            neighbors.extend((n, 1) for n in self.inter_edges.get(current, ()))
+            if current == start_idx:
+                # El inicio puede ser también una entrada: se suman sus aristas
+                # insertadas a las propias, sin perder el cruce al otro cluster
+                neighbors.extend(start_edges.items())
+            if current in goal_edges:
+                neighbors.append((goal_idx, goal_edges[current]))
+
+            for n, step in neighbors:
+                new_cost = cost[current] + step
+                if n not in cost or new_cost < cost[n]:
+                    cost[n] = new_cost
+                    parent[n] = current
+                    h = abs(n % width - goal_x) + abs(n // width - goal_y)
+                    heapq.heappush(openq, (new_cost + h, n))
+        return None
+
+    def _refine(self, a, b):
+        """Camino de celdas entre dos nodos abstractos consecutivos (sin incluir a)."""
+        width = self.width
+        cluster = self.cluster_of(a)
+        if cluster != self.cluster_of(b):
+            return [(b % width, b // width)] # Arista entre clusters: un solo paso
+        _, parent = self._bfs(a, cluster, target=b)
+        segment = []
+        current = b
+        while current != a:
+            segment.append((current % width, current // width))
+            current = parent[current]
+        segment.reverse()
+        return segment
+
+    def iter_path(self, start, goal):
+        """
+        Generador con las celdas del camino (empezando por 'start'). Cada tramo
+        del camino abstracto se refina recién cuando se lo pide. Si no hay
+        camino no produce nada.
+        """
+        if start == goal:
+            # Igual que A*: el camino es solo el inicio, aunque no sea caminable
+            yield start
+            return
+        start_idx = start[1] * self.width + start[0]
+        goal_idx = goal[1] * self.width + goal[0]
+        if not self.walkable[goal_idx]:
+            return
+        abstract = self._abstract_path(start_idx, goal_idx)
+        if abstract is None:
+            return
+        yield start
+        for a, b in zip(abstract, abstract[1:]):
+            yield from self._refine(a, b)
+
+    def find_path(self, start, goal):
+        """Camino completo (lista de celdas, incluye inicio y meta) o None."""
+        path = list(self.iter_path(start, goal))
+        return path or None
@@ -0,0 +1,73 @@
+#este archivo contiene el índice de ocupación de un equipo: qué vehículos
+#están en cada celda y hacia qué celda se mueven. Lo mantiene Vehicle.update
+#(cada vez que cambia gx/gy o current_target_cell) y lo consultan las
+#colisiones entre enemigos, los disparos de minas y los chequeos de aliados,
+#que así pasan a ser búsquedas en un diccionario en vez de recorrer la flota.
+
+
+class OccupancyMap:
+    """
+    Ocupación de un equipo: celda -> vehículos.
+
+    - place(vehicle) registra (o mueve) al vehículo según su gx/gy y su
+      current_target_cell.
+    - vehicles_at(cell) / vehicles_heading(cell) devuelven los vehículos vivos.
+    Los vehículos destruidos se ignoran en las consultas.
+    """
+
+    def __init__(self):
+        self.at = {}       # celda -> lista de vehículos en esa celda
+        self.heading = {}  # celda -> lista de vehículos que se mueven hacia ella
+        self.placed = {}   # vehículo -> (celda, celda destino o None)
+
+    def place(self, vehicle):
+        key = ((vehicle.gx, vehicle.gy), vehicle.current_target_cell)
+        if self.placed.get(vehicle) == key:
+            return
+        self.remove(vehicle)
+        cell, target = key
+        self.at.setdefault(cell, []).append(vehicle)
+        if target is not None:
+            self.heading.setdefault(target, []).append(vehicle)
+        self.placed[vehicle] = key
+
+    def remove(self, vehicle):
+        key = self.placed.pop(vehicle, None)
+        if key is None:
+            return
+        cell, target = key
+        self._discard(self.at, cell, vehicle)
+        if target is not None:
+            self._discard(self.heading, target, vehicle)
+
+    @staticmethod
+    def _discard(index, cell, vehicle):
+        vehicles = index[cell]
+        vehicles.remove(vehicle)
+        if not vehicles:
+            del index[cell]
+
+    def clear(self):
+        self.at.clear()
+        self.heading.clear()
+        self.placed.clear()
+
+    def vehicles_at(self, cell):
+        return [v for v in self.at.get(cell, ()) if v.alive]
+
+    def vehicles_heading(self, cell):
+        return [v for v in self.heading.get(cell, ()) if v.alive]
+
+    def occupied_cells(self, exclude=None, skip=None):
+        """
+        Celdas ocupadas o de destino de los vehículos vivos, salvo 'exclude' y
+        los que están parados en la celda 'skip' (por ejemplo la base).
+        """
+        cells = []
+        for vehicle, (cell, target) in self.placed.items():
+            if vehicle is exclude or not vehicle.alive or cell == skip:
+                continue
+            cells.append(cell)
+            if target is not None:
+                cells.append(target)
+        return cells
@@ -1,5 +1,13 @@
 #este archivo contiene la implementación del algoritmo A* para la búsqueda de caminos
 import heapq #este modulo proporciona una cola de prioridad eficiente
+from collections import OrderedDict
+
+import numpy as np
+
+from . import constants
+from .hierarchical_pathfinding import HierarchicalMap
+
+INF = float("inf")
 
 #estimación heurística (distancia Manhattan que es como una estimacion de que tan lejos esta un punto de otro)
 def heuristic(a, b):
@@ -10,7 +18,11 @@ def heuristic(a, b):
 #|V| = número de celdas
 #|E| = número de conexiones entre celdas
 #Espacio: O(|V|) para almacenar los caminos y costos
-def a_star(start, goal, world):
+def a_star_basic(start, goal, world):
+    """
+    Versión original (con diccionarios y tuplas) de A*.
+    Se mantiene como referencia y para celdas fuera de la grid.
+    """
     # start, goal = (gx, gy)
     openq = [] # Cola de prioridad de celdas a explorar
     heapq.heappush(openq, (0, start))  # Añade punto inicial. Un heap es un árbol binario especial donde cada nodo padre es menor que sus hijos.Complejidad: O(log n) para inserción y extracción
@@ -40,3 +52,1089 @@ def a_star(start, goal, world):
                 came_from[neighbor] = current
     return None
 
+
+class GridPathfinder:
+    """
+    Motor de A* sobre índices planos de celda (idx = gy * width + gx).
+
+    - Los arreglos de costo/padre/cerrado se reservan una sola vez y se "limpian"
+      con un contador de generación: una celda solo es válida si
+      seen[idx] == generation.
+    - Los vecinos de cada celda se precalculan (mismo orden que World.get_neighbors).
+    - El heap guarda un único entero: prioridad * N + clave, donde la clave ordena
+      las celdas como las tuplas (gx, gy). Así el desempate es idéntico al de
+      a_star_basic y el camino devuelto es exactamente el mismo.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.size = size = width * height
+
+        self.xs = [i % width for i in range(size)]
+        self.ys = [i // width for i in range(size)]
+        # Clave de desempate: orden lexicográfico de (gx, gy)
+        self.order_key = [self.xs[i] * height + self.ys[i] for i in range(size)]
+        self.key_to_index = [0] * size
+        for i, k in enumerate(self.order_key):
+            self.key_to_index[k] = i
+
+        # Vecinos precalculados en el orden (1,0), (-1,0), (0,1), (0,-1)
+        self.neighbors = []
+        for i in range(size):
+            x, y = self.xs[i], self.ys[i]
+            nbrs = []
+            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < width and 0 <= ny < height:
+                    nbrs.append(ny * width + nx)
+            self.neighbors.append(tuple(nbrs))
+
+        self.cost = [0] * size
+        self.parent = [-1] * size
+        self.seen = [0] * size
+        self.closed = [0] * size
+        # Lado de la meta de la búsqueda bidireccional (mismo esquema de generación)
+        self._bwd_cost = [0] * size
+        self._bwd_parent = [-1] * size
+        self._bwd_seen = [0] * size
+        self._bwd_closed = [0] * size
+        self.generation = 0
+        self.expanded = 0 # Celdas expandidas en la última búsqueda (para medir)
+
+        # Tablas de JPS, calculadas para un aplanado concreto de la grid
+        self._jps_walkable = None
+        self._jps_tables = None
+
+        # Último aplanado de la grid (ver walkable_flags_for)
+        self._flags = None
+        self._flags_grid = None
+        self._flags_version = None
+
+    def walkable_flags(self, grid):
+        """Aplana la grid a una lista de 0/1 (1 = caminable, todo menos árbol)."""
+        if isinstance(grid, np.ndarray):
+            return (grid != 1).ravel().tolist()
+        return [cell != 1 for row in grid for cell in row]
+
+    def walkable_flags_for(self, world):
+        """
+        Igual que walkable_flags, pero reutiliza el resultado anterior si la
+        grid es la misma y su grid_version no cambió. Si el mundo tiene journal
+        de cambios (World.journal) se aplican solo las celdas modificadas.
+        """
+        version = getattr(world, "grid_version", None)
+        grid = world.grid
+        if version is None:
+            return self.walkable_flags(grid)
+        if grid is self._flags_grid and version != self._flags_version:
+            # Con journal de cambios solo se miran las celdas escritas desde
+            # la última vez, en lugar de volver a aplanar toda la grid
+            journal = getattr(world, "journal", None)
+            changes = journal.since(self._flags_version) if journal is not None else None
+            if changes is not None:
+                flags = self._flags
+                width = self.width
+                for (gx, gy), _, value in changes:
+                    idx = gy * width + gx
+                    walk = value != 1
+                    if flags[idx] != walk:
+                        if flags is self._flags:
+                            flags = list(flags) # Copia: la lista anterior no se modifica
+                        flags[idx] = walk
+                self._flags = flags
+                self._flags_version = version
+        if grid is not self._flags_grid or version != self._flags_version:
+            flags = self.walkable_flags(grid)
+            # Si la caminabilidad no cambió (por ejemplo se recogió un recurso)
+            # se conserva la misma lista, y con ella las tablas que dependen de ella
+            if flags != self._flags:
+                self._flags = flags
+            self._flags_grid = grid
+            self._flags_version = version
+        return self._flags
+
+    def _trace(self, current, parent):
+        """Celdas desde 'current' hasta el inicio de su búsqueda siguiendo 'parent'."""
+        xs = self.xs
+        ys = self.ys
+        cells = []
+        while current != -1:
+            cells.append((xs[current], ys[current]))
+            current = parent[current]
+        return cells
+
+    def _path_to(self, current):
+        """Camino (del inicio a 'current') de la última búsqueda hacia adelante."""
+        path = self._trace(current, self.parent)
+        path.reverse()
+        return path
+
+    def _expand(self, start_idx, walkable, targets, goal=None, danger=None, weight=0):
+        """
+        Bucle común de search, search_weighted y search_many: expande desde
+        'start_idx' hasta cerrar todas las celdas del conjunto 'targets' (que
+        se vacía) o quedarse sin frontera.
+
+        - Con 'goal' (gx, gy) es A* con heurística Manhattan (consistente: la
+          primera expansión de cada celda es óptima); sin él, Dijkstra.
+        - Con 'danger', entrar a la celda n cuesta 1 + weight * danger[n]; la
+          heurística sigue siendo admisible porque todo paso cuesta >= 1.
+        Devuelve la generación usada: closed[idx] == gen si idx se alcanzó.
+        """
+        size = self.size
+        self.generation += 1
+        gen = self.generation
+        cost = self.cost
+        parent = self.parent
+        seen = self.seen
+        closed = self.closed
+        xs = self.xs
+        ys = self.ys
+        order_key = self.order_key
+        key_to_index = self.key_to_index
+        neighbors = self.neighbors
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        guided = goal is not None
+        goal_x, goal_y = goal if guided else (0, 0)
+        weighted = danger is not None
+
+        seen[start_idx] = gen
+        cost[start_idx] = 0
+        parent[start_idx] = -1
+        openq = [order_key[start_idx]]
+        expanded = 0
+
+        while openq and targets:
+            current = key_to_index[heappop(openq) % size]
+            # Entrada vieja del heap: la celda ya se expandió
+            if closed[current] == gen:
+                continue
+            closed[current] = gen
+            expanded += 1
+            targets.discard(current)
+
+            base_cost = cost[current] + 1
+            for n in neighbors[current]:
+                if not walkable[n] or closed[n] == gen:
+                    continue
+                new_cost = base_cost + weight * danger[n] if weighted else base_cost
+                if seen[n] != gen or new_cost < cost[n]:
+                    seen[n] = gen
+                    cost[n] = new_cost
+                    parent[n] = current
+                    if guided:
+                        new_cost += abs(xs[n] - goal_x) + abs(ys[n] - goal_y)
+                    heappush(openq, new_cost * size + order_key[n])
+        self.expanded = expanded
+        return gen
+
+    def search(self, start, goal, walkable):
+        """A* entre dos celdas (gx, gy). Devuelve la lista de celdas o None."""
+        width = self.width
+        goal_idx = goal[1] * width + goal[0]
+        gen = self._expand(start[1] * width + start[0], walkable, {goal_idx}, goal)
+        return self._path_to(goal_idx) if self.closed[goal_idx] == gen else None
+
+    def search_weighted(self, start, goal, walkable, danger, weight):
+        """A* con pesos: entrar a la celda n cuesta 1 + weight * danger[n]."""
+        width = self.width
+        goal_idx = goal[1] * width + goal[0]
+        gen = self._expand(start[1] * width + start[0], walkable, {goal_idx}, goal, danger, weight)
+        return self._path_to(goal_idx) if self.closed[goal_idx] == gen else None
+
+    def search_many(self, start, goals, walkable, danger=None, weight=0):
+        """
+        Caminos desde 'start' hasta varias metas con UNA sola búsqueda
+        (Dijkstra que se detiene al cerrar todas las metas). Con 'danger' usa
+        los mismos costos que search_weighted. Devuelve {meta: camino o None}.
+        """
+        width = self.width
+        indices = {goal: goal[1] * width + goal[0] for goal in goals}
+        gen = self._expand(start[1] * width + start[0], walkable, set(indices.values()),
+                           None, danger, weight)
+        closed = self.closed
+        return {goal: self._path_to(idx) if closed[idx] == gen else None
+                for goal, idx in indices.items()}
+
+    def search_bidirectional(self, start, goal, walkable):
+        """
+        A* bidireccional con potenciales promedio: p(v) = (h_meta(v) - h_inicio(v)) / 2
+        para la búsqueda hacia adelante y -p(v) para la de atrás. Así las dos
+        búsquedas ven los mismos costos reducidos (no negativos) y se puede
+        usar la regla de corte de Dijkstra bidireccional: ningún camino más
+        barato que (tope_adelante + tope_atrás) / 2 quedó sin ver, y como en la
+        grid todos los caminos tienen la paridad de mu, alcanza con que ese
+        valor supere mu - 2. Siempre se expande la frontera con el tope más chico.
+        Las claves se guardan multiplicadas por 2 para trabajar con enteros.
+        """
+        width = self.width
+        size = self.size
+        start_idx = start[1] * width + start[0]
+        goal_idx = goal[1] * width + goal[0]
+        if start_idx == goal_idx:
+            self.expanded = 1
+            return [start]
+        if not walkable[goal_idx]:
+            self.expanded = 0
+            return None
+
+        self.generation += 1
+        gen = self.generation
+        xs = self.xs
+        ys = self.ys
+        order_key = self.order_key
+        key_to_index = self.key_to_index
+        neighbors = self.neighbors
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        sx, sy = start
+        gx, gy = goal
+        # Desplazamiento para que las claves (2g + h_meta - h_inicio) no sean negativas
+        offset = abs(sx - gx) + abs(sy - gy)
+
+        # Lado 0: desde el inicio. Lado 1: desde la meta (signo del potencial invertido).
+        costs = (self.cost, self._bwd_cost)
+        parents = (self.parent, self._bwd_parent)
+        seens = (self.seen, self._bwd_seen)
+        closeds = (self.closed, self._bwd_closed)
+        signs = (1, -1)
+        # Clave inicial de ambos extremos: 2*0 + potencial (= offset) + offset
+        # Entre claves iguales se prefiere el g más grande (más cerca de la otra frontera)
+        span = (size + 1) * size
+        openqs = ([2 * offset * span + size * size + order_key[start_idx]],
+                  [2 * offset * span + size * size + order_key[goal_idx]])
+        for side, idx in ((0, start_idx), (1, goal_idx)):
+            seens[side][idx] = gen
+            costs[side][idx] = 0
+            parents[side][idx] = -1
+
+        best = INF
+        meet = -1
+        expanded = 0
+        while True:
+            # Descartar entradas viejas (celdas ya cerradas) del tope de cada heap
+            for side in (0, 1):
+                openq = openqs[side]
+                closed = closeds[side]
+                while openq and closed[key_to_index[openq[0] % size]] == gen:
+                    heappop(openq)
+            if not openqs[0] or not openqs[1]:
+                break
+            top0 = openqs[0][0] // span - offset
+            top1 = openqs[1][0] // span - offset
+            # En la grid 4-conexa todos los caminos entre dos celdas tienen la
+            # misma paridad: el siguiente candidato posible cuesta best - 2
+            if top0 + top1 > 2 * best - 4:
+                break
+
+            side = 0 if top0 <= top1 else 1
+            openq = openqs[side]
+            cost = costs[side]
+            parent = parents[side]
+            seen = seens[side]
+            other_cost = costs[1 - side]
+            other_seen = seens[1 - side]
+            sign = signs[side]
+
+            current = key_to_index[heappop(openq) % size]
+            closeds[side][current] = gen
+            expanded += 1
+            # Desde la meta no se sigue más allá de un inicio no caminable
+            if side == 1 and not walkable[current]:
+                continue
+
+            new_cost = cost[current] + 1
+            for n in neighbors[current]:
+                # Todas las celdas del camino deben ser caminables salvo el inicio
+                if not walkable[n] and (side == 0 or n != start_idx):
+                    continue
+                if seen[n] != gen or new_cost < cost[n]:
+                    seen[n] = gen
+                    cost[n] = new_cost
+                    parent[n] = current
+                    nx, ny = xs[n], ys[n]
+                    potential = sign * (abs(nx - gx) + abs(ny - gy) - abs(nx - sx) - abs(ny - sy))
+                    heappush(openq, (2 * new_cost + potential + offset) * span
+                             + (size - new_cost) * size + order_key[n])
+                    if other_seen[n] == gen and new_cost + other_cost[n] < best:
+                        best = new_cost + other_cost[n]
+                        meet = n
+        self.expanded = expanded
+
+        if meet == -1:
+            return None
+        # Del inicio al punto de encuentro, y de ahí a la meta por el lado de atrás
+        path = self._path_to(meet)
+        path.extend(self._trace(self._bwd_parent[meet], self._bwd_parent))
+        return path
+
+    # -------------------------------
+    # Jump Point Search (grid 4-conexa, costo uniforme)
+    # -------------------------------
+    # Orden canónico: los movimientos horizontales hacen el papel de las
+    # diagonales del JPS clásico (en cada paso abren exploraciones verticales)
+    # y los verticales el de los movimientos rectos (solo giran en vecinos
+    # "forzados": celda lateral libre cuya celda lateral de atrás está bloqueada).
+    # Solo se meten al heap los puntos de salto, no cada celda del camino.
+    #
+    # Los saltos no recorren la grid celda por celda: se precalculan (una vez
+    # por grid, estilo JPS+) el próximo punto de salto y el alcance en cada
+    # dirección, así que cada salto cuesta O(1).
+
+    def _jump_tables(self, walkable):
+        """Tablas de salto para 'walkable' (se reutilizan mientras no cambie)."""
+        if self._jps_walkable is walkable:
+            return self._jps_tables
+
+        width = self.width
+        height = self.height
+        size = self.size
+        reach_down = [0] * size
+        reach_up = [0] * size
+        next_down = [-1] * size
+        next_up = [-1] * size
+        reach_right = [0] * size
+        reach_left = [0] * size
+        next_right = [-1] * size
+        next_left = [-1] * size
+
+        for x in range(width):
+            has_left = x > 0
+            has_right = x < width - 1
+            # Hacia abajo (dy = +1): se recorre la columna de abajo hacia arriba
+            reach_down[(height - 1) * width + x] = height - 1
+            for y in range(height - 2, -1, -1):
+                idx = y * width + x
+                c = idx + width
+                if walkable[c]:
+                    reach_down[idx] = reach_down[c]
+                    if ((has_left and walkable[c - 1] and not walkable[idx - 1]) or
+                            (has_right and walkable[c + 1] and not walkable[idx + 1])):
+                        next_down[idx] = c
+                    else:
+                        next_down[idx] = next_down[c]
+                else:
+                    reach_down[idx] = y
+            # Hacia arriba (dy = -1)
+            reach_up[x] = 0
+            for y in range(1, height):
+                idx = y * width + x
+                c = idx - width
+                if walkable[c]:
+                    reach_up[idx] = reach_up[c]
+                    if ((has_left and walkable[c - 1] and not walkable[idx - 1]) or
+                            (has_right and walkable[c + 1] and not walkable[idx + 1])):
+                        next_up[idx] = c
+                    else:
+                        next_up[idx] = next_up[c]
+                else:
+                    reach_up[idx] = y
+
+        for y in range(height):
+            row = y * width
+            # Una celda de la fila es punto de salto horizontal si alguna
+            # exploración vertical desde ella encuentra un punto de salto
+            reach_right[row + width - 1] = width - 1
+            for x in range(width - 2, -1, -1):
+                idx = row + x
+                c = idx + 1
+                if walkable[c]:
+                    reach_right[idx] = reach_right[c]
+                    next_right[idx] = c if (next_down[c] != -1 or next_up[c] != -1) else next_right[c]
+                else:
+                    reach_right[idx] = x
+            reach_left[row] = 0
+            for x in range(1, width):
+                idx = row + x
+                c = idx - 1
+                if walkable[c]:
+                    reach_left[idx] = reach_left[c]
+                    next_left[idx] = c if (next_down[c] != -1 or next_up[c] != -1) else next_left[c]
+                else:
+                    reach_left[idx] = x
+
+        self._jps_walkable = walkable
+        self._jps_tables = (reach_down, reach_up, next_down, next_up,
+                            reach_right, reach_left, next_right, next_left)
+        return self._jps_tables
+
+    def search_jps(self, start, goal, walkable):
+        """
+        Jump Point Search entre dos celdas (gx, gy). Devuelve un camino de largo
+        óptimo (el mismo largo que search, aunque puede elegir otro desempate)
+        o None si no hay camino.
+        """
+        width = self.width
+        size = self.size
+        start_idx = start[1] * width + start[0]
+        goal_idx = goal[1] * width + goal[0]
+        goal_x, goal_y = goal
+        (reach_down, reach_up, next_down, next_up,
+         reach_right, reach_left, next_right, next_left) = self._jump_tables(walkable)
+
+        def jump_vertical(idx, y, dy):
+            # Próximo punto de salto en vertical desde idx (o None)
+            if dy > 0:
+                f = next_down[idx]
+                stop = ys[f] if f != -1 else reach_down[idx]
+                if idx % width == goal_x and y < goal_y <= stop:
+                    return goal_idx
+            else:
+                f = next_up[idx]
+                stop = ys[f] if f != -1 else reach_up[idx]
+                if idx % width == goal_x and stop <= goal_y < y:
+                    return goal_idx
+            return f if f != -1 else None
+
+        def jump_horizontal(idx, x, y, dx):
+            # Próximo punto de salto en horizontal desde idx (o None)
+            if dx > 0:
+                f = next_right[idx]
+                stop = xs[f] if f != -1 else reach_right[idx]
+                in_range = x < goal_x <= stop
+            else:
+                f = next_left[idx]
+                stop = xs[f] if f != -1 else reach_left[idx]
+                in_range = stop <= goal_x < x
+            if in_range:
+                # La celda de la columna de la meta es punto de salto si la
+                # meta está en la fila o se alcanza en vertical desde ella
+                g0 = y * width + goal_x
+                if (goal_y == y or y < goal_y <= reach_down[g0] or
+                        reach_up[g0] <= goal_y < y):
+                    if f == -1 or abs(goal_x - x) < abs(xs[f] - x):
+                        return g0
+            return f if f != -1 else None
+
+        self.generation += 1
+        gen = self.generation
+        cost = self.cost
+        parent = self.parent
+        seen = self.seen
+        closed = self.closed
+        xs = self.xs
+        ys = self.ys
+        order_key = self.order_key
+        key_to_index = self.key_to_index
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+
+        seen[start_idx] = gen
+        cost[start_idx] = 0
+        parent[start_idx] = -1
+        openq = [order_key[start_idx]]
+        expanded = 0
+
+        while openq:
+            current = key_to_index[heappop(openq) % size]
+            if closed[current] == gen:
+                continue
+            closed[current] = gen
+            expanded += 1
+
+            if current == goal_idx:
+                self.expanded = expanded
+                return self._unpack_jump_path(current)
+
+            x, y = xs[current], ys[current]
+            p = parent[current]
+            if p == -1:
+                # Inicio: todas las direcciones
+                jumps = (jump_horizontal(current, x, y, 1), jump_horizontal(current, x, y, -1),
+                         jump_vertical(current, y, 1), jump_vertical(current, y, -1))
+            elif ys[p] == y:
+                # Llegamos en horizontal: seguir y abrir ambas verticales
+                dx = 1 if x > xs[p] else -1
+                jumps = (jump_horizontal(current, x, y, dx),
+                         jump_vertical(current, y, 1), jump_vertical(current, y, -1))
+            else:
+                # Llegamos en vertical: seguir y girar solo hacia vecinos forzados
+                dy = 1 if y > ys[p] else -1
+                jumps = [jump_vertical(current, y, dy)]
+                back = current - dy * width
+                if x > 0 and walkable[current - 1] and not walkable[back - 1]:
+                    jumps.append(jump_horizontal(current, x, y, -1))
+                if x < width - 1 and walkable[current + 1] and not walkable[back + 1]:
+                    jumps.append(jump_horizontal(current, x, y, 1))
+
+            current_cost = cost[current]
+            for n in jumps:
+                if n is None:
+                    continue
+                new_cost = current_cost + abs(xs[n] - x) + abs(ys[n] - y)
+                if seen[n] != gen or new_cost < cost[n]:
+                    seen[n] = gen
+                    cost[n] = new_cost
+                    parent[n] = current
+                    priority = new_cost + abs(xs[n] - goal_x) + abs(ys[n] - goal_y)
+                    heappush(openq, priority * size + order_key[n])
+        self.expanded = expanded
+        return None
+
+    def _unpack_jump_path(self, current):
+        """Reconstruye el camino celda por celda entre puntos de salto."""
+        xs = self.xs
+        ys = self.ys
+        parent = self.parent
+        path = [(xs[current], ys[current])]
+        while parent[current] != -1:
+            p = parent[current]
+            x, y = xs[current], ys[current]
+            px, py = xs[p], ys[p]
+            step_x = (px > x) - (px < x)
+            step_y = (py > y) - (py < y)
+            while (x, y) != (px, py):
+                x += step_x
+                y += step_y
+                path.append((x, y))
+            current = p
+        path.reverse()
+        return path
+
+
+_pathfinders = {}
+
+def get_pathfinder(width, height):
+    """Devuelve (y reutiliza) el motor de A* para una grid de width x height."""
+    engine = _pathfinders.get((width, height))
+    if engine is None:
+        engine = _pathfinders[(width, height)] = GridPathfinder(width, height)
+    return engine
+
+
+class PathCache:
+    """
+    Caché LRU acotado de resultados de A*, con clave (inicio, meta, grid_version).
+
+    Cuando la grid cambia, World incrementa grid_version y las entradas viejas
+    simplemente dejan de coincidir hasta que el LRU las descarta. También se
+    guardan los "sin camino" (None), que son las búsquedas más caras.
+    Los contadores hits/misses sirven para dimensionar maxsize.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Devuelve (True, camino) si la clave está en el caché, (False, None) si no."""
+        try:
+            path = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return False, None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return True, path
+
+    def put(self, key, path):
+        self.entries[key] = path
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate()
+        }
+
+
+# Algoritmos disponibles para a_star(..., method=...)
+METHODS = ("astar", "jps", "hpa", "safe", "bidir")
+
+def _search(start, goal, world, method):
+    grid = world.grid
+    height = len(grid)
+    width = len(grid[0]) if height else 0
+    if not (0 <= start[0] < width and 0 <= start[1] < height):
+        return a_star_basic(start, goal, world)
+    if not (0 <= goal[0] < width and 0 <= goal[1] < height):
+        return None # La meta nunca es alcanzable fuera del mapa
+
+    if method == "hpa":
+        # El mundo mantiene su grafo jerárquico actualizado; si no lo tiene
+        # (mundos de prueba) se construye uno para esta búsqueda
+        get_map = getattr(world, "get_hierarchical_map", None)
+        hmap = get_map() if get_map is not None else HierarchicalMap(grid)
+        return hmap.find_path(start, goal)
+
+    engine = get_pathfinder(width, height)
+    walkable = engine.walkable_flags_for(world)
+    if method == "safe":
+        danger = getattr(world, "danger", None)
+        if danger is not None:
+            return engine.search_weighted(start, goal, walkable, danger, constants.MINE_DANGER_COST)
+    if method == "jps":
+        return engine.search_jps(start, goal, walkable)
+    if method == "bidir":
+        return engine.search_bidirectional(start, goal, walkable)
+    return engine.search(start, goal, walkable)
+
+
+def _cache_key(start, goal, world, method):
+    key = (start, goal, world.grid_version)
+    if method == "safe":
+        key += (method, getattr(world, "danger_version", None))
+    elif method != "astar":
+        key += (method,)
+    return key
+
+
+def a_star(start, goal, world, method="astar"):
+    """
+    Camino más corto entre dos celdas (gx, gy), o None si no hay camino.
+
+    method:
+      "astar" -> A* clásico (desempate idéntico a a_star_basic).
+      "jps"   -> Jump Point Search: mismo largo de camino, muchas menos
+                 expansiones en mapas grandes y abiertos.
+      "hpa"   -> HPA* (ver hierarchical_pathfinding): busca primero entre
+                 clusters y refina cada tramo; casi óptimo, pensado para
+                 mapas grandes.
+      "safe"  -> A* con pesos sobre la capa de peligro del mundo (world.danger):
+                 cada celda cubierta por una mina activa cuesta
+                 constants.MINE_DANGER_COST extra, así que solo se cruza un
+                 área de mina si no hay otro camino razonable.
+      "bidir" -> A* bidireccional: mismo largo que "astar", menos expansiones
+                 en viajes largos (de base a base) con desvíos por árboles.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método de búsqueda desconocido: {method}")
+
+    # Si el mundo tiene caché de caminos, se consulta antes de buscar
+    cache = getattr(world, "path_cache", None)
+    if cache is None:
+        return _search(start, goal, world, method)
+
+    key = _cache_key(start, goal, world, method)
+    found, path = cache.get(key)
+    if not found:
+        path = _search(start, goal, world, method)
+        cache.put(key, tuple(path) if path is not None else None)
+    # Se devuelve una lista nueva: quien llama puede modificarla sin tocar el caché
+    return list(path) if path is not None else None
+
+
+# -------------------------------
+# Planificación en lote
+# -------------------------------
+
+def _prefer_multi_goal(start, goals):
+    """
+    Estimación de qué conviene para varias metas desde un mismo inicio. La
+    búsqueda multi-meta (Dijkstra, sin heurística) recorre todo el rombo
+    hasta la meta más lejana, unas 2R² celdas; un A* por meta recorre como
+    mucho el rectángulo entre el inicio y esa meta. Con pocas metas o metas
+    cercanas sale más barato buscar cada una por separado.
+    """
+    sx, sy = start
+    radius = 0
+    boxes = 0
+    for gx, gy in goals:
+        dx, dy = abs(gx - sx), abs(gy - sy)
+        radius = max(radius, dx + dy)
+        boxes += (dx + 1) * (dy + 1)
+    return 2 * radius * radius <= boxes
+
+
+def _plan_group(start, goals, world, method):
+    """Caminos desde un mismo inicio: una búsqueda multi-meta si se puede."""
+    grid = world.grid
+    height = len(grid)
+    width = len(grid[0]) if height else 0
+    inside = 0 <= start[0] < width and 0 <= start[1] < height
+    inside_goals = [g for g in goals if 0 <= g[0] < width and 0 <= g[1] < height]
+    if (len(goals) == 1 or not inside or method not in ("astar", "safe")
+            or not _prefer_multi_goal(start, inside_goals)):
+        return {goal: _search(start, goal, world, method) for goal in goals}
+
+    engine = get_pathfinder(width, height)
+    walkable = engine.walkable_flags_for(world)
+    danger = getattr(world, "danger", None) if method == "safe" else None
+    paths = engine.search_many(start, inside_goals, walkable, danger, constants.MINE_DANGER_COST)
+    for goal in goals:
+        paths.setdefault(goal, None) # Metas fuera del mapa
+    return paths
+
+
+class _GridSnapshot:
+    """Copia de solo lectura de la grid (y del peligro) para otro proceso."""
+
+    def __init__(self, world):
+        if isinstance(world.grid, np.ndarray):
+            self.grid = world.grid.copy()
+            self.grid.flags.writeable = False
+        else:
+            self.grid = tuple(tuple(row) for row in world.grid)
+        danger = getattr(world, "danger", None)
+        self.danger = tuple(danger) if danger is not None else None
+
+
+def _plan_group_snapshot(snapshot, start, goals, method):
+    return _plan_group(start, goals, snapshot, method)
+
+
+def plan_paths(requests, world, method="astar", executor=None):
+    """
+    Resuelve un lote de pedidos (inicio, meta) de una sola vez.
+
+    - Los pedidos repetidos se calculan una vez (y se consulta el caché).
+    - Los pedidos con el mismo inicio comparten una búsqueda multi-meta.
+    - Con 'executor' (por ejemplo un ProcessPoolExecutor) cada grupo se
+      resuelve en paralelo sobre una copia de solo lectura de la grid.
+    Devuelve {(inicio, meta): camino (lista) o None}.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método de búsqueda desconocido: {method}")
+
+    cache = getattr(world, "path_cache", None)
+    results = {}
+    groups = {}
+    for start, goal in requests:
+        if (start, goal) in results or goal in groups.get(start, ()):
+            continue
+        if cache is not None:
+            found, path = cache.get(_cache_key(start, goal, world, method))
+            if found:
+                results[(start, goal)] = path
+                continue
+        groups.setdefault(start, []).append(goal)
+
+    if executor is not None and len(groups) > 1:
+        # Los inicios fuera de la grid usan a_star_basic, que necesita los
+        # vecinos del mundo real (la copia no los tiene): se resuelven acá
+        height = len(world.grid)
+        width = len(world.grid[0]) if height else 0
+        snapshot = _GridSnapshot(world)
+        futures = {}
+        planned = {}
+        for start, goals in groups.items():
+            if 0 <= start[0] < width and 0 <= start[1] < height:
+                futures[start] = executor.submit(_plan_group_snapshot, snapshot, start, goals, method)
+            else:
+                planned[start] = _plan_group(start, goals, world, method)
+        planned.update((start, future.result()) for start, future in futures.items())
+    else:
+        planned = {start: _plan_group(start, goals, world, method) for start, goals in groups.items()}
+
+    for start, paths in planned.items():
+        for goal, path in paths.items():
+            path = tuple(path) if path is not None else None
+            results[(start, goal)] = path
+            if cache is not None:
+                cache.put(_cache_key(start, goal, world, method), path)
+
+    return {key: list(path) if path is not None else None for key, path in results.items()}
+
+
+class BatchPlanner:
+    """
+    Junta los pedidos de camino de todos los vehículos durante un tick y los
+    resuelve juntos al final (plan_paths). Cada vehículo recibe su camino con
+    vehicle.receive_path(path, world).
+    """
+
+    def __init__(self, executor=None):
+        self.executor = executor
+        self.requests = [] # (vehículo, inicio, meta, método)
+        self.batches = 0
+        self.searched = 0 # Pedidos resueltos (antes de deduplicar)
+
+    def request(self, vehicle, start, goal, method="astar"):
+        self.requests.append((vehicle, start, goal, method))
+
+    def pending(self):
+        return bool(self.requests)
+
+    def resolve(self, world):
+        requests = self.requests
+        self.requests = []
+        by_method = {}
+        for _, start, goal, method in requests:
+            by_method.setdefault(method, []).append((start, goal))
+        paths = {method: plan_paths(pairs, world, method, self.executor)
+                 for method, pairs in by_method.items()}
+
+        self.batches += 1
+        self.searched += len(requests)
+        for vehicle, start, goal, method in requests:
+            # Si mientras tanto cambió de plan (por ejemplo, regreso forzado) se descarta
+            if vehicle.alive and vehicle.awaiting_path:
+                path = paths[method][(start, goal)]
+                # Cada vehículo recibe su propia lista (las modifica al moverse)
+                vehicle.receive_path(list(path) if path is not None else None, world)
+
+
+class DistanceField:
+    """
+    Campo de distancias (BFS) hacia una celda fija, por ejemplo una base.
+
+    Se calcula una sola vez en O(|V|) y después cualquier camino hacia la meta
+    se obtiene siguiendo el gradiente (vecino con distancia - 1) en O(largo del
+    camino), sin volver a correr A*. Los cambios de la grid se aplican con
+    apply_changes (ver GridJournal); solo si se bloquea una celda se reconstruye.
+    """
+
+    def __init__(self, goal, grid):
+        height = len(grid)
+        width = len(grid[0]) if height else 0
+        engine = get_pathfinder(width, height)
+        self.goal = goal
+        self.width = width
+        self.height = height
+        self.xs = engine.xs
+        self.ys = engine.ys
+        self.neighbors = engine.neighbors
+
+        walkable = engine.walkable_flags(grid)
+        dist = [-1] * engine.size
+        goal_idx = goal[1] * width + goal[0]
+        dist[goal_idx] = 0
+        frontier = [goal_idx]
+        neighbors = self.neighbors
+        # BFS por niveles (la grid tiene costo uniforme)
+        while frontier:
+            next_frontier = []
+            for current in frontier:
+                d = dist[current] + 1
+                for n in neighbors[current]:
+                    if dist[n] == -1 and walkable[n]:
+                        dist[n] = d
+                        next_frontier.append(n)
+            frontier = next_frontier
+        self.dist = dist
+        self.walkable = walkable
+        self.version = None # Versión de la grid con la que está al día (la fija World)
+
+    def apply_changes(self, changes):
+        """
+        Actualiza el campo con cambios de la grid ((gx, gy), viejo, nuevo)
+        sin recalcularlo entero. Si una celda se volvió caminable, las
+        distancias solo pueden bajar y se propagan desde ahí. Si alguna se
+        bloqueó devuelve False: hay que reconstruir el campo.
+        """
+        walkable = self.walkable
+        width = self.width
+        opened = []
+        for (gx, gy), _, value in changes:
+            idx = gy * width + gx
+            walk = value != 1
+            if walkable[idx] == walk:
+                continue
+            if not walk:
+                return False
+            walkable[idx] = True
+            opened.append(idx)
+        if not opened:
+            return True
+
+        dist = self.dist
+        neighbors = self.neighbors
+        heap = []
+        for idx in opened:
+            best = min((dist[n] for n in neighbors[idx] if dist[n] >= 0), default=-1)
+            if best >= 0 and (dist[idx] == -1 or best + 1 < dist[idx]):
+                dist[idx] = best + 1
+                heapq.heappush(heap, (best + 1, idx))
+        while heap:
+            d, current = heapq.heappop(heap)
+            if d != dist[current]:
+                continue
+            for n in neighbors[current]:
+                if walkable[n] and (dist[n] == -1 or dist[n] > d + 1):
+                    dist[n] = d + 1
+                    heapq.heappush(heap, (d + 1, n))
+        return True
+
+    def distance(self, cell):
+        """Distancia (en celdas) hasta la meta, o -1 si no es alcanzable."""
+        gx, gy = cell
+        if not (0 <= gx < self.width and 0 <= gy < self.height):
+            return -1
+        return self.dist[gy * self.width + gx]
+
+    def path_from(self, start):
+        """
+        Camino desde 'start' hasta la meta (incluye ambos extremos, igual que
+        a_star) o None si la meta no es alcanzable desde 'start'.
+        """
+        if self.distance(start) < 0:
+            return None
+        dist = self.dist
+        xs = self.xs
+        ys = self.ys
+        neighbors = self.neighbors
+        current = start[1] * self.width + start[0]
+        path = [start]
+        d = dist[current]
+        while d > 0:
+            for n in neighbors[current]:
+                if dist[n] == d - 1:
+                    current = n
+                    break
+            d -= 1
+            path.append((xs[current], ys[current]))
+        return path
+
+
+class DStarLite:
+    """
+    Planificador incremental (D* Lite) hacia una meta fija, uno por vehículo.
+
+    Busca desde la meta hacia el vehículo, así que cuando el vehículo avanza
+    o cambian unas pocas celdas (aliados que bloquean el paso) solo se
+    corrigen los nodos afectados en lugar de repetir toda la búsqueda.
+    Si cambia la caminabilidad de la grid (explosiones) se empieza de cero.
+    """
+
+    def __init__(self, goal, world):
+        grid = world.grid
+        height = len(grid)
+        width = len(grid[0]) if height else 0
+        self.engine = get_pathfinder(width, height)
+        self.goal = goal
+        self.width = width
+        self.goal_idx = goal[1] * width + goal[0]
+        self.xs = self.engine.xs
+        self.ys = self.engine.ys
+        self.neighbors = self.engine.neighbors
+        self.walkable = self.engine.walkable_flags_for(world)
+        self.blocked = set()  # Celdas bloqueadas temporalmente (índices planos)
+        self.expanded = 0      # Nodos expandidos (para medir el ahorro)
+        self._reset()
+
+    def _reset(self):
+        size = self.engine.size
+        self.g = [INF] * size
+        self.rhs = [INF] * size
+        self.km = 0
+        self.openq = []
+        self.open_key = {}
+        self.start_idx = None
+        self.rhs[self.goal_idx] = 0
+        # Todavía no hay inicio: la clave de la meta se corrige al expandirla
+        self.open_key[self.goal_idx] = (0, 0)
+        heapq.heappush(self.openq, (0, 0, self.goal_idx))
+
+    def _h(self, a, b):
+        return abs(self.xs[a] - self.xs[b]) + abs(self.ys[a] - self.ys[b])
+
+    def _key(self, idx):
+        m = min(self.g[idx], self.rhs[idx])
+        return (m + self._h(self.start_idx, idx) + self.km, m)
+
+    def _push(self, idx):
+        key = self._key(idx)
+        self.open_key[idx] = key
+        heapq.heappush(self.openq, (key[0], key[1], idx))
+
+    def _passable(self, idx):
+        return self.walkable[idx] and idx not in self.blocked
+
+    def _update_vertex(self, u):
+        g = self.g
+        if u != self.goal_idx:
+            best = INF
+            for s in self.neighbors[u]:
+                if self._passable(s) and g[s] + 1 < best:
+                    best = g[s] + 1
+            self.rhs[u] = best
+        if g[u] != self.rhs[u]:
+            self._push(u)
+        else:
+            self.open_key.pop(u, None)
+
+    def _compute_shortest_path(self):
+        g = self.g
+        rhs = self.rhs
+        openq = self.openq
+        open_key = self.open_key
+        start = self.start_idx
+        while openq:
+            k1, k2, u = openq[0]
+            if open_key.get(u) != (k1, k2):
+                heapq.heappop(openq) # Entrada vieja (se reinsertó con otra clave)
+                continue
+            if (k1, k2) >= self._key(start) and rhs[start] == g[start]:
+                break
+            heapq.heappop(openq)
+            new_key = self._key(u)
+            if (k1, k2) < new_key:
+                self._push(u)
+                continue
+            del open_key[u]
+            self.expanded += 1
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+            else:
+                g[u] = INF
+                self._update_vertex(u)
+            for p in self.neighbors[u]:
+                self._update_vertex(p)
+
+    def _set_blocked(self, blocked):
+        changed = blocked ^ self.blocked
+        self.blocked = blocked
+        # Cambia el costo de las aristas que ENTRAN a cada celda modificada
+        for c in changed:
+            for p in self.neighbors[c]:
+                self._update_vertex(p)
+
+    def plan(self, start, world, blocked_cells=()):
+        """
+        Camino desde 'start' hasta la meta (incluye ambos extremos, igual que
+        a_star) evitando además 'blocked_cells', o None si no hay camino.
+        """
+        width = self.width
+        flags = self.engine.walkable_flags_for(world)
+        if flags is not self.walkable:
+            # La caminabilidad cambió: el árbol de búsqueda anterior no sirve
+            self.walkable = flags
+            self.blocked = set()
+            self._reset()
+
+        start_idx = start[1] * width + start[0]
+        if self.start_idx is not None and start_idx != self.start_idx:
+            self.km += self._h(self.start_idx, start_idx)
+        self.start_idx = start_idx
+        self._set_blocked({gy * width + gx for gx, gy in blocked_cells})
+
+        if not self._passable(self.goal_idx):
+            return None
+        self._compute_shortest_path()
+        if self.g[start_idx] == INF:
+            return None
+
+        # Se sigue el gradiente de g desde el inicio hasta la meta
+        g = self.g
+        xs = self.xs
+        ys = self.ys
+        path = [start]
+        current = start_idx
+        while current != self.goal_idx:
+            best = None
+            for s in self.neighbors[current]:
+                if self._passable(s) and (best is None or g[s] < g[best]):
+                    best = s
+            if best is None or g[best] == INF or len(path) > self.engine.size:
+                return None
+            current = best
+            path.append((xs[current], ys[current]))
+        return path
@@ -0,0 +1,135 @@
+#este archivo contiene la tabla de reservas espacio-tiempo de un equipo y el
+#planificador cooperativo (estilo WHCA*) que la usa.
+#El tiempo se mide en "slots": un slot es lo que tarda un vehículo en cruzar
+#una celda (constants.RESERVATION_STEP_FRAMES frames). Cada vehículo reserva
+#las celdas de su ruta para los próximos constants.RESERVATION_WINDOW slots y
+#los aliados planifican alrededor de esas reservas en vez de chocar y esperar.
+import heapq
+
+from . import constants
+
+
+class ReservationTable:
+    """
+    Reservas de un equipo: (gx, gy, slot) -> vehículo.
+
+    - is_free(cell, slot, owner) es O(1).
+    - reserve_route(owner, cells, slot) reemplaza las reservas de 'owner'.
+    Las reservas de vehículos destruidos se ignoran.
+    """
+
+    def __init__(self, step_frames=constants.RESERVATION_STEP_FRAMES, window=constants.RESERVATION_WINDOW):
+        self.step_frames = step_frames
+        self.window = window
+        self.slots = {}  # (gx, gy, slot) -> vehículo
+        self.owned = {}  # vehículo -> lista de claves reservadas
+
+    def slot_at(self, frame):
+        return frame // self.step_frames
+
+    def is_free(self, cell, slot, owner=None):
+        holder = self.slots.get((cell[0], cell[1], slot))
+        return holder is None or holder is owner or not holder.alive
+
+    def release(self, owner):
+        slots = self.slots
+        for key in self.owned.pop(owner, ()):
+            if slots.get(key) is owner:
+                del slots[key]
+
+    def reserve_route(self, owner, cells, slot, skip=None):
+        """
+        Reserva la ruta 'cells' (cells[0] es la celda actual) a partir de 'slot'.
+        La celda actual queda reservada este slot y el siguiente; cada celda
+        siguiente desde que se sale hacia ella hasta que se llega a la próxima.
+        La última celda queda reservada hasta el final de la ventana.
+        Las celdas ya reservadas por otro aliado (o 'skip') no se tocan.
+        """
+        self.release(owner)
+        slots = self.slots
+        keys = []
+
+        def claim(cell, s):
+            if cell == skip:
+                return
+            key = (cell[0], cell[1], s)
+            holder = slots.get(key)
+            if holder is None or not holder.alive:
+                slots[key] = owner
+                keys.append(key)
+
+        last = min(len(cells), self.window) - 1
+        claim(cells[0], slot)
+        claim(cells[0], slot + 1)
+        for i in range(1, last + 1):
+            claim(cells[i], slot + i - 1)
+            claim(cells[i], slot + i)
+        for s in range(slot + last + 1, slot + self.window):
+            claim(cells[last], s)
+        self.owned[owner] = keys
+
+    def route_conflicts(self, owner, cells, slot):
+        """True si algún paso de la ventana choca con la reserva de un aliado."""
+        for i in range(1, min(len(cells), self.window)):
+            cell = cells[i]
+            if not (self.is_free(cell, slot + i - 1, owner) and self.is_free(cell, slot + i, owner)):
+                return True
+        return False
+
+    def plan_window(self, owner, start, goal, slot, field, blocked=()):
+        """
+        A* espacio-tiempo (celda, paso) dentro de la ventana, con la acción
+        "esperar" además de los 4 movimientos. La heurística es el campo de
+        distancias hacia la meta (distancia real ignorando a los aliados).
+        Devuelve la ruta (con celdas repetidas donde hay que esperar, incluye
+        el inicio) completada con el campo más allá de la ventana, o None.
+        """
+        width = field.width
+        height = field.height
+        dist = field.dist
+        blocked = set(blocked)
+        window = self.window
+
+        def h(cell):
+            return dist[cell[1] * width + cell[0]]
+
+        if h(start) < 0:
+            return None
+
+        parent = {(start, 0): None}
+        openq = [(h(start), 0, start)]
+        end = None
+        while openq:
+            _, t, cell = heapq.heappop(openq)
+            if cell == goal or t == window - 1:
+                end = (cell, t)
+                break
+            x, y = cell
+            for nxt in ((x, y), (x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                nx, ny = nxt
+                if not (0 <= nx < width and 0 <= ny < height):
+                    continue
+                if (nxt, t + 1) in parent or dist[ny * width + nx] < 0:
+                    continue
+                if nxt != cell:
+                    if nxt in blocked or not self.is_free(nxt, slot + t, owner):
+                        continue
+                if not self.is_free(nxt, slot + t + 1, owner):
+                    continue
+                parent[(nxt, t + 1)] = (cell, t)
+                heapq.heappush(openq, (t + 1 + h(nxt), t + 1, nxt))
+        if end is None:
+            return None
+
+        route = []
+        node = end
+        while node is not None:
+            route.append(node[0])
+            node = parent[node]
+        route.reverse()
+        if end[0] != goal:
+            rest = field.path_from(end[0])
+            if rest is None:
+                return None
+            route.extend(rest[1:])
+        return route
@@ -0,0 +1,448 @@
+#este archivo contiene el núcleo de la simulación SIN interfaz gráfica.
+#La clase Simulation es dueña del World y de las dos flotas, y avanza la
+#partida tick a tick con step(). Nunca abre una ventana ni usa fuentes, por lo
+#que se puede usar en lotes de partidas y benchmarks a velocidad de CPU.
+#La interfaz de pygame (game_engine.main) es solo un cliente que la maneja.
+import datetime
+import pickle
+import random
+import time
+
+from . import constants
+from . import pathfinding
+from .world import World
+from .aircraft import Jeep, Moto, Camion, Auto
+from .elements import Person, Merchandise
+from config.strategies.player1_strategies import JeepStrategy, MotoStrategy, CamionStrategy, AutoStrategy
+from config.strategies.player2_strategies import AggressiveJeepStrategy, FastMotoStrategy, SupportCamionStrategy, BalancedAutoStrategy
+
+# Convierte los nombres de string (guardados) de nuevo a Clases (para cargar)
+STRATEGY_MAP = {
+    # Estrategias del Jugador 1
+    "JeepStrategy": JeepStrategy,
+    "MotoStrategy": MotoStrategy,
+    "CamionStrategy": CamionStrategy,
+    "AutoStrategy": AutoStrategy,
+    # Estrategias del Jugador 2
+    "AggressiveJeepStrategy": AggressiveJeepStrategy,
+    "FastMotoStrategy": FastMotoStrategy,
+    "SupportCamionStrategy": SupportCamionStrategy,
+    "BalancedAutoStrategy": BalancedAutoStrategy
+}
+
+# Diccionario para recrear vehículos por su tipo
+VEHICLE_CLASSES = {
+    "jeep": Jeep,
+    "moto": Moto,
+    "camion": Camion,
+    "auto": Auto
+}
+
+
+def build_fleet(base_pos, mirrored, colors, strategies, prefix):
+    """
+    Crea los 10 vehículos de un jugador en formación alrededor de su base.
+    'mirrored' invierte los offsets horizontales (jugador de la derecha).
+    """
+    base_x, base_y = base_pos
+    base_gx = base_x // constants.TILE
+    base_gy = base_y // constants.TILE
+    sign = -1 if mirrored else 1
+    fleet = []
+
+    # 3 Jeeps en formación escalonada
+    for i in range(3):
+        jeep_gx_offset = sign * (i // 2) # 0, 0, ±1
+        jeep_gy_offset = (i - 1) # -1, 0, 1
+        jeep = Jeep(f"{prefix}_Jeep_{i}", base_gx + jeep_gx_offset, base_gy + jeep_gy_offset,
+                    (base_x, base_y), colors["jeep"])
+        jeep.strategy = strategies["jeep"]()
+        fleet.append(jeep)
+
+    # 2 Motos adelante
+    for i in range(2):
+        moto_gy_offset = (i * 2 - 1) # -1, 1
+        moto = Moto(f"{prefix}_Moto_{i}", base_gx + sign, base_gy + moto_gy_offset,
+                    (base_x, base_y), colors["moto"])
+        moto.strategy = strategies["moto"]()
+        fleet.append(moto)
+
+    # 2 Camiones atrás
+    for i in range(2):
+        camion_gy_offset = (i * 2 - 1) # -1, 1
+        camion = Camion(f"{prefix}_Camion_{i}", base_gx - sign, base_gy + camion_gy_offset,
+                        (base_x, base_y), colors["camion"])
+        camion.strategy = strategies["camion"]()
+        fleet.append(camion)
+
+    # 3 Autos en V (directamente en coordenadas de celda)
+    auto_grid_positions = [
+        (base_gx, base_gy - 1),
+        (base_gx, base_gy + 1),
+        (base_gx + sign, base_gy)
+    ]
+    for i, (agx, agy) in enumerate(auto_grid_positions):
+        auto = Auto(f"{prefix}_Auto_{i}", agx, agy, (base_x, base_y), colors["auto"])
+        auto.strategy = strategies["auto"]()
+        fleet.append(auto)
+
+    return fleet
+
+
+def rebuild_fleet(vehicle_data_list):
+    """
+    Reconstruye una flota (lista de vehículos) a partir de sus datos guardados.
+    """
+    rebuilt_fleet = []
+    for v_data in vehicle_data_list:
+        cls = VEHICLE_CLASSES.get(v_data.get('vehicle_type'))
+        if cls is None:
+            continue
+
+        new_v = cls(v_data['id'], v_data['gx'], v_data['gy'],
+                    v_data['base_position_pixels'], v_data['color'])
+
+        new_v.trips_left = v_data.get('trips_left', 1)
+        new_v.alive = v_data.get('alive', True)
+        new_v.score = v_data.get('score', 0)
+        new_v.returning_to_base = v_data.get('returning_to_base', False)
+        new_v.at_base = v_data.get('at_base', False)
+        new_v.forced_return = v_data.get('forced_return', False)
+        new_v.speed_pixels_per_update = v_data.get('speed_pixels_per_update', 1.5)
+
+        new_v.cargo = []
+        for item_type in v_data.get('cargo', []):
+            if item_type == 'person':
+                p_obj = Person(0, 0)
+                p_obj.value = constants.POINTS_PERSON
+                new_v.cargo.append(p_obj)
+            elif item_type in constants.MERCH_POINTS:
+                m_obj = Merchandise(0, 0, item_type)
+                m_obj.value = constants.MERCH_POINTS.get(item_type, 0)
+                new_v.cargo.append(m_obj)
+
+        # Restaurar el "cerebro"
+        strategy_name = v_data.get('strategy_name')
+        if strategy_name in STRATEGY_MAP:
+            new_v.strategy = STRATEGY_MAP[strategy_name]()
+        else:
+            new_v.strategy = None
+
+        rebuilt_fleet.append(new_v)
+
+    return rebuilt_fleet
+
+
+class Simulation:
+    """
+    Núcleo headless de una partida: un World, dos flotas y el reloj lógico.
+
+    - step(n) avanza n ticks lógicos.
+    - on_explosion(x, y, color) es un callback opcional para efectos visuales.
+    - db (opcional) recibe el resultado final con save_match_result().
+    - record_replay guarda un fotograma completo en cada tick con evento lógico
+      y lo vuelca a un archivo Replay_*.pkl al terminar la partida.
+    - planner_executor (opcional, por ejemplo un ProcessPoolExecutor) reparte
+      la planificación en lote de cada tick entre procesos.
+    - world_options (opcional) se pasa a World: tamaño de la grid y cantidades
+      de elementos, por ejemplo {"grid_width": 400, "grid_height": 400}.
+    """
+
+    def __init__(self, db=None, record_replay=False, seed=None, planner_executor=None,
+                 world_options=None):
+        if seed is not None:
+            random.seed(seed)
+
+        self.db = db
+        self.record_replay = record_replay
+        self.on_explosion = None
+
+        # Usamos GAME_WORLD_HEIGHT para inicializar el mundo
+        self.world = World(constants.WIDTH, constants.GAME_WORLD_HEIGHT, **(world_options or {}))
+        self.world.path_planner = pathfinding.BatchPlanner(planner_executor)
+        self.game_time = 0
+        self.game_over = False
+        self.stats_saved = False
+        self.replay_buffer = []
+
+        # JUGADOR 1 - ROJO (Izquierda)
+        self.player1_vehicles = build_fleet(
+            self.world.base1_pos, False,
+            {"jeep": (220, 20, 20), "moto": (255, 80, 80), "camion": (180, 0, 0), "auto": (200, 40, 40)},
+            {"jeep": JeepStrategy, "moto": MotoStrategy, "camion": CamionStrategy, "auto": AutoStrategy},
+            "P1")
+        # JUGADOR 2 - AZUL (Derecha)
+        self.player2_vehicles = build_fleet(
+            self.world.base2_pos, True,
+            {"jeep": (20, 20, 220), "moto": (80, 80, 255), "camion": (0, 0, 180), "auto": (40, 40, 200)},
+            {"jeep": AggressiveJeepStrategy, "moto": FastMotoStrategy,
+             "camion": SupportCamionStrategy, "auto": BalancedAutoStrategy},
+            "P2")
+        self._sync_world_fleets()
+
+        self.last_p1_alive = len(self.player1_vehicles)
+        self.last_p2_alive = len(self.player2_vehicles)
+
+    def _sync_world_fleets(self):
+        self.world.vehicles = self.player1_vehicles + self.player2_vehicles
+        self.world.player1_vehicles = self.player1_vehicles
+        self.world.player2_vehicles = self.player2_vehicles
+        self.world.reset_occupancy()
+
+    def initialize_map(self):
+        """(Re)genera minas, personas y mercancías del mapa."""
+        self.world.initialize_map_elements()
+        self.stats_saved = False
+
+    def _emit_explosion(self, x, y, color):
+        if self.on_explosion:
+            self.on_explosion(x, y, color)
+
+    # -------------------------------
+    # Guardar / Cargar
+    # -------------------------------
+
+    def get_full_game_state(self):
+        """
+        Recopila el estado de todos los objetos del juego y lo empaqueta.
+        """
+        return {
+            "game_time": self.game_time,
+            "world": self.world.get_state(),
+            "player1_vehicles": [v.get_state() for v in self.player1_vehicles],
+            "player2_vehicles": [v.get_state() for v in self.player2_vehicles]
+        }
+
+    def get_lightweight_state(self):
+        """
+        Guarda solo las posiciones y estados básicos de los vehículos.
+        Ideal para avanzar/retroceder rápido sin recargar todo el mundo.
+        """
+        return {
+            "p1": [
+                {"x": v.x, "y": v.y, "alive": v.alive, "score": v.score}
+                for v in self.player1_vehicles
+            ],
+            "p2": [
+                {"x": v.x, "y": v.y, "alive": v.alive, "score": v.score}
+                for v in self.player2_vehicles
+            ]
+        }
+
+    def load_game_from_data(self, data):
+        """
+        Restaura el estado del juego desde un diccionario.
+        Si el frame es 'liviano', solo actualiza posiciones y puntajes.
+        Si es completo, reconstruye todo el mundo.
+        """
+        # --- Caso 1: Frame liviano (replay rápido) ---
+        if "p1" in data and "p2" in data:
+            for v, d in zip(self.player1_vehicles, data["p1"]):
+                v.x = d["x"]
+                v.y = d["y"]
+                v.alive = d.get("alive", True)
+                v.score = d.get("score", 0)
+            for v, d in zip(self.player2_vehicles, data["p2"]):
+                v.x = d["x"]
+                v.y = d["y"]
+                v.alive = d.get("alive", True)
+                v.score = d.get("score", 0)
+            return  # listo, no se recarga el mundo
+
+        # --- Caso 2: Frame completo (carga total) ---
+        self.world.load_state(data['world'])
+
+        # Se modifican las listas "in place" para que los clientes que guardan
+        # una referencia a ellas (la UI) vean la flota nueva.
+        self.player1_vehicles[:] = rebuild_fleet(data.get('player1_vehicles', []))
+        self.player2_vehicles[:] = rebuild_fleet(data.get('player2_vehicles', []))
+        self._sync_world_fleets()
+
+        self.game_time = data.get('game_time', 0)
+
+    # -------------------------------
+    # Lógica de la partida
+    # -------------------------------
+
+    def handle_mine_explosion(self, mine):
+        """
+        Gestiona la lógica completa de la explosión de una mina,
+        afectando a toda el área y a todas las entidades.
+        """
+        world = self.world
+        print(f"¡BOOM! Mina {mine.type} explotó en ({mine.x}, {mine.y})")
+        self._emit_explosion(mine.x, mine.y, (255, 100, 0))
+
+        # Celdas, vehículos, recursos, grid y fuego: todo en World.explode_mine
+        for v in world.explode_mine(mine):
+            self._emit_explosion(v.x, v.y, v.color)
+
+    def _finish_match(self):
+        """Guarda estadísticas y replay (si corresponde) y termina la partida."""
+        if not self.stats_saved:
+            winner, p1_score, p2_score = self.get_result()
+            if self.db is not None:
+                self.db.save_match_result(winner, p1_score, p2_score)
+            self.stats_saved = True
+
+        if self.replay_buffer:
+            replay_name = f"Replay_{datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.pkl"
+            try:
+                with open(replay_name, 'wb') as f: pickle.dump(self.replay_buffer, f)
+            except Exception as e: print(f"Error al guardar el replay: {e}")
+            self.replay_buffer.clear()
+
+        self.game_over = True
+
+    def get_result(self):
+        """Devuelve (ganador, puntos_j1, puntos_j2) según el estado actual."""
+        p1_score = sum(v.score for v in self.player1_vehicles)
+        p2_score = sum(v.score for v in self.player2_vehicles)
+
+        p1_alive = sum(1 for v in self.player1_vehicles if v.alive)
+        p2_alive = sum(1 for v in self.player2_vehicles if v.alive)
+
+        winner = "Empate"
+        if p1_alive == 0 and p2_alive > 0:
+            winner = "Jugador 2"
+        elif p2_alive == 0 and p1_alive > 0:
+            winner = "Jugador 1"
+        elif p1_score > p2_score:
+            winner = "Jugador 1"
+        elif p2_score > p1_score:
+            winner = "Jugador 2"
+        return winner, p1_score, p2_score
+
+    def tick(self):
+        """
+        Ejecuta UN SOLO fotograma (tick) de la lógica del juego.
+        Devuelve True si ocurrió un evento lógico, False si solo fue animación.
+        """
+        world = self.world
+        a_logical_update_happened = False
+        self.game_time += 1
+        world.frame = self.game_time
+
+        # Minas G1 y efectos: solo se procesan los temporizadores que vencen
+        if world.advance_timers():
+            a_logical_update_happened = True
+
+        # 1. LÓGICA DE FIN DE JUEGO (RECURSOS)
+        if len(world.resources) == 0 and not hasattr(world, 'ending_phase'):
+            a_logical_update_happened = True
+            world.ending_phase = True
+            world.ending_timer = 0
+            for vehicle in world.vehicles:
+                if vehicle.alive:
+                    vehicle.force_return_to_base()
+
+        if hasattr(world, 'ending_phase') and world.ending_phase:
+            world.ending_timer += 1
+            all_at_base = all(v.at_base or not v.alive for v in world.vehicles)
+
+            if all_at_base or world.ending_timer > 300:
+                self._finish_match()
+                return True
+
+        # 2. COLISIONES CON MINAS
+        # Cada vehículo consulta el índice celda -> minas activas de su celda
+        mines_to_explode = []
+        for v in world.vehicles:
+            if not v.alive: continue
+            for mine in world.active_mines_at(v.gx, v.gy):
+                if mine not in mines_to_explode:
+                    mines_to_explode.append(mine)
+
+        if mines_to_explode:
+            a_logical_update_happened = True
+            for mine in mines_to_explode:
+                self.handle_mine_explosion(mine)
+            world.prune_inactive_mines()
+
+        # 3. ACTUALIZAR VEHÍCULOS
+        for vehicle in world.vehicles:
+            if vehicle.alive:
+                if vehicle.update(world):
+                    a_logical_update_happened = True
+
+        # Los caminos pedidos en este tick se calculan juntos (deduplicados y
+        # con una sola búsqueda por celda de inicio)
+        if world.path_planner.pending():
+            world.path_planner.resolve(world)
+
+        # 4. COLISIONES FÍSICAS (ENEMIGOS)
+        # Se busca a los enemigos en la ocupación del otro equipo (por celda)
+        if self.player2_vehicles:
+            enemies = world.get_occupancy(self.player2_vehicles[0].base_target_cell)
+            for v1 in self.player1_vehicles:
+                if not v1.alive: continue
+                if v1.gx == v1.base_gx and v1.gy == v1.base_gy: continue
+                for v2 in enemies.vehicles_at((v1.gx, v1.gy)):
+                    if v2.gx == v2.base_gx and v2.gy == v2.base_gy: continue
+                    a_logical_update_happened = True
+                    self._emit_explosion(v1.x, v1.y, (255, 128, 0))
+                    v1.die()
+                    v2.die()
+
+        # 5. DETECTAR DESTRUCCIONES (para efectos visuales)
+        p1_alive_now = sum(1 for v in self.player1_vehicles if v.alive)
+        p2_alive_now = sum(1 for v in self.player2_vehicles if v.alive)
+        if p1_alive_now < self.last_p1_alive or p2_alive_now < self.last_p2_alive:
+            a_logical_update_happened = True
+        self.last_p1_alive = p1_alive_now
+        self.last_p2_alive = p2_alive_now
+
+        # LÓGICA DE FIN DE JUEGO POR ANIQUILACIÓN
+        if (p1_alive_now == 0 or p2_alive_now == 0) and not hasattr(world, 'ending_phase'):
+            a_logical_update_happened = True
+            world.ending_phase = True
+            world.ending_timer = 301 # Forzar fin inmediato en el siguiente ciclo
+
+        # 6. GRABAR FOTOGRAMA PARA REPLAY
+        if self.record_replay and a_logical_update_happened:
+            try:
+                self.replay_buffer.append(self.get_full_game_state())
+            except Exception as e:
+                print(f"Error al grabar fotograma de replay: {e}")
+
+        return a_logical_update_happened
+
+    def step(self, ticks=1):
+        """
+        Avanza 'ticks' ticks lógicos (o hasta que termine la partida).
+        Devuelve True si en alguno de ellos ocurrió un evento lógico.
+        """
+        any_logical_update = False
+        for _ in range(ticks):
+            if self.game_over:
+                break
+            if self.tick():
+                any_logical_update = True
+        return any_logical_update
+
+    def run_for(self, max_ticks=None, budget_seconds=None, on_tick=None):
+        """
+        Avance rápido: corre hasta 'max_ticks' ticks (None = sin tope) sin
+        pasarse de 'budget_seconds' de tiempo real (None = sin límite), o
+        hasta que termine la partida. Siempre corre al menos un tick.
+        'on_tick(hubo_evento)' se llama después de cada tick que no terminó
+        la partida (la UI guarda ahí su historial).
+        Devuelve la cantidad de ticks ejecutados.
+        """
+        if max_ticks is None and budget_seconds is None:
+            raise ValueError("run_for necesita max_ticks o budget_seconds")
+        deadline = None if budget_seconds is None else time.perf_counter() + budget_seconds
+        done = 0
+        while not self.game_over and (max_ticks is None or done < max_ticks):
+            logical = self.tick()
+            done += 1
+            if on_tick is not None and not self.game_over:
+                on_tick(logical)
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        return done
+
+    def run_until_over(self, max_ticks=100000):
+        """Corre la partida hasta el final (o hasta max_ticks). Devuelve el resultado."""
+        self.step(max_ticks)
+        return self.get_result()
@@ -0,0 +1,149 @@
+#este archivo contiene un índice espacial por "cubetas" (buckets) de celdas.
+#La grid se divide en bloques de bucket_size x bucket_size celdas y cada bloque
+#guarda los elementos que caen en él, separados por tipo. Las consultas de
+#"el más cercano" recorren los bloques en anillos alrededor de la celda de
+#consulta y cortan apenas ningún bloque más lejano puede mejorar el resultado,
+#así el costo depende de la densidad local y no del total de elementos.
+#Las distancias son Manhattan en celdas, como en el resto de las estrategias.
+import heapq
+from itertools import islice
+
+
+class SpatialIndex:
+    """
+    Índice espacial de elementos ubicados en celdas, con un tipo cada uno.
+
+    - insert(item, cell, kind) / remove(item) / move(item, cell) son O(1).
+    - iter_nearest(cell, kinds, where) recorre los elementos de menor a mayor
+      distancia (empates: el insertado primero), de forma perezosa.
+    - nearest(cell, kinds, k) y within(cell, radius, kinds) se apoyan en él.
+    """
+
+    def __init__(self, width, height, bucket_size=5):
+        self.width = width
+        self.height = height
+        self.bucket_size = bucket_size
+        self.buckets_x = (width + bucket_size - 1) // bucket_size
+        self.buckets_y = (height + bucket_size - 1) // bucket_size
+        self.buckets = {}  # (bx, by) -> {tipo: {elemento: orden}}
+        self.items = {}    # elemento -> (celda, tipo, orden)
+        self._seq = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def _bucket_of(self, cell):
+        return (cell[0] // self.bucket_size, cell[1] // self.bucket_size)
+
+    def insert(self, item, cell, kind=None):
+        if item in self.items:
+            self.remove(item)
+        self._seq += 1
+        self.items[item] = (cell, kind, self._seq)
+        bucket = self.buckets.setdefault(self._bucket_of(cell), {})
+        bucket.setdefault(kind, {})[item] = self._seq
+
+    def remove(self, item):
+        entry = self.items.pop(item, None)
+        if entry is None:
+            return
+        cell, kind, _ = entry
+        key = self._bucket_of(cell)
+        bucket = self.buckets[key]
+        group = bucket[kind]
+        del group[item]
+        if not group:
+            del bucket[kind]
+            if not bucket:
+                del self.buckets[key]
+
+    def move(self, item, cell, kind=None):
+        """Actualiza la celda (y el tipo) de un elemento, conservando su orden."""
+        entry = self.items.get(item)
+        if entry is not None and entry[0] == cell and entry[1] == kind:
+            return
+        if entry is None:
+            self.insert(item, cell, kind)
+            return
+        seq = entry[2]
+        self.remove(item)
+        self.items[item] = (cell, kind, seq)
+        bucket = self.buckets.setdefault(self._bucket_of(cell), {})
+        bucket.setdefault(kind, {})[item] = seq
+
+    def clear(self):
+        self.buckets.clear()
+        self.items.clear()
+
+    def cell_of(self, item):
+        entry = self.items.get(item)
+        return entry[0] if entry else None
+
+    # -------------------------------
+    # Consultas
+    # -------------------------------
+
+    def _ring(self, bx, by, r):
+        """Bloques a distancia (Chebyshev, en bloques) exactamente r de (bx, by)."""
+        if r == 0:
+            yield (bx, by)
+            return
+        for x in range(bx - r, bx + r + 1):
+            yield (x, by - r)
+            yield (x, by + r)
+        for y in range(by - r + 1, by + r):
+            yield (bx - r, y)
+            yield (bx + r, y)
+
+    def _candidates(self, key, cell, kinds, where):
+        bucket = self.buckets.get(key)
+        if not bucket:
+            return
+        x, y = cell
+        items = self.items
+        groups = bucket.values() if kinds is None else [bucket[k] for k in kinds if k in bucket]
+        for group in groups:
+            for item, seq in group.items():
+                if where is not None and not where(item):
+                    continue
+                ix, iy = items[item][0]
+                yield (abs(ix - x) + abs(iy - y), seq, item)
+
+    def iter_nearest(self, cell, kinds=None, where=None):
+        """
+        Generador de (distancia, elemento) de menor a mayor distancia.
+        'kinds' filtra por tipo y 'where' es un filtro adicional opcional.
+        """
+        size = self.bucket_size
+        bx, by = self._bucket_of(cell)
+        last_ring = max(bx, by, self.buckets_x - 1 - bx, self.buckets_y - 1 - by, 0)
+        heap = []
+        for r in range(last_ring + 1):
+            for key in self._ring(bx, by, r):
+                for candidate in self._candidates(key, cell, kinds, where):
+                    heapq.heappush(heap, candidate)
+            # Todo lo que está en anillos más lejanos queda a más de r*size celdas
+            bound = r * size
+            while heap and heap[0][0] <= bound:
+                dist, _, item = heapq.heappop(heap)
+                yield dist, item
+        while heap:
+            dist, _, item = heapq.heappop(heap)
+            yield dist, item
+
+    def nearest(self, cell, kinds=None, k=1, where=None):
+        """Los k elementos más cercanos, como lista de (distancia, elemento)."""
+        return list(islice(self.iter_nearest(cell, kinds, where), k))
+
+    def within(self, cell, radius, kinds=None, where=None):
+        """Elementos a distancia <= radius, como lista de (distancia, elemento) ordenada."""
+        size = self.bucket_size
+        x, y = cell
+        found = []
+        for by in range(max(0, (y - radius) // size), min(self.buckets_y - 1, (y + radius) // size) + 1):
+            for bx in range(max(0, (x - radius) // size), min(self.buckets_x - 1, (x + radius) // size) + 1):
+                for candidate in self._candidates((bx, by), cell, kinds, where):
+                    if candidate[0] <= radius:
+                        found.append(candidate)
+        found.sort()
+        return [(dist, item) for dist, _, item in found]
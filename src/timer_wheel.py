@@ -0,0 +1,64 @@
+#este archivo contiene el calendario de temporizadores ("timer wheel") del mundo.
+#Los elementos con un temporizador (minas G1 que se encienden y apagan, efectos
+#de fuego que se apagan solos) se anotan con el tick en que les toca algo, y en
+#cada tick solo se miran los que vencen. Así el costo por tick depende de los
+#eventos que ocurren y no de la cantidad total de elementos.
+
+
+class TimerWheel:
+    """
+    Rueda de 'num_slots' casilleros indexados por tick % num_slots.
+
+    - schedule(item, delay) anota 'item' para dentro de 'delay' ticks (O(1)).
+      Volver a anotarlo reemplaza el vencimiento anterior.
+    - cancel(item) lo quita (O(1); la entrada vieja se descarta al pasar).
+    - advance() avanza un tick y devuelve los elementos que vencen, en el
+      orden en que se anotaron.
+    Los vencimientos más lejanos que una vuelta completa se conservan en su
+    casillero hasta que llega su vuelta.
+    """
+
+    def __init__(self, num_slots=512):
+        self.slots = [[] for _ in range(num_slots)]
+        self.now = 0
+        self.due = {} # elemento -> tick de vencimiento
+
+    def __len__(self):
+        return len(self.due)
+
+    def __contains__(self, item):
+        return item in self.due
+
+    def schedule(self, item, delay):
+        tick = self.now + max(1, delay)
+        self.due[item] = tick
+        self.slots[tick % len(self.slots)].append(item)
+        return tick
+
+    def cancel(self, item):
+        self.due.pop(item, None)
+
+    def remaining(self, item):
+        """Ticks que faltan para que venza 'item', o None si no está anotado."""
+        tick = self.due.get(item)
+        return None if tick is None else tick - self.now
+
+    def advance(self):
+        self.now += 1
+        index = self.now % len(self.slots)
+        bucket = self.slots[index]
+        if not bucket:
+            return []
+        fired = []
+        pending = []
+        due = self.due
+        for item in bucket:
+            tick = due.get(item)
+            if tick == self.now:
+                fired.append(item)
+                del due[item]
+            elif tick is not None and tick > self.now and tick % len(self.slots) == index:
+                pending.append(item) # Vence en una vuelta posterior
+            # Si no, es una entrada vieja (cancelada o re-anotada en otro casillero)
+        self.slots[index] = pending
+        return fired
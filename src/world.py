@@ -1,58 +1,144 @@
 from . import constants
 import pygame
 from .elements import Tree, Person, Merchandise, Mine
-import random 
-import os
+from .effects import EffectsSystem, FIRE_LIFETIME
 import math
+import numpy as np
 from . import pathfinding
+from .reservations import ReservationTable
+from .occupancy import OccupancyMap
+from .spatial_index import SpatialIndex
+from .free_cells import FreeCellSet
+from .grid_journal import GridJournal
+from .timer_wheel import TimerWheel
+from .assets import get_image
 
 
 class World:
-    def __init__(self, width, height):
-        self.width = width
-        self.height = constants.GAME_WORLD_HEIGHT
+    def __init__(self, width, height, grid_width=None, grid_height=None,
+                 num_trees=None, num_people=None, merch_counts=None, mines_count=None):
+        """
+        'width' y 'height' son el tamaño en píxeles del área del mapa. La grid
+        se deduce de ellos salvo que se pase 'grid_width'/'grid_height'
+        explícitos (por ejemplo, mapas de 400x400 para pruebas de escala,
+        independientes de la ventana). Las cantidades de elementos toman los
+        valores de constants.py si no se indican.
+        """
+        self.grid_width = grid_width or width // constants.TILE
+        self.grid_height = grid_height or height // constants.TILE
+        self.width = self.grid_width * constants.TILE
+        self.height = self.grid_height * constants.TILE
+
+        self.num_trees = constants.NUM_TREES if num_trees is None else num_trees
+        self.num_people = constants.NUM_PEOPLE if num_people is None else num_people
+        self.merch_counts = dict(constants.MERCH_COUNTS if merch_counts is None else merch_counts)
+        self.mines_count = dict(constants.MINES_COUNT if mines_count is None else mines_count)
+        self.total_resources = self.num_people + sum(self.merch_counts.values())
 
         # Definir las áreas de las bases para evitar que se generen objetos en ellas
-        self.base1_pos = (50, constants.GAME_WORLD_HEIGHT // 2)
-        self.base2_pos = (constants.WIDTH - 50, constants.GAME_WORLD_HEIGHT // 2)
+        self.base1_pos = (50, self.height // 2)
+        self.base2_pos = (self.width - 50, self.height // 2)
         self.base_radius = 50  # Radio de la base en píxeles
         
         # grid: 0 libre, 1 árbol, 2 persona, 3 mercancía, 4 mina
-        self.grid = [[0 for _ in range(constants.GRID_WIDTH)] for _ in range(constants.GRID_HEIGHT)]
+        # Array contiguo de uint8 (alto x ancho). Se sigue pudiendo usar como
+        # antes, grid[gy][gx] y len(grid), pero las operaciones en bloque
+        # (limpiar, estampar áreas, contar) se hacen vectorizadas.
+        self.grid = np.zeros((self.grid_height, self.grid_width), dtype=np.uint8)
+
+        # Journal de cambios: toda escritura de la grid (set_cell y las
+        # operaciones en bloque) anota (celda, viejo, nuevo) e incrementa
+        # grid_version. Los cachés derivados consumen solo lo que cambió.
+        self.journal = GridJournal()
+
+        # Celdas de las bases (se calcula una vez) y conjunto de celdas libres
+        # fuera de ellas, para elegir posiciones al azar en O(1). Lo mantienen
+        # set_cell y las operaciones en bloque sobre la grid.
+        centers_x = np.arange(self.grid_width) * constants.TILE + constants.TILE // 2
+        centers_y = np.arange(self.grid_height)[:, None] * constants.TILE + constants.TILE // 2
+        self.base_mask = np.zeros((self.grid_height, self.grid_width), dtype=bool)
+        for bx, by in (self.base1_pos, self.base2_pos):
+            self.base_mask |= np.hypot(centers_x - bx, centers_y - by) <= self.base_radius
+        self.free_cells = FreeCellSet()
+        self._rebuild_free_cells()
+
+        # Caché de caminos de A*, con grid_version como parte de la clave
+        self.path_cache = pathfinding.PathCache()
+
+        # Campos de distancia (BFS) hacia cada base, se crean a demanda y se
+        # ponen al día con el journal al pedirlos
+        self.distance_fields = {}
 
-        # cargar imagen de césped
-        grass_path = os.path.join("assets", "images", "objects", "Grass.png")
-        try:
-            self.grass_image = pygame.image.load(grass_path).convert()
-            self.grass_image = pygame.transform.scale(self.grass_image, (constants.TILE, constants.TILE))
-        except Exception:
-            self.grass_image = pygame.Surface((constants.TILE, constants.TILE))
-            self.grass_image.fill((50, 150, 50))
+        # Grafo jerárquico (HPA*) para a_star(..., method="hpa"), se crea a demanda
+        self.hierarchical_map = None
+        self._hierarchy_version = None
+
+        # Frame lógico actual (lo avanza Simulation.tick) y tablas de reservas
+        # espacio-tiempo de cada equipo, indexadas por la celda de su base
+        self.frame = 0
+        self.reservations = {}
+        # Ocupación (celda -> vehículos) de cada equipo, también por celda de base
+        self.occupancy = {}
+
+        # Planificador en lote de caminos (lo instala Simulation). Sin él, cada
+        # vehículo calcula su camino en el momento.
+        self.path_planner = None
+
+        # Capa de peligro de minas: cuántas minas ACTIVAS cubren cada celda
+        # (índice plano gy * grid_width + gx). La usa el A* con pesos.
+        self.danger = [0] * (self.grid_width * self.grid_height)
+        self.danger_version = 0
+        self.danger_set = set() # Celdas (gx, gy) con peligro > 0
+        self.mine_cells = {} # (gx, gy) -> minas activas en esa celda
+
+        # cargar imagen de césped (compartida, ver assets.py)
+        def grass_fallback():
+            image = pygame.Surface((constants.TILE, constants.TILE))
+            image.fill((50, 150, 50))
+            return image
+        self.grass_image = get_image("Grass.png", (constants.TILE, constants.TILE), grass_fallback, alpha=False)
 
         # Crear árboles
         self.trees = []
-        for _ in range(constants.NUM_TREES):
-            attempts = 0
-            while attempts < 200:
-                gx = random.randint(0, constants.GRID_WIDTH - 1)
-                gy = random.randint(0, constants.GRID_HEIGHT - 1)
-                attempts += 1
-                if self.grid[gy][gx] == 0 and not self.is_in_base_area(gx, gy):
-                    self.grid[gy][gx] = 1
-                    px, py = self.cell_to_pixel(gx, gy)
-                    self.trees.append(Tree(px, py))
-                    break
+        for _ in range(self.num_trees):
+            cell = self.free_cells.sample()
+            if cell is None:
+                break # Mapa lleno
+            gx, gy = cell
+            self.set_cell(gx, gy, 1)
+            px, py = self.cell_to_pixel(gx, gy)
+            self.trees.append(Tree(px, py))
+
         # Inicializamos las listas como vacías
         self.people = []
         self.merch = []
         self.mines = []
         self.resources = []
+        self.resource_cells = {} # (gx, gy) -> recurso
+        self._resource_slots = {} # recurso -> posición en self.resources
+        self._group_slots = {} # recurso -> posición en self.people o self.merch
         self.vehicles = []
-        self.effects = [] # Lista para efectos visuales (fuego, etc.)
+
+        # Índices espaciales para las consultas de "el más cercano" de las
+        # estrategias: recursos (por tipo), minas activas (por tipo) y
+        # vehículos (por equipo, es decir por la celda de su base)
+        self.resource_index = SpatialIndex(self.grid_width, self.grid_height)
+        self.mine_index = SpatialIndex(self.grid_width, self.grid_height)
+        self.vehicle_index = SpatialIndex(self.grid_width, self.grid_height)
+        self.effects = EffectsSystem() # Efectos visuales (fuego y partículas)
+
+        # Calendario de temporizadores: encendido/apagado de minas G1 y reloj
+        # del fuego. Lo avanza advance_timers una vez por tick.
+        self.timers = TimerWheel()
 
     # Funcion para verificar si una celda esta dentro de alguna base 
     def is_in_base_area(self, gx, gy):
         """Verifica si una celda de la grid está dentro de alguna base."""
+        if 0 <= gx < self.grid_width and 0 <= gy < self.grid_height:
+            return bool(self.base_mask[gy, gx])
+        return self._cell_in_base(gx, gy)
+
+    def _cell_in_base(self, gx, gy):
         # Calculamos el centro de la celda en píxeles
         px, py = self.cell_to_pixel(gx, gy)
         px_center = px + constants.TILE // 2
@@ -80,40 +166,32 @@ class World:
         self.resources.clear()
         
         #Resetear la grid (borrar todo excepto los árboles '1')
-        for y in range(constants.GRID_HEIGHT):
-            for x in range(constants.GRID_WIDTH):
-                if self.grid[y][x] != 1: # Si no es un árbol
-                    self.grid[y][x] = 0  # Limpiar la celda
+        self.clear_non_tree_cells()
                     
         #Generar personas 
-        for _ in range(constants.NUM_PEOPLE):
-            attempts = 0
-            while attempts < 200:
-                gx = random.randint(0, constants.GRID_WIDTH - 1)
-                gy = random.randint(0, constants.GRID_HEIGHT - 1)
-                attempts += 1
-                if self.grid[gy][gx] == 0 and not self.is_in_base_area(gx, gy):
-                    self.grid[gy][gx] = 2
-                    px, py = self.cell_to_pixel(gx, gy)
-                    self.people.append(Person(px, py))
-                    break
+        for _ in range(self.num_people):
+            cell = self.free_cells.sample()
+            if cell is None:
+                break # Mapa lleno
+            gx, gy = cell
+            self.set_cell(gx, gy, 2)
+            px, py = self.cell_to_pixel(gx, gy)
+            self.people.append(Person(px, py))
 
         # Generar mercancias 
-        for kind, cnt in constants.MERCH_COUNTS.items():
+        for kind, cnt in self.merch_counts.items():
             for _ in range(cnt):
-                attempts = 0
-                while attempts < 200:
-                    gx = random.randint(0, constants.GRID_WIDTH - 1)
-                    gy = random.randint(0, constants.GRID_HEIGHT - 1)
-                    attempts += 1
-                    if self.grid[gy][gx] == 0 and not self.is_in_base_area(gx, gy):
-                        self.grid[gy][gx] = 3
-                        px, py = self.cell_to_pixel(gx, gy)
-                        self.merch.append(Merchandise(px, py, kind))
-                        break
+                cell = self.free_cells.sample()
+                if cell is None:
+                    break # Mapa lleno
+                gx, gy = cell
+                self.set_cell(gx, gy, 3)
+                px, py = self.cell_to_pixel(gx, gy)
+                self.merch.append(Merchandise(px, py, kind))
 
         # Generar minas 
         self.init_mines()
+        self.rebuild_danger_field()
 
         # Actualizar recursos 
         self.update_resources_list()
@@ -134,9 +212,29 @@ class World:
             p.value = constants.POINTS_PERSON
             self.resources.append(p)
 
+        self._index_resources()
+
+    def _index_resources(self):
+        """
+        Reconstruye los índices de recursos: celda -> recurso y la posición de
+        cada recurso en sus listas (para quitarlo en O(1), ver remove_resource).
+        """
+        self.resource_cells = {(r.gx, r.gy): r for r in self.resources}
+        self._resource_slots = {r: i for i, r in enumerate(self.resources)}
+        self._group_slots = {r: i for i, r in enumerate(self.merch)}
+        self._group_slots.update((p, i) for i, p in enumerate(self.people))
+        self.resource_index.clear()
+        for cell, r in self.resource_cells.items():
+            self.resource_index.insert(r, cell, r.type)
+
     #Guardar 
     def get_state(self):
         """Recopila el estado de todos los elementos del mundo."""
+        # El temporizador de las G1 vive en el calendario: se copia a la mina
+        for mine in self.mines:
+            remaining = self.timers.remaining(mine)
+            if remaining is not None:
+                mine.toggle_timer = constants.G1_TOGGLE_TIME - remaining
         return {
             "people": [p.get_state() for p in self.people],
             "merchandise": [m.get_state() for m in self.merch],
@@ -152,6 +250,7 @@ class World:
         self.merch.clear()
         self.mines.clear()
         self.resources.clear()
+        self.reservations.clear() # Los vehículos se recrean y vuelven a reservar
         
         # 2. Recrear Personas
         for person_data in world_data.get('people', []):
@@ -171,6 +270,7 @@ class World:
             m.active = mine_data.get('active', True)
             m.toggle_timer = mine_data.get('toggle_timer', 0)
             self.mines.append(m)
+        self._schedule_g1_mines()
             
         # 5. Reconstruir la lista de recursos unificada
         self.update_resources_list()
@@ -183,127 +283,431 @@ class World:
         Limpia y reconstruye la grid de navegación basada en los objetos cargados.
         """
         # 1. Resetear la grid (borrar todo excepto los árboles '1')
-        for y in range(constants.GRID_HEIGHT):
-            for x in range(constants.GRID_WIDTH):
-                if self.grid[y][x] != 1: # Si no es un árbol
-                    self.grid[y][x] = 0  # Limpiar la celda
-        
-        # 2. Repoblar la grid con los objetos cargados
-        for p in self.people:
-            gx, gy = self.pixel_to_cell(p.x, p.y)
-            if 0 <= gx < constants.GRID_WIDTH and 0 <= gy < constants.GRID_HEIGHT:
-                self.grid[gy][gx] = 2
+        self.clear_non_tree_cells()
         
-        for m in self.merch:
-            gx, gy = self.pixel_to_cell(m.x, m.y)
-            if 0 <= gx < constants.GRID_WIDTH and 0 <= gy < constants.GRID_HEIGHT:
-                self.grid[gy][gx] = 3
-                
-        for m in self.mines:
-            gx, gy = self.pixel_to_cell(m.x, m.y)
-            if 0 <= gx < constants.GRID_WIDTH and 0 <= gy < constants.GRID_HEIGHT:
-                self.grid[gy][gx] = 4
+        # 2. Repoblar la grid con los objetos cargados (en bloque por tipo)
+        self.stamp_cells([(p.gx, p.gy) for p in self.people], 2)
+        self.stamp_cells([(m.gx, m.gy) for m in self.merch], 3)
+        self.stamp_cells([(m.gx, m.gy) for m in self.mines], 4)
+
+        self.rebuild_danger_field()
     
     def remove_resource(self, resource):
-        """Remueve un recurso del mundo"""
-        if resource in self.resources:
-            self.resources.remove(resource)
-        
-        if resource in self.merch:
-            self.merch.remove(resource)
-            # Actualizar grid
-            gx, gy = self.pixel_to_cell(resource.x, resource.y)
-            if 0 <= gx < constants.GRID_WIDTH and 0 <= gy < constants.GRID_HEIGHT:
-                self.grid[gy][gx] = 0
-        
-        if resource in self.people:
-            self.people.remove(resource)
-            # Actualizar grid
-            gx, gy = self.pixel_to_cell(resource.x, resource.y)
-            if 0 <= gx < constants.GRID_WIDTH and 0 <= gy < constants.GRID_HEIGHT:
-                self.grid[gy][gx] = 0
+        """
+        Remueve un recurso del mundo en O(1): el último elemento de cada lista
+        ocupa el lugar del removido, así que el orden de las listas puede cambiar.
+        """
+        slot = self._resource_slots.pop(resource, None)
+        if slot is None:
+            return
+        self._swap_remove(self.resources, slot, self._resource_slots)
+        group = self.people if resource.type == "person" else self.merch
+        self._swap_remove(group, self._group_slots.pop(resource), self._group_slots)
+
+        # Actualizar índice y grid
+        gx, gy = resource.gx, resource.gy
+        if self.resource_cells.get((gx, gy)) is resource:
+            del self.resource_cells[(gx, gy)]
+        self.resource_index.remove(resource)
+        if 0 <= gx < self.grid_width and 0 <= gy < self.grid_height:
+            self.set_cell(gx, gy, 0)
+
+    @staticmethod
+    def _swap_remove(items, slot, slots):
+        last = items.pop()
+        if slot < len(items):
+            items[slot] = last
+            slots[last] = slot
+
+    def has_resource(self, resource):
+        return resource in self._resource_slots
+
+    def resource_at(self, gx, gy):
+        """Recurso que está en la celda (gx, gy), o None."""
+        return self.resource_cells.get((gx, gy))
+
+    def resources_in_cells(self, cells):
+        """Recursos ubicados en alguna de las celdas dadas (O(cantidad de celdas))."""
+        found = []
+        for cell in cells:
+            resource = self.resource_cells.get(cell)
+            if resource is not None:
+                found.append(resource)
+        return found
+
+    def random_free_cell(self):
+        """Celda libre (fuera de las bases) elegida al azar, o None si no hay."""
+        return self.free_cells.sample()
 
     def random_position(self):
         """Devuelve una posición aleatoria válida en píxeles"""
-        for _ in range(100):
-            gx = random.randint(0, constants.GRID_WIDTH - 1)
-            gy = random.randint(0, constants.GRID_HEIGHT - 1)
-            if self.is_walkable(gx, gy):
-                return self.cell_to_pixel(gx, gy)
+        cell = self.free_cells.sample()
+        if cell is not None:
+            return self.cell_to_pixel(*cell)
         # Fallback: centro del mapa
         return (self.width // 2, self.height // 2)
 
     def find_nearest_enemy(self, vehicle):
-        """Busca el vehículo enemigo más cercano"""
-        enemies = [v for v in self.vehicles if v is not vehicle and v.alive]
-        if not enemies:
-            return None
-        
-        nearest = min(enemies, key=lambda e: math.hypot(vehicle.x - e.x, vehicle.y - e.y))
-        return nearest
-    
+        """Busca el vehículo enemigo (de otro equipo) vivo más cercano, en celdas."""
+        enemies = [team for team in self.occupancy if team != vehicle.base_target_cell]
+        found = self.vehicle_index.nearest((vehicle.gx, vehicle.gy), enemies,
+                                           where=lambda v: v.alive)
+        return found[0][1] if found else None
+
+    def nearest_resource(self, gx, gy, types=None, where=None):
+        """Recurso más cercano (Manhattan) de alguno de los tipos dados, o None."""
+        found = self.resource_index.nearest((gx, gy), types, where=where)
+        return found[0][1] if found else None
+
+    def resources_by_distance(self, gx, gy, types=None, where=None):
+        """Generador de (distancia, recurso) de menor a mayor distancia."""
+        return self.resource_index.iter_nearest((gx, gy), types, where)
+
+    def nearest_mine(self, gx, gy):
+        """(distancia, mina) de la mina activa más cercana, o None."""
+        found = self.mine_index.nearest((gx, gy))
+        return found[0] if found else None
+
+    def active_mines_within(self, gx, gy, radius):
+        """Minas activas a distancia Manhattan <= radius de la celda."""
+        return [mine for _, mine in self.mine_index.within((gx, gy), radius)]
+
     def init_mines(self):
         """Inicializa las minas en posiciones aleatorias"""
         self.mines.clear()
+        placed = {} # celda -> mina, para verificar la distancia solo con las vecinas
         
-        for mine_type, count in constants.MINES_COUNT.items():
+        for mine_type, count in self.mines_count.items():
             for _ in range(count):
-                attempts = 0
-                while attempts < 200:
-                    gx = random.randint(0, constants.GRID_WIDTH - 1)
-                    gy = random.randint(0, constants.GRID_HEIGHT - 1)
-                    
-                    if self.grid[gy][gx] != 0 or self.is_in_base_area(gx, gy):
-                        attempts += 1
-                        continue
-                
+                # Las celdas libres ya excluyen bases y ocupadas; solo se
+                # reintenta si la celda elegida queda muy cerca de otra mina
+                for _ in range(200):
+                    cell = self.free_cells.sample()
+                    if cell is None:
+                        break # Mapa lleno
+                    gx, gy = cell
                     px, py = self.cell_to_pixel(gx, gy)
                 
-                    # Verificar distancia a otras minas
+                    # Verificar distancia a otras minas (solo pueden estar en celdas vecinas)
                     too_close = False
-                    for mine in self.mines:
-                        if math.hypot(px - mine.x, py - mine.y) < constants.TILE:
-                            too_close = True
-                            break
+                    for dy in (-1, 0, 1):
+                        for dx in (-1, 0, 1):
+                            mine = placed.get((gx + dx, gy + dy))
+                            if mine and math.hypot(px - mine.x, py - mine.y) < constants.TILE:
+                                too_close = True
                         
                     if not too_close:
                         # Usamos el CENTRO de la celda para la posición de la mina
                         px, py = self.cell_to_pixel_center(gx, gy)
-                        self.mines.append(Mine(px, py, mine_type))
-                        self.grid[gy][gx] = 4
+                        mine = Mine(px, py, mine_type)
+                        self.mines.append(mine)
+                        placed[cell] = mine
+                        self.set_cell(gx, gy, 4)
                         break
-                    
-                    attempts += 1
-                    
-    def update_g1_mines(self):
+        self._schedule_g1_mines()
+
+    def _schedule_g1_mines(self):
+        """Anota en el calendario el próximo cambio de cada mina G1 (y olvida las anteriores)."""
+        for item in list(self.timers.due):
+            if isinstance(item, Mine):
+                self.timers.cancel(item)
+        for mine in self.mines:
+            if mine.type == "G1":
+                self.timers.schedule(mine, constants.G1_TOGGLE_TIME - mine.toggle_timer)
+
+    def prune_inactive_mines(self):
+        """
+        Quita de self.mines las minas inactivas (explotadas, o G1 apagadas en
+        ese momento) junto con sus temporizadores.
         """
-        Actualiza minas dinámicas G1.
+        kept = []
+        for mine in self.mines:
+            if mine.active:
+                kept.append(mine)
+            else:
+                self.timers.cancel(mine)
+        self.mines = kept
+
+    def advance_timers(self):
+        """
+        Avanza un tick el calendario: enciende/apaga las minas G1 cuyo
+        temporizador venció y quita el fuego terminado. Solo se tocan las
+        minas que vencen en este tick.
         Devuelve True si ALGUNA mina cambió de estado.
         """
         a_mine_changed = False
-        for mine in self.mines:
-            if mine.type == "G1":
-                if mine.update(): # mine.update() ahora devuelve True si cambió
-                    a_mine_changed = True
+        for mine in self.timers.advance():
+            mine.toggle()
+            self._add_mine_danger(mine, 1 if mine.active else -1)
+            self.timers.schedule(mine, constants.G1_TOGGLE_TIME)
+            a_mine_changed = True
+        self.effects.expire_fires(self.timers.now)
         return a_mine_changed
 
     def relocate_g1_mines(self):
         """Reubica minas G1"""
         for mine in self.mines:
             if mine.type == "G1":
-                gx_old, gy_old = self.pixel_to_cell(mine.x, mine.y)
-                if 0 <= gx_old < constants.GRID_WIDTH and 0 <= gy_old < constants.GRID_HEIGHT:
-                    self.grid[gy_old][gx_old] = 0
-
-                attempts = 0
-                while attempts < 200:
-                    gx = random.randint(0, constants.GRID_WIDTH - 1)
-                    gy = random.randint(0, constants.GRID_HEIGHT - 1)
-                    if self.grid[gy][gx] == 0 and not self.is_in_base_area(gx, gy):
-                        mine.x, mine.y = self.cell_to_pixel(gx, gy)
-                        self.grid[gy][gx] = 4
-                        break
-                    attempts += 1
+                if mine.active:
+                    self._add_mine_danger(mine, -1)
+                gx_old, gy_old = mine.gx, mine.gy
+                if 0 <= gx_old < self.grid_width and 0 <= gy_old < self.grid_height:
+                    self.set_cell(gx_old, gy_old, 0)
+
+                cell = self.free_cells.sample()
+                if cell is not None:
+                    gx, gy = cell
+                    mine.set_position(*self.cell_to_pixel(gx, gy))
+                    self.set_cell(gx, gy, 4)
+                if mine.active:
+                    self._add_mine_danger(mine, 1)
+
+    # -------------------------------
+    # Operaciones en bloque sobre la grid
+    # -------------------------------
+
+    @property
+    def grid_version(self):
+        """Versión de la grid: cantidad de escrituras anotadas en el journal."""
+        return self.journal.version
+
+    def set_cell(self, gx, gy, value):
+        """
+        Escribe una celda de la grid: la anota en el journal (si cambia) y
+        mantiene el conjunto de celdas libres.
+        """
+        old = int(self.grid[gy, gx])
+        if old == value:
+            return
+        self.grid[gy, gx] = value
+        self.journal.record((gx, gy), old, value)
+        if value == 0 and not self.base_mask[gy, gx]:
+            self.free_cells.add((gx, gy))
+        else:
+            self.free_cells.discard((gx, gy))
+
+    def _rebuild_free_cells(self):
+        ys, xs = np.nonzero((self.grid == 0) & ~self.base_mask)
+        self.free_cells = FreeCellSet(zip(xs.tolist(), ys.tolist()))
+
+    def clear_non_tree_cells(self):
+        """Deja en 0 todas las celdas que no son árboles."""
+        changed = (self.grid != 1) & (self.grid != 0)
+        ys, xs = np.nonzero(changed)
+        record = self.journal.record
+        for gx, gy, old in zip(xs.tolist(), ys.tolist(), self.grid[ys, xs].tolist()):
+            record((gx, gy), old, 0)
+        self.grid[changed] = 0
+        self._rebuild_free_cells()
+
+    def stamp_cells(self, cells, value):
+        """Escribe 'value' en todas las celdas (gx, gy) dentro del mapa."""
+        cells = list(cells)
+        if not cells:
+            return
+        xs, ys = np.array(cells, dtype=np.intp).T
+        inside = (xs >= 0) & (xs < self.grid_width) & (ys >= 0) & (ys < self.grid_height)
+        xs, ys = xs[inside], ys[inside]
+        # Solo se anotan (y tocan) las celdas cuyo valor cambia
+        olds = self.grid[ys, xs]
+        changed = olds != value
+        xs, ys, olds = xs[changed], ys[changed], olds[changed]
+        self.grid[ys, xs] = value
+        record = self.journal.record
+        free = value == 0
+        seen = set()
+        for gx, gy, old in zip(xs.tolist(), ys.tolist(), olds.tolist()):
+            if (gx, gy) in seen:
+                continue # Celda repetida en 'cells', ya anotada
+            seen.add((gx, gy))
+            record((gx, gy), old, value)
+            if free and not self.base_mask[gy, gx]:
+                self.free_cells.add((gx, gy))
+            else:
+                self.free_cells.discard((gx, gy))
+
+    def count_cells(self, value=0):
+        """Cantidad de celdas con el código 'value' (por defecto, libres)."""
+        return int(np.count_nonzero(self.grid == value))
+
+    def mine_footprint(self, mine):
+        """Celdas (gx, gy) cuyo centro está dentro del área de la mina."""
+        center_gx, center_gy = mine.gx, mine.gy
+        cells = []
+        for dx, dy in mine.footprint_offsets():
+            gx, gy = center_gx + dx, center_gy + dy
+            if 0 <= gx < self.grid_width and 0 <= gy < self.grid_height:
+                cells.append((gx, gy))
+        return cells
+
+    def _add_mine_danger(self, mine, delta):
+        """
+        Suma (o resta) el área de la mina a la capa de peligro. Como todas las
+        activaciones y desactivaciones pasan por acá, también mantiene el
+        índice celda -> minas activas que usan los disparos y el conjunto de
+        celdas con peligro.
+        """
+        danger = self.danger
+        danger_set = self.danger_set
+        for cell in self.mine_footprint(mine):
+            idx = cell[1] * self.grid_width + cell[0]
+            danger[idx] += delta
+            if danger[idx] > 0:
+                danger_set.add(cell)
+            else:
+                danger_set.discard(cell)
+        self.danger_version += 1
+
+        cell = (mine.gx, mine.gy)
+        if delta > 0:
+            self.mine_cells.setdefault(cell, []).append(mine)
+            self.mine_index.insert(mine, cell, mine.type)
+        elif mine in self.mine_cells.get(cell, ()):
+            self.mine_index.remove(mine)
+            self.mine_cells[cell].remove(mine)
+            if not self.mine_cells[cell]:
+                del self.mine_cells[cell]
+
+    def rebuild_danger_field(self):
+        """Recalcula la capa de peligro (y el índice de minas) con las minas activas."""
+        self.danger = [0] * (self.grid_width * self.grid_height)
+        self.danger_set = set()
+        self.mine_cells = {}
+        self.mine_index.clear()
+        for mine in self.mines:
+            if mine.active:
+                self._add_mine_danger(mine, 1)
+        self.danger_version += 1
+
+    def active_mines_at(self, gx, gy):
+        """Minas activas ubicadas en la celda (gx, gy) (las que dispara un vehículo ahí)."""
+        return self.mine_cells.get((gx, gy), ())
+
+    def explode_mine(self, mine):
+        """
+        Explosión de una mina: destruye los vehículos y recursos de su área,
+        limpia esas celdas, agrega el fuego y desactiva la mina.
+        Devuelve los vehículos destruidos.
+        """
+        affected_cells = self.mine_footprint(mine)
+
+        # 1. Identificar y destruir las entidades del área
+        killed = []
+        for cell in affected_cells:
+            killed.extend(self.vehicles_at(*cell))
+        for v in killed:
+            v.die()
+        for r in self.resources_in_cells(affected_cells):
+            self.remove_resource(r)
+
+        # 2. Limpiar la grid y añadir efectos de fuego
+        self.stamp_cells(affected_cells, 0) # Las celdas quedan vacías
+        self.effects.add_fires((self.cell_to_pixel(gx, gy) for gx, gy in affected_cells),
+                               self.timers.now + FIRE_LIFETIME)
+
+        # 3. Desactivar la mina
+        self.deactivate_mine(mine)
+        return killed
+
+    def deactivate_mine(self, mine):
+        """Desactiva una mina (explosión) y quita su área de la capa de peligro."""
+        if mine.active:
+            self._add_mine_danger(mine, -1)
+        mine.active = False
+
+    def is_dangerous(self, gx, gy):
+        """True si la celda está dentro del área de alguna mina activa."""
+        return self.danger[gy * self.grid_width + gx] > 0
+
+    def danger_cells(self):
+        """
+        Conjunto de celdas (gx, gy) cubiertas por alguna mina activa. Se
+        mantiene al activar y desactivar minas; es el mismo objeto del mundo,
+        así que no hay que modificarlo.
+        """
+        return self.danger_set
+
+    def get_distance_field(self, target_cell):
+        """
+        Devuelve el campo de distancias hacia target_cell. Lo crea si hace
+        falta y, si la grid cambió desde entonces, le aplica los cambios del
+        journal (o lo reconstruye si no alcanza con eso).
+        """
+        field = self.distance_fields.get(target_cell)
+        version = self.grid_version
+        if field is not None and field.version != version:
+            changes = self.journal.since(field.version)
+            if changes is None or not field.apply_changes(changes):
+                field = None
+        if field is None:
+            field = pathfinding.DistanceField(target_cell, self.grid)
+            self.distance_fields[target_cell] = field
+        field.version = version
+        return field
+
+    def get_hierarchical_map(self):
+        """
+        Devuelve el grafo jerárquico de la grid (lo crea si hace falta). Los
+        cambios posteriores se le pasan desde el journal: solo se recalculan
+        los clusters donde cambió la caminabilidad.
+        """
+        version = self.grid_version
+        if self.hierarchical_map is not None and self._hierarchy_version != version:
+            changes = self.journal.since(self._hierarchy_version)
+            if changes is None:
+                self.hierarchical_map = None
+            else:
+                self.hierarchical_map.update_cells((gx, gy, new) for (gx, gy), _, new in changes)
+        if self.hierarchical_map is None:
+            self.hierarchical_map = pathfinding.HierarchicalMap(self.grid)
+        self._hierarchy_version = version
+        return self.hierarchical_map
+
+    def get_occupancy(self, base_cell):
+        """Índice celda -> vehículos del equipo cuya base es 'base_cell'."""
+        occupancy = self.occupancy.get(base_cell)
+        if occupancy is None:
+            occupancy = self.occupancy[base_cell] = OccupancyMap()
+        return occupancy
+
+    def track_vehicle(self, vehicle):
+        """Actualiza la ocupación tras un cambio de gx/gy o current_target_cell."""
+        self.get_occupancy(vehicle.base_target_cell).place(vehicle)
+        self.vehicle_index.move(vehicle, (vehicle.gx, vehicle.gy), vehicle.base_target_cell)
+
+    def reset_occupancy(self):
+        """Reconstruye la ocupación de todos los equipos desde self.vehicles."""
+        for occupancy in self.occupancy.values():
+            occupancy.clear()
+        self.vehicle_index.clear()
+        for vehicle in self.vehicles:
+            self.track_vehicle(vehicle)
+
+    def vehicles_at(self, gx, gy):
+        """Vehículos vivos (de cualquier equipo) en la celda (gx, gy)."""
+        found = []
+        for occupancy in self.occupancy.values():
+            found.extend(occupancy.vehicles_at((gx, gy)))
+        return found
+
+    def get_reservations(self, base_cell):
+        """Tabla de reservas del equipo cuya base está en base_cell."""
+        table = self.reservations.get(base_cell)
+        if table is None:
+            table = ReservationTable()
+            self.reservations[base_cell] = table
+        return table
+
+    def path_to_base(self, start_cell, base_cell):
+        """
+        Camino (lista de celdas, incluye el inicio) desde start_cell hasta la
+        base siguiendo su campo de distancias. Si el inicio es una celda no
+        caminable (el BFS no entra en ella) se usa A* como respaldo.
+        """
+        path = self.get_distance_field(base_cell).path_from(start_cell)
+        if path is None and not self.is_walkable(*start_cell):
+            path = pathfinding.a_star(start_cell, base_cell, self)
+        return path
 
     def pixel_to_cell(self, x, y):
         """Convierte píxeles a coordenadas de celda"""
@@ -321,26 +725,26 @@ class World:
         """
         Verifica si una celda es caminable para el ALGORITMO A*.
         """
-        if gx < 0 or gy < 0 or gx >= constants.GRID_WIDTH or gy >= constants.GRID_HEIGHT:
+        if gx < 0 or gy < 0 or gx >= self.grid_width or gy >= self.grid_height:
             return False # Fuera del mapa
             
         # Es caminable si es 0 (suelo), 2 (persona) o 3 (mercancía).
         # NO es caminable si es 1 (árbol) o 4 (mina).
-        return self.grid[gy][gx] in (0, 2, 3, 4)
+        return self.grid[gy, gx] != 1
 
     def get_neighbors(self, gx, gy):
         """Obtiene celdas adyacentes válidas"""
         dirs = [(1, 0), (-1, 0), (0, 1), (0, -1)]
         for dx, dy in dirs:
             nx, ny = gx + dx, gy + dy
-            if 0 <= nx < constants.GRID_WIDTH and 0 <= ny < constants.GRID_HEIGHT and self.is_walkable(nx, ny):
+            if 0 <= nx < self.grid_width and 0 <= ny < self.grid_height and self.is_walkable(nx, ny):
                 yield nx, ny
 
     def draw(self, screen):
         """Dibuja el mundo"""
         # Fondo
-        for gy in range(constants.GRID_HEIGHT):
-            for gx in range(constants.GRID_WIDTH):
+        for gy in range(self.grid_height):
+            for gx in range(self.grid_width):
                 px, py = self.cell_to_pixel(gx, gy)
                 screen.blit(self.grass_image, (px, py))
 
@@ -355,8 +759,7 @@ class World:
             mine.draw(screen)
             
         # Efectos (fuego, etc.)
-        for effect in self.effects:
-            effect.draw(screen)
+        self.effects.draw_fires(screen, self.timers.now)
 
     def draw_premium_hud(self, screen, player1_vehicles, player2_vehicles, game_time):
         """HUD moderno y mejorado"""
@@ -382,10 +785,12 @@ class World:
         # Calcular estadísticas
         p1_score = sum(v.score for v in player1_vehicles)
         p1_alive = sum(1 for v in player1_vehicles if v.alive)
+        p1_total = max(1, len(player1_vehicles))
         p1_cargo = sum(len(v.cargo) for v in player1_vehicles)
         
         p2_score = sum(v.score for v in player2_vehicles)
         p2_alive = sum(1 for v in player2_vehicles if v.alive)
+        p2_total = max(1, len(player2_vehicles))
         p2_cargo = sum(len(v.cargo) for v in player2_vehicles)
         
         # Panel Jugador 1 (Izquierda)
@@ -407,15 +812,15 @@ class World:
         y += 30
         
         # Progreso
-        alive_text = font_normal.render(f"Vivos: {p1_alive}/10", True, (150, 255, 150) if p1_alive > 5 else (255, 150, 150))
+        alive_text = font_normal.render(f"Vivos: {p1_alive}/{len(player1_vehicles)}", True, (150, 255, 150) if p1_alive > p1_total / 2 else (255, 150, 150))
         screen.blit(alive_text, (20, y))
         y += 22
         
         # Barra de vivos
         bar_width = panel_width - 40
         pygame.draw.rect(screen, (50, 50, 50), (20, y, bar_width, 8), border_radius=4)
-        alive_bar = int(bar_width * (p1_alive / 10))
-        color = (100, 255, 100) if p1_alive > 5 else (255, 100, 100)
+        alive_bar = int(bar_width * (p1_alive / p1_total))
+        color = (100, 255, 100) if p1_alive > p1_total / 2 else (255, 100, 100)
         pygame.draw.rect(screen, color, (20, y, alive_bar, 8), border_radius=4)
         y += 18
         
@@ -426,10 +831,10 @@ class World:
         
         # Tipos de vehículos con iconos
         types = [
-            ("Jeep", sum(1 for v in player1_vehicles if v.vehicle_type == "jeep" and v.alive), 3),
-            ("Moto", sum(1 for v in player1_vehicles if v.vehicle_type == "moto" and v.alive), 2),
-            ("Cam", sum(1 for v in player1_vehicles if v.vehicle_type == "camion" and v.alive), 2),
-            ("Auto", sum(1 for v in player1_vehicles if v.vehicle_type == "auto" and v.alive), 3)
+            ("Jeep", sum(1 for v in player1_vehicles if v.vehicle_type == "jeep" and v.alive), sum(1 for v in player1_vehicles if v.vehicle_type == "jeep")),
+            ("Moto", sum(1 for v in player1_vehicles if v.vehicle_type == "moto" and v.alive), sum(1 for v in player1_vehicles if v.vehicle_type == "moto")),
+            ("Cam", sum(1 for v in player1_vehicles if v.vehicle_type == "camion" and v.alive), sum(1 for v in player1_vehicles if v.vehicle_type == "camion")),
+            ("Auto", sum(1 for v in player1_vehicles if v.vehicle_type == "auto" and v.alive), sum(1 for v in player1_vehicles if v.vehicle_type == "auto"))
         ]
         
         x_offset = 20
@@ -458,14 +863,14 @@ class World:
         y += 30
         
         # Vivos
-        alive_text = font_normal.render(f"Vivos: {p2_alive}/10", True, (150, 255, 150) if p2_alive > 5 else (255, 150, 150))
+        alive_text = font_normal.render(f"Vivos: {p2_alive}/{len(player2_vehicles)}", True, (150, 255, 150) if p2_alive > p2_total / 2 else (255, 150, 150))
         screen.blit(alive_text, (x_base, y))
         y += 22
         
         # Barra de vivos
         pygame.draw.rect(screen, (50, 50, 50), (x_base, y, bar_width, 8), border_radius=4)
-        alive_bar = int(bar_width * (p2_alive / 10))
-        color = (100, 255, 100) if p2_alive > 5 else (255, 100, 100)
+        alive_bar = int(bar_width * (p2_alive / p2_total))
+        color = (100, 255, 100) if p2_alive > p2_total / 2 else (255, 100, 100)
         pygame.draw.rect(screen, color, (x_base, y, alive_bar, 8), border_radius=4)
         y += 18
         
@@ -476,10 +881,10 @@ class World:
         
         # Tipos
         types = [
-            ("Jeep", sum(1 for v in player2_vehicles if v.vehicle_type == "jeep" and v.alive), 3),
-            ("Moto", sum(1 for v in player2_vehicles if v.vehicle_type == "moto" and v.alive), 2),
-            ("Cam", sum(1 for v in player2_vehicles if v.vehicle_type == "camion" and v.alive), 2),
-            ("Auto", sum(1 for v in player2_vehicles if v.vehicle_type == "auto" and v.alive), 3)
+            ("Jeep", sum(1 for v in player2_vehicles if v.vehicle_type == "jeep" and v.alive), sum(1 for v in player2_vehicles if v.vehicle_type == "jeep")),
+            ("Moto", sum(1 for v in player2_vehicles if v.vehicle_type == "moto" and v.alive), sum(1 for v in player2_vehicles if v.vehicle_type == "moto")),
+            ("Cam", sum(1 for v in player2_vehicles if v.vehicle_type == "camion" and v.alive), sum(1 for v in player2_vehicles if v.vehicle_type == "camion")),
+            ("Auto", sum(1 for v in player2_vehicles if v.vehicle_type == "auto" and v.alive), sum(1 for v in player2_vehicles if v.vehicle_type == "auto"))
         ]
         
         x_offset = x_base
@@ -495,18 +900,18 @@ class World:
         draw_panel(screen, resource_panel_x, 10, resource_panel_width, 55, (40, 40, 50))
         
         # Calcular recursos totales y restantes
-        total_resources = 60  # 10 personas + 50 mercancías
+        total_resources = self.total_resources
         resources_remaining = len(self.resources)
         resources_collected = total_resources - resources_remaining
         
         # Texto de recursos
-        resource_color = (150, 255, 150) if resources_remaining > 30 else (255, 200, 100) if resources_remaining > 10 else (255, 100, 100)
-        resource_text = font_title.render(f"Recursos: {resources_remaining}/60", True, resource_color)
+        resource_color = (150, 255, 150) if resources_remaining > total_resources / 2 else (255, 200, 100) if resources_remaining > total_resources / 6 else (255, 100, 100)
+        resource_text = font_title.render(f"Recursos: {resources_remaining}/{total_resources}", True, resource_color)
         screen.blit(resource_text, (resource_panel_x + 20, 18))
         
         # Barra de progreso de recolección
         progress_bar_width = resource_panel_width - 40
-        collection_progress = resources_collected / total_resources
+        collection_progress = resources_collected / total_resources if total_resources else 0
         pygame.draw.rect(screen, (50, 50, 50), (resource_panel_x + 20, 45, progress_bar_width, 8), border_radius=4)
         pygame.draw.rect(screen, resource_color, (resource_panel_x + 20, 45, int(progress_bar_width * collection_progress), 8), border_radius=4)
         
@@ -0,0 +1,9 @@
+from src.aircraft import Auto, Jeep
+
+
+def test_sprites_compartidos_por_tipo_y_color():
+    a = Jeep("a", 1, 1, (50, 300), (255, 0, 0))
+    b = Jeep("b", 2, 2, (50, 300), [255, 0, 0]) # Color como lista (partidas guardadas)
+    assert a.image is b.image
+    assert Jeep("c", 1, 1, (50, 300), (0, 0, 255)).image is not a.image
+    assert Auto("d", 1, 1, (50, 300), (255, 0, 0)).image is not a.image
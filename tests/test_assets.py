@@ -0,0 +1,21 @@
+import pygame
+
+from src import assets
+from src.elements import Mine, Person
+
+
+def test_imagenes_compartidas_se_cargan_una_vez():
+    assets.clear_cache()
+    calls = []
+
+    def fallback():
+        calls.append(1)
+        return pygame.Surface((4, 4))
+
+    first = assets.get_image("no_existe.png", (4, 4), fallback)
+    assert assets.get_image("no_existe.png", (4, 4), fallback) is first
+    assert len(calls) == 1
+
+    assert Person(0, 0).image is Person(10, 10).image
+    assert Mine(5, 5, "O1").image is Mine(25, 25, "O1").image
+    assert Mine(5, 5, "O1").image is not Mine(5, 5, "T1").image
@@ -0,0 +1,18 @@
+from src.effects import EffectsSystem, PARTICLE_LIFETIME
+
+
+def test_particulas_y_fuego_en_arreglos():
+    effects = EffectsSystem(capacity=4)
+    effects.emit_particles(10, 20, (255, 0, 0), 1.0, -2.0, count=15)
+    assert effects.particles.count == 15 and effects.particles.capacity >= 15
+    effects.update_particles()
+    assert effects.particles.x[0] == 11 and effects.particles.y[0] == 18
+    for _ in range(PARTICLE_LIFETIME - 1):
+        effects.update_particles()
+    assert effects.particles.count == 0
+
+    effects.add_fires([(0, 0), (20, 0)], expires=5)
+    effects.add_fires([(40, 0)], expires=9)
+    effects.expire_fires(5)
+    assert effects.fire_count == 1 and effects.fires.x[0] == 40
+    assert len(effects) == 1
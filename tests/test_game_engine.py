@@ -0,0 +1,97 @@
+import sys
+
+from src.simulation import Simulation
+
+
+def test_importar_game_engine_no_abre_ventana():
+    import src.game_engine as game_engine
+    assert game_engine.screen is None
+    assert "pygame" not in sys.modules or not sys.modules["pygame"].display.get_init()
+
+
+def test_simulacion_headless_avanza_ticks():
+    sim = Simulation(seed=1)
+    sim.initialize_map()
+    assert len(sim.player1_vehicles) == 10
+    assert len(sim.player2_vehicles) == 10
+    assert sim.world.vehicles == sim.player1_vehicles + sim.player2_vehicles
+
+    sim.step(50)
+    assert sim.game_time == 50
+
+
+def test_simulacion_guardar_y_cargar_estado():
+    sim = Simulation(seed=2)
+    sim.initialize_map()
+    sim.step(30)
+    data = sim.get_full_game_state()
+
+    other = Simulation(seed=3)
+    fleet = other.player1_vehicles
+    other.load_game_from_data(data)
+    assert other.player1_vehicles is fleet # la lista se actualiza "in place"
+    assert other.game_time == 30
+    assert [v.get_state() for v in other.player1_vehicles] == data["player1_vehicles"]
+    assert len(other.world.resources) == len(sim.world.resources)
+
+
+def test_partida_completa_termina():
+    sim = Simulation(seed=4)
+    sim.initialize_map()
+    winner, p1_score, p2_score = sim.run_until_over(20000)
+    assert sim.game_over
+    assert winner in ("Jugador 1", "Jugador 2", "Empate")
+
+
+def test_avance_rapido_por_ticks_y_presupuesto():
+    sim = Simulation(seed=5)
+    sim.initialize_map()
+    recorded = []
+    assert sim.run_for(16, on_tick=recorded.append) == 16
+    assert sim.game_time == 16 and len(recorded) == 16
+
+    # Con presupuesto casi nulo corre al menos un tick y corta
+    assert sim.run_for(None, budget_seconds=0) == 1
+
+    # Sin presupuesto, el tope de ticks es el único límite: corta al terminar
+    before = sim.game_time
+    done = sim.run_for(20000)
+    assert sim.game_over and done < 20000
+    assert sim.game_time == before + done
+
+
+def test_a_x1_un_tick_por_frame_con_cualquier_dibujo():
+    from src import constants
+    from src.game_engine import run_frame_logic
+
+    sim = Simulation(seed=3)
+    sim.initialize_map()
+    for render_every in constants.RENDER_EVERY_OPTIONS:
+        for frame in range(1, 17):
+            skip_render = frame % render_every != 0
+            assert run_frame_logic(sim, 1, skip_render) == 1
+    assert sim.game_time == 16 * len(constants.RENDER_EVERY_OPTIONS)
+
+
+def test_paso_atras_vuelve_a_un_estado_completo():
+    from collections import deque
+
+    from src import constants
+    from src.game_engine import nearest_full_frame, record_history
+
+    sim = Simulation(seed=4)
+    sim.initialize_map()
+    history = deque(maxlen=50)
+    sim.run_for(95, on_tick=lambda _: record_history(history, sim))
+    assert len(history) == 50 # El tope descarta las entradas más viejas
+
+    # Retroceder 10 entradas cae cerca de un estado completo, no solo de
+    # posiciones: al cargarlo vuelven el tiempo, la carga y los recursos
+    index = nearest_full_frame(history, len(history) - 1 - 10)
+    assert index is not None and len(history) - 1 - index <= 2 * (constants.HISTORY_FULL_EVERY + 1)
+    frame = history[index]
+    assert frame["game_time"] % constants.HISTORY_FULL_EVERY == 0
+    sim.load_game_from_data(frame)
+    assert sim.game_time == frame["game_time"]
+    assert sim.get_full_game_state()["player1_vehicles"] == frame["player1_vehicles"]
+    assert sim.world.get_state() == frame["world"]
@@ -0,0 +1,43 @@
+from src.occupancy import OccupancyMap
+from src.simulation import Simulation
+
+
+class FakeVehicle:
+    def __init__(self, gx, gy):
+        self.gx, self.gy = gx, gy
+        self.current_target_cell = None
+        self.alive = True
+
+
+def test_ocupacion_sigue_a_los_vehiculos():
+    occupancy = OccupancyMap()
+    a, b = FakeVehicle(1, 1), FakeVehicle(1, 1)
+    occupancy.place(a)
+    occupancy.place(b)
+    assert occupancy.vehicles_at((1, 1)) == [a, b]
+
+    a.current_target_cell = (2, 1)
+    occupancy.place(a)
+    assert occupancy.vehicles_heading((2, 1)) == [a]
+
+    a.gx, a.gy, a.current_target_cell = 2, 1, None
+    occupancy.place(a)
+    assert occupancy.vehicles_at((1, 1)) == [b]
+    assert occupancy.vehicles_at((2, 1)) == [a]
+    assert not occupancy.heading
+    assert occupancy.occupied_cells(exclude=b) == [(2, 1)]
+    assert occupancy.occupied_cells(skip=(2, 1)) == [(1, 1)]
+
+    b.alive = False # Los destruidos no cuentan
+    assert occupancy.vehicles_at((1, 1)) == []
+
+
+def test_ocupacion_coincide_con_las_posiciones_durante_la_partida():
+    sim = Simulation(seed=3)
+    sim.initialize_map()
+    world = sim.world
+    for _ in range(400):
+        sim.tick()
+        for vehicle in world.vehicles:
+            if vehicle.alive:
+                assert vehicle in world.vehicles_at(vehicle.gx, vehicle.gy)
@@ -0,0 +1,347 @@
+import random
+
+from src import pathfinding
+
+
+class FakeWorld:
+    """Mundo mínimo: solo la grid y la misma vecindad que World."""
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.height = len(grid)
+        self.width = len(grid[0])
+
+    def is_walkable(self, gx, gy):
+        if gx < 0 or gy < 0 or gx >= self.width or gy >= self.height:
+            return False
+        return self.grid[gy][gx] in (0, 2, 3, 4)
+
+    def get_neighbors(self, gx, gy):
+        for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
+            nx, ny = gx + dx, gy + dy
+            if self.is_walkable(nx, ny):
+                yield nx, ny
+
+
+def random_world(rng, width=40, height=21, tree_ratio=0.2):
+    grid = [[1 if rng.random() < tree_ratio else rng.choice((0, 0, 2, 3, 4))
+             for _ in range(width)] for _ in range(height)]
+    return FakeWorld(grid)
+
+
+def test_path_cache_lru_y_version():
+    world = FakeWorld([[0] * 5 for _ in range(3)])
+    world.grid_version = 0
+    world.path_cache = pathfinding.PathCache(maxsize=2)
+
+    first = pathfinding.a_star((0, 0), (4, 2), world)
+    again = pathfinding.a_star((0, 0), (4, 2), world)
+    assert first == again and first is not again
+    assert (world.path_cache.hits, world.path_cache.misses) == (1, 1)
+
+    # Al cambiar la grid (nueva versión) se vuelve a buscar
+    world.grid[0][1] = 1
+    world.grid_version += 1
+    assert pathfinding.a_star((0, 0), (4, 2), world)[1] == (0, 1)
+    assert world.path_cache.misses == 2
+
+    # Tamaño acotado: la entrada menos usada sale primero
+    pathfinding.a_star((0, 0), (1, 1), world)
+    assert len(world.path_cache.entries) == 2
+    assert ((0, 0), (4, 2), 0) not in world.path_cache.entries
+
+
+def test_a_star_camino_simple():
+    world = FakeWorld([[0] * 5 for _ in range(3)])
+    path = pathfinding.a_star((0, 0), (4, 2), world)
+    assert path[0] == (0, 0)
+    assert path[-1] == (4, 2)
+    assert len(path) == 7
+
+
+def test_a_star_sin_camino():
+    grid = [[0, 1, 0],
+            [0, 1, 0],
+            [0, 1, 0]]
+    assert pathfinding.a_star((0, 0), (2, 2), FakeWorld(grid)) is None
+
+
+def test_a_star_identico_a_la_version_basica():
+    rng = random.Random(1234)
+    for _ in range(150):
+        world = random_world(rng, tree_ratio=rng.choice((0.05, 0.2, 0.35)))
+        for _ in range(4):
+            start = (rng.randrange(world.width), rng.randrange(world.height))
+            goal = (rng.randrange(world.width), rng.randrange(world.height))
+            assert pathfinding.a_star(start, goal, world) == pathfinding.a_star_basic(start, goal, world)
+
+
+def test_distance_field_da_caminos_de_largo_optimo():
+    rng = random.Random(99)
+    for _ in range(40):
+        world = random_world(rng, tree_ratio=0.25)
+        goal = (1, 10)
+        world.grid[goal[1]][goal[0]] = 0
+        field = pathfinding.DistanceField(goal, world.grid)
+        for _ in range(10):
+            start = (rng.randrange(world.width), rng.randrange(world.height))
+            if world.grid[start[1]][start[0]] == 1:
+                continue
+            expected = pathfinding.a_star(start, goal, world)
+            path = field.path_from(start)
+            if expected is None:
+                assert path is None
+                continue
+            assert len(path) == len(expected)
+            assert path[0] == start and path[-1] == goal
+            for (ax, ay), (bx, by) in zip(path, path[1:]):
+                assert abs(ax - bx) + abs(ay - by) == 1
+                assert world.is_walkable(bx, by)
+
+
+def test_jps_mismo_largo_que_a_star():
+    rng = random.Random(7)
+    for _ in range(300):
+        width, height = rng.choice(((40, 21), (8, 6), (15, 30)))
+        world = random_world(rng, width, height, tree_ratio=rng.choice((0.0, 0.05, 0.2, 0.35)))
+        for _ in range(4):
+            start = (rng.randrange(width), rng.randrange(height))
+            goal = (rng.randrange(width), rng.randrange(height))
+            expected = pathfinding.a_star(start, goal, world)
+            path = pathfinding.a_star(start, goal, world, method="jps")
+            if expected is None:
+                assert path is None
+                continue
+            assert len(path) == len(expected)
+            assert path[0] == start and path[-1] == goal
+            for (ax, ay), (bx, by) in zip(path, path[1:]):
+                assert abs(ax - bx) + abs(ay - by) == 1
+                assert world.is_walkable(bx, by)
+
+
+def test_hpa_encuentra_caminos_validos():
+    rng = random.Random(11)
+    for _ in range(60):
+        width, height = rng.choice(((40, 21), (64, 48), (7, 5)))
+        world = random_world(rng, width, height, tree_ratio=rng.choice((0.0, 0.1, 0.25)))
+        for _ in range(5):
+            start = (rng.randrange(width), rng.randrange(height))
+            goal = (rng.randrange(width), rng.randrange(height))
+            if world.grid[start[1]][start[0]] == 1:
+                continue
+            expected = pathfinding.a_star(start, goal, world)
+            path = pathfinding.a_star(start, goal, world, method="hpa")
+            if expected is None:
+                assert path is None
+                continue
+            # HPA* es casi óptimo: nunca más corto que A*
+            assert len(path) >= len(expected)
+            assert path[0] == start and path[-1] == goal
+            for (ax, ay), (bx, by) in zip(path, path[1:]):
+                assert abs(ax - bx) + abs(ay - by) == 1
+                assert world.is_walkable(bx, by)
+
+
+def test_hpa_inicio_en_una_entrada():
+    # En una grid abierta de 19x2 (clusters de 10) las celdas de las columnas
+    # 9 y 10 son entradas: el camino tiene que poder cruzar desde el inicio
+    world = FakeWorld([[0] * 19 for _ in range(2)])
+    hmap = pathfinding.HierarchicalMap(world.grid)
+    path = hmap.find_path((10, 1), (9, 0))
+    assert path is not None
+    assert len(path) == len(pathfinding.a_star((10, 1), (9, 0), world))
+    # Todas las entradas como inicio, con metas en ambos clusters
+    for start in [(9, 0), (9, 1), (10, 0), (10, 1)]:
+        for goal in [(0, 0), (18, 1), (9, 1), (10, 0)]:
+            path = hmap.find_path(start, goal)
+            assert path is not None and path[0] == start and path[-1] == goal
+
+
+def test_hpa_inicio_igual_a_la_meta():
+    world = FakeWorld([[0, 1, 0], [0, 0, 0]])
+    hmap = pathfinding.HierarchicalMap(world.grid)
+    # Aunque la celda sea un árbol, como a_star_basic devuelve [inicio]
+    for cell in [(1, 0), (0, 0)]:
+        assert hmap.find_path(cell, cell) == [cell]
+        assert hmap.find_path(cell, cell) == pathfinding.a_star_basic(cell, cell, world)
+
+
+def test_hpa_actualiza_solo_clusters_afectados():
+    rng = random.Random(5)
+    world = random_world(rng, 60, 40, tree_ratio=0.3)
+    hmap = pathfinding.HierarchicalMap(world.grid, cluster_size=10)
+
+    # "Explosión" en el centro de un cluster: se limpian sus árboles
+    changed = []
+    for gy in range(13, 17):
+        for gx in range(23, 27):
+            world.grid[gy][gx] = 0
+            changed.append((gx, gy, 0))
+    hmap.clusters_rebuilt = 0
+    rebuilt = hmap.update_cells(changed)
+    assert 0 < rebuilt <= 5 # el cluster y, como mucho, sus 4 vecinos
+    assert hmap.clusters_rebuilt == rebuilt
+
+    # El resultado es el mismo grafo que al construirlo desde cero
+    fresh = pathfinding.HierarchicalMap(world.grid, cluster_size=10)
+    assert hmap.border_pairs == fresh.border_pairs
+    assert hmap.intra_edges == fresh.intra_edges
+    assert {n: e for n, e in hmap.inter_edges.items() if e} == \
+        {n: e for n, e in fresh.inter_edges.items() if e}
+
+    # Cambios que no alteran la caminabilidad (minas G1) no recalculan nada
+    free = [(gx, gy) for gy in range(40) for gx in range(60) if world.grid[gy][gx] != 1]
+    assert hmap.update_cells([(gx, gy, 4) for gx, gy in free[:5]]) == 0
+
+
+def test_dstar_lite_replanifica_con_celdas_bloqueadas():
+    rng = random.Random(21)
+    for t in range(60):
+        world = random_world(rng, tree_ratio=rng.choice((0.05, 0.2, 0.3)))
+        world.grid_version = t
+        goal = (rng.randrange(world.width), rng.randrange(world.height))
+        planner = pathfinding.DStarLite(goal, world)
+        current = (rng.randrange(world.width), rng.randrange(world.height))
+        for _ in range(10):
+            blocked = [(rng.randrange(world.width), rng.randrange(world.height)) for _ in range(5)]
+            blocked = [cell for cell in blocked if cell != current]
+            path = planner.plan(current, world, blocked)
+
+            # Referencia: A* sobre la grid con las celdas bloqueadas como árboles
+            grid = [row[:] for row in world.grid]
+            for gx, gy in blocked:
+                grid[gy][gx] = 1
+            expected = pathfinding.a_star(current, goal, FakeWorld(grid))
+            if expected is None:
+                assert path is None
+                continue
+            assert len(path) == len(expected)
+            assert path[0] == current and path[-1] == goal
+            assert not set(path[1:]) & set(blocked)
+            if len(path) > 2:
+                current = path[2] # El vehículo avanza un par de celdas
+
+
+def test_dstar_lite_reutiliza_la_busqueda_anterior():
+    rng = random.Random(3)
+    incremental = fresh = 0
+    for t in range(30):
+        world = random_world(rng, tree_ratio=0.25)
+        world.grid_version = t
+        start, goal = (0, 10), (39, 10)
+        world.grid[10][0] = world.grid[10][39] = 0
+        planner = pathfinding.DStarLite(goal, world)
+        path = planner.plan(start, world)
+        if path is None or len(path) < 3:
+            continue
+
+        # Un aliado bloquea la celda siguiente
+        before = planner.expanded
+        planner.plan(start, world, [path[1]])
+        incremental += planner.expanded - before
+
+        other = pathfinding.DStarLite(goal, world)
+        other.plan(start, world, [path[1]])
+        fresh += other.expanded
+    assert incremental < fresh // 2
+
+
+def test_a_star_safe_rodea_las_areas_de_minas():
+    world = FakeWorld([[0] * 7 for _ in range(5)])
+    world.danger = [0] * 35
+    for gy in range(4): # Una franja peligrosa que deja libre solo la fila de abajo
+        world.danger[gy * 7 + 3] = 1
+    path = pathfinding.a_star((0, 0), (6, 0), world, method="safe")
+    assert path[0] == (0, 0) and path[-1] == (6, 0)
+    assert (3, 4) in path
+    assert not any(world.danger[gy * 7 + gx] for gx, gy in path)
+
+    # Si no hay alternativa, se cruza igual
+    world.danger[4 * 7 + 3] = 1
+    assert len(pathfinding.a_star((0, 0), (6, 0), world, method="safe")) == 7
+
+
+def test_plan_paths_deduplica_y_agrupa_por_inicio():
+    from concurrent.futures import ThreadPoolExecutor
+
+    rng = random.Random(8)
+    world = random_world(rng, tree_ratio=0.2)
+    world.grid_version = 0
+    world.path_cache = pathfinding.PathCache()
+    starts = [(0, 0), (5, 5), (0, 0)]
+    requests = [(rng.choice(starts), (rng.randrange(world.width), rng.randrange(world.height)))
+                for _ in range(30)]
+    requests += requests[:5] # Pedidos repetidos
+
+    paths = pathfinding.plan_paths(requests, world)
+    for start, goal in requests:
+        expected = pathfinding.a_star_basic(start, goal, world)
+        path = paths[(start, goal)]
+        if expected is None:
+            assert path is None
+            continue
+        assert len(path) == len(expected)
+        assert path[0] == start and path[-1] == goal
+
+    # Ahora todo sale del caché, y el reparto en paralelo da lo mismo
+    hits = world.path_cache.hits
+    assert pathfinding.plan_paths(requests, world) == paths
+    assert world.path_cache.hits > hits
+    world.path_cache.clear()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert pathfinding.plan_paths(requests, world, executor=executor) == paths
+
+
+def test_plan_paths_inicio_fuera_de_la_grid_con_executor():
+    from concurrent.futures import ThreadPoolExecutor
+
+    world = FakeWorld([[0] * 6 for _ in range(4)])
+    requests = [((-1, 0), (3, 0)), ((-1, 0), (5, 3)), ((0, 0), (5, 3)), ((2, 2), (0, 3))]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        paths = pathfinding.plan_paths(requests, world, executor=executor)
+    assert paths == pathfinding.plan_paths(requests, world)
+    assert paths[((-1, 0), (3, 0))] == [(-1, 0), (0, 0), (1, 0), (2, 0), (3, 0)]
+    assert len(paths[((0, 0), (5, 3))]) == 9
+
+
+def test_multi_meta_solo_con_metas_lejanas_y_numerosas():
+    start = (50, 50)
+    # Pocas metas cercanas: conviene un A* por meta
+    assert not pathfinding._prefer_multi_goal(start, [(52, 50), (50, 53)])
+    assert not pathfinding._prefer_multi_goal(start, [(90, 90), (51, 50)])
+    # Muchas metas repartidas alrededor: una sola búsqueda
+    ring = [(50 + dx, 50 + dy) for dx in (-20, -10, 0, 10, 20)
+            for dy in (-20, -10, 0, 10, 20) if dx or dy]
+    assert pathfinding._prefer_multi_goal(start, ring)
+
+
+def test_bidireccional_mismo_largo_que_a_star():
+    rng = random.Random(17)
+    for _ in range(300):
+        width, height = rng.choice(((40, 21), (8, 6), (15, 30)))
+        world = random_world(rng, width, height, tree_ratio=rng.choice((0.0, 0.1, 0.25, 0.35)))
+        for _ in range(4):
+            start = (rng.randrange(width), rng.randrange(height))
+            goal = (rng.randrange(width), rng.randrange(height))
+            expected = pathfinding.a_star(start, goal, world)
+            path = pathfinding.a_star(start, goal, world, method="bidir")
+            if expected is None:
+                assert path is None
+                continue
+            assert len(path) == len(expected)
+            assert path[0] == start and path[-1] == goal
+            for (ax, ay), (bx, by) in zip(path, path[1:]):
+                assert abs(ax - bx) + abs(ay - by) == 1
+                assert world.is_walkable(bx, by)
+
+
+def test_bidireccional_expande_menos_de_base_a_base():
+    world = FakeWorld([[0] * 40 for _ in range(21)])
+    for gy in range(5, 16): # Unos árboles en el medio del mapa
+        world.grid[gy][20] = 1
+    engine = pathfinding.get_pathfinder(40, 21)
+    walkable = engine.walkable_flags(world.grid)
+    engine.search((1, 10), (38, 10), walkable)
+    single = engine.expanded
+    engine.search_bidirectional((1, 10), (38, 10), walkable)
+    assert engine.expanded < single
@@ -0,0 +1,43 @@
+from src import pathfinding
+from src.reservations import ReservationTable
+
+
+class FakeVehicle:
+    def __init__(self):
+        self.alive = True
+
+
+def test_reservas_y_liberacion():
+    table = ReservationTable(step_frames=20, window=4)
+    a, b = FakeVehicle(), FakeVehicle()
+    table.reserve_route(a, [(0, 0), (1, 0), (2, 0)], slot=10)
+
+    assert not table.is_free((0, 0), 10, b) and not table.is_free((0, 0), 11, b)
+    assert not table.is_free((1, 0), 11, b)
+    assert table.is_free((1, 0), 10, a) # Las propias no bloquean
+    assert not table.is_free((2, 0), 13, b) # La última celda hasta el fin de la ventana
+    assert table.is_free((2, 0), 14, b)
+
+    # Reservar otra ruta reemplaza la anterior
+    table.reserve_route(a, [(0, 0)], slot=12)
+    assert table.is_free((1, 0), 11, b)
+
+    # Un vehículo destruido no bloquea a nadie
+    a.alive = False
+    assert table.is_free((0, 0), 12, b)
+
+
+def test_plan_window_espera_o_esquiva_al_aliado():
+    grid = [[0] * 6 for _ in range(3)]
+    field = pathfinding.DistanceField((5, 1), grid)
+    table = ReservationTable(step_frames=20, window=6)
+    ally, me = FakeVehicle(), FakeVehicle()
+
+    # El aliado cruza por delante de nosotros en la fila central
+    table.reserve_route(ally, [(2, 0), (2, 1), (2, 2)], slot=0)
+    route = table.plan_window(me, (0, 1), (5, 1), 0, field)
+    assert table.route_conflicts(me, [(0, 1), (1, 1), (2, 1), (3, 1), (4, 1), (5, 1)], 0)
+    assert route[0] == (0, 1) and route[-1] == (5, 1)
+    assert not table.route_conflicts(me, route, 0)
+    for (ax, ay), (bx, by) in zip(route, route[1:]):
+        assert abs(ax - bx) + abs(ay - by) <= 1
@@ -0,0 +1,44 @@
+import random
+
+from src.spatial_index import SpatialIndex
+
+
+def test_mas_cercanos_y_radio_igual_que_fuerza_bruta():
+    rng = random.Random(31)
+    index = SpatialIndex(40, 21, bucket_size=5)
+    items = {}
+    for i in range(120):
+        cell = (rng.randrange(40), rng.randrange(21))
+        kind = rng.choice(("a", "b", "c"))
+        items[i] = (cell, kind)
+        index.insert(i, cell, kind)
+    for i in range(0, 120, 4): # Algunos se van y otros se mueven
+        index.remove(i)
+        del items[i]
+    for i in range(1, 120, 8):
+        cell = (rng.randrange(40), rng.randrange(21))
+        items[i] = (cell, items[i][1])
+        index.move(i, cell, items[i][1])
+    assert len(index) == len(items)
+
+    def dist(a, b):
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    for _ in range(200):
+        query = (rng.randrange(40), rng.randrange(21))
+        kinds = rng.choice((None, ["a"], ["b", "c"]))
+        matching = [(dist(query, cell), i) for i, (cell, kind) in items.items()
+                    if kinds is None or kind in kinds]
+
+        found = index.nearest(query, kinds, k=5)
+        assert [d for d, _ in found] == sorted(d for d, _ in matching)[:5]
+        for d, i in found:
+            assert d == dist(query, items[i][0])
+
+        radius = rng.randrange(8)
+        within = index.within(query, radius, kinds)
+        assert sorted(i for _, i in within) == sorted(i for d, i in matching if d <= radius)
+
+    # Filtro adicional
+    odd = index.nearest((0, 0), where=lambda i: i % 2 == 1, k=len(items))
+    assert sorted(i for _, i in odd) == sorted(i for i in items if i % 2 == 1)
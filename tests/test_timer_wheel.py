@@ -0,0 +1,44 @@
+from src import constants
+from src.effects import FIRE_LIFETIME
+from src.simulation import Simulation
+from src.timer_wheel import TimerWheel
+
+
+def test_rueda_de_temporizadores():
+    wheel = TimerWheel(num_slots=4)
+    wheel.schedule("a", 2)
+    wheel.schedule("b", 6) # Más de una vuelta
+    wheel.schedule("c", 2)
+    wheel.cancel("c")
+    wheel.schedule("d", 1)
+    wheel.schedule("d", 3) # Re-anotar reemplaza el vencimiento
+    fired = [wheel.advance() for _ in range(7)]
+    assert fired == [[], ["a"], ["d"], [], [], ["b"], []]
+    assert len(wheel) == 0
+
+
+def test_minas_g1_y_efectos_por_calendario():
+    sim = Simulation(seed=5)
+    sim.initialize_map()
+    world = sim.world
+    g1 = [m for m in world.mines if m.type == "G1"]
+    assert g1 and all(m in world.timers for m in g1)
+    assert not any(m in world.timers for m in world.mines if m.type != "G1")
+
+    world.effects.add_fires([(0, 0)], world.timers.now + FIRE_LIFETIME)
+    for _ in range(44):
+        world.advance_timers()
+    assert world.effects.fire_count == 1
+    world.advance_timers()
+    assert world.effects.fire_count == 0
+
+    for _ in range(constants.G1_TOGGLE_TIME - 46):
+        assert not world.advance_timers()
+    state = world.get_state()
+    assert {m["toggle_timer"] for m in state["mines"] if m["type"] == "G1"} == {constants.G1_TOGGLE_TIME - 1}
+    assert world.advance_timers()
+    assert all(not m.active for m in g1)
+
+    # Las minas quitadas de la lista dejan de tener temporizador
+    world.prune_inactive_mines()
+    assert not any(m in world.timers for m in g1)
@@ -0,0 +1,249 @@
+import numpy as np
+
+from src import constants
+from src.elements import Mine
+from src.simulation import Simulation
+
+
+def test_capa_de_peligro_sigue_a_las_minas():
+    sim = Simulation(seed=5)
+    sim.initialize_map()
+    world = sim.world
+
+    def expected():
+        danger = [0] * len(world.danger)
+        for mine in world.mines:
+            if mine.active:
+                for gx, gy in world.mine_footprint(mine):
+                    danger[gy * constants.GRID_WIDTH + gx] += 1
+        return danger
+
+    def check():
+        danger = expected()
+        assert world.danger == danger
+        width = constants.GRID_WIDTH
+        assert world.danger_cells() == {(i % width, i // width) for i, d in enumerate(danger) if d}
+
+    check()
+
+    # Las G1 se apagan y se encienden
+    for _ in range(constants.G1_TOGGLE_TIME):
+        world.advance_timers()
+    assert any(m.type == "G1" and not m.active for m in world.mines)
+    check()
+
+    world.relocate_g1_mines()
+    check()
+
+    mine = next(m for m in world.mines if m.active)
+    world.deactivate_mine(mine)
+    check()
+
+
+def test_huella_de_minas_segun_su_forma():
+    sim = Simulation(seed=6)
+    world = sim.world
+    cx, cy = world.cell_to_pixel_center(20, 10)
+    horizontal = world.mine_footprint(Mine(cx, cy, "T1"))
+    vertical = world.mine_footprint(Mine(cx, cy, "T2"))
+    circular = world.mine_footprint(Mine(cx, cy, "O2"))
+    assert {gy for _, gy in horizontal} == {10} and len(horizontal) == 11
+    assert {gx for gx, _ in vertical} == {20} and len(vertical) == 5
+    assert (22, 10) in circular and (21, 11) in circular and (22, 11) not in circular
+
+
+def test_grid_numpy_operaciones_en_bloque():
+    sim = Simulation(seed=9)
+    sim.initialize_map()
+    world = sim.world
+    assert world.grid.dtype == np.uint8
+    assert world.grid.shape == (constants.GRID_HEIGHT, constants.GRID_WIDTH)
+    assert world.grid[10][1] == world.grid[10, 1] # Acceso compatible
+
+    trees = world.grid == 1
+    assert world.count_cells(2) == len(world.people)
+    assert world.count_cells(3) == len(world.merch)
+
+    world.stamp_cells([(0, 0), (-1, 3), (constants.GRID_WIDTH, 0)], 4) # Fuera del mapa se ignora
+    assert world.grid[0, 0] == 4
+
+    world.clear_non_tree_cells()
+    assert (world.grid == trees).all()
+    assert world.count_cells() == world.grid.size - int(trees.sum())
+
+
+def test_indice_de_recursos_por_celda():
+    sim = Simulation(seed=4)
+    sim.initialize_map()
+    world = sim.world
+    assert len(world.resource_cells) == len(world.resources)
+
+    for resource in list(world.resources)[::3]:
+        cell = world.pixel_to_cell(resource.x, resource.y)
+        assert world.resource_at(*cell) is resource
+        world.remove_resource(resource)
+        assert world.resource_at(*cell) is None and not world.has_resource(resource)
+        assert world.grid[cell[1], cell[0]] == 0
+        world.remove_resource(resource) # Quitarlo dos veces no hace nada
+
+    # Las listas y los índices siguen siendo consistentes
+    assert len(world.resources) == len(world.people) + len(world.merch)
+    assert set(world.resources) == set(world.people) | set(world.merch)
+    for resource in world.resources:
+        assert world.resource_at(*world.pixel_to_cell(resource.x, resource.y)) is resource
+    cells = [world.pixel_to_cell(r.x, r.y) for r in world.resources[:4]]
+    assert world.resources_in_cells(cells + [(0, 0)]) == world.resources[:4]
+
+
+def test_huellas_precalculadas_y_explosion_unica():
+    sim = Simulation(seed=12)
+    sim.initialize_map()
+    world = sim.world
+
+    # La tabla de offsets da lo mismo que revisar cada celda del mapa
+    for mine_type in constants.MINE_TYPES:
+        for px, py in (world.cell_to_pixel_center(20, 10), world.cell_to_pixel(1, 1)):
+            mine = Mine(px, py, mine_type)
+            expected = [(gx, gy) for gy in range(constants.GRID_HEIGHT) for gx in range(constants.GRID_WIDTH)
+                        if mine.covers(*world.cell_to_pixel_center(gx, gy))]
+            assert sorted(world.mine_footprint(mine)) == sorted(expected)
+
+    # Índice celda -> mina activa
+    mine = next(m for m in world.mines if m.active)
+    cell = world.pixel_to_cell(mine.x, mine.y)
+    assert mine in world.active_mines_at(*cell)
+
+    # Un vehículo en el área muere con la explosión
+    victim = next(v for v in world.vehicles if v.alive)
+    victim.gx, victim.gy = world.mine_footprint(mine)[0]
+    world.track_vehicle(victim)
+    assert mine.explode(world) == [victim] and not victim.alive
+    assert mine not in world.active_mines_at(*cell) and not mine.active
+    assert not any(world.resource_at(*c) for c in world.mine_footprint(mine))
+
+
+def test_celdas_libres_siguen_a_la_grid():
+    sim = Simulation(seed=21)
+    sim.initialize_map()
+    world = sim.world
+
+    def expected():
+        return {(gx, gy) for gy in range(constants.GRID_HEIGHT) for gx in range(constants.GRID_WIDTH)
+                if world.grid[gy, gx] == 0 and not world.is_in_base_area(gx, gy)}
+
+    assert set(world.free_cells.cells) == expected()
+    for _ in range(3):
+        world.relocate_g1_mines()
+    world.remove_resource(world.resources[0])
+    world.explode_mine(next(m for m in world.mines if m.active))
+    assert set(world.free_cells.cells) == expected()
+
+    # Muestreo sin rechazo: funciona aunque quede una sola celda libre
+    last = world.free_cells.cells[0]
+    for cell in list(world.free_cells.cells):
+        if cell != last:
+            world.set_cell(*cell, 1)
+    assert world.random_free_cell() == last
+    world.set_cell(*last, 3)
+    assert world.random_free_cell() is None
+
+
+def test_mapa_configurable_independiente_de_la_ventana():
+    options = {"grid_width": 90, "grid_height": 60, "num_trees": 300, "num_people": 40,
+               "merch_counts": {"food": 100, "weapons": 20}, "mines_count": {"O2": 5, "T1": 5}}
+    sim = Simulation(seed=8, world_options=options)
+    sim.initialize_map()
+    world = sim.world
+    assert world.grid.shape == (60, 90)
+    assert (world.width, world.height) == (90 * constants.TILE, 60 * constants.TILE)
+    assert len(world.trees) == 300 and len(world.mines) == 10
+    assert len(world.resources) == world.total_resources == 160
+    assert world.count_cells(2) == 40 and world.count_cells(3) == 120
+    assert len(world.danger) == 90 * 60
+
+    # La base 2 queda del otro lado del mapa grande y la partida avanza
+    assert sim.player2_vehicles[0].base_gx > 80
+    sim.step(200)
+
+
+def test_journal_de_grid_y_cachés_incrementales():
+    from src import pathfinding
+    from src.grid_journal import GridJournal
+
+    journal = GridJournal(maxlen=2)
+    for i in range(3):
+        journal.record((i, 0), 0, 2)
+    assert journal.version == 3
+    assert journal.since(3) == [] and journal.since(2) == [((2, 0), 0, 2)]
+    assert journal.since(0) is None # Ya se descartó: hay que reconstruir
+
+    sim = Simulation(seed=12)
+    sim.initialize_map()
+    world = sim.world
+    base = world.pixel_to_cell(*world.base1_pos)
+    field = world.get_distance_field(base)
+    hmap = world.get_hierarchical_map()
+
+    # Escribir el mismo valor no cuenta como cambio
+    version = world.grid_version
+    world.stamp_cells([base], int(world.grid[base[1], base[0]]))
+    assert world.grid_version == version
+
+    # Talar árboles: el campo se actualiza en el lugar (sin reconstruirse)
+    ys, xs = np.nonzero(world.grid == 1)
+    trees = list(zip(xs.tolist(), ys.tolist()))[:40]
+    world.stamp_cells(trees, 0)
+    assert world.journal.since(version) == [(cell, 1, 0) for cell in trees]
+    assert world.get_distance_field(base) is field
+    assert field.dist == pathfinding.DistanceField(base, world.grid).dist
+    assert world.get_hierarchical_map() is hmap
+    assert hmap.walkable == pathfinding.HierarchicalMap(world.grid).walkable
+
+    # Bloquear una celda obliga a reconstruir el campo
+    world.set_cell(trees[0][0], trees[0][1], 1)
+    rebuilt = world.get_distance_field(base)
+    assert rebuilt is not field
+    assert rebuilt.dist == pathfinding.DistanceField(base, world.grid).dist
+
+
+def test_entidades_compactas_con_celda_y_codigo():
+    sim = Simulation(seed=13)
+    sim.initialize_map()
+    world = sim.world
+    for entity in world.resources + world.mines + world.trees + world.vehicles:
+        assert not hasattr(entity, "__dict__")
+    for r in world.resources:
+        assert (r.gx, r.gy) == world.pixel_to_cell(r.x, r.y)
+        assert constants.RESOURCE_TYPES[r.type_code] == r.type
+
+    world.relocate_g1_mines()
+    for mine in world.mines:
+        assert (mine.gx, mine.gy) == world.pixel_to_cell(mine.x, mine.y)
+
+    moto = next(v for v in world.vehicles if v.vehicle_type == "moto")
+    merch = world.merch[0]
+    moto.collect(merch, world) # Una moto solo lleva personas
+    assert world.has_resource(merch) and not moto.cargo
+
+
+def test_hud_sin_recursos_y_flota_reducida():
+    import pygame
+    from src.world import World
+    pygame.font.init()
+    world = World(constants.WIDTH, constants.HEIGHT, num_trees=0, num_people=0,
+                  merch_counts={}, mines_count={})
+    assert world.total_resources == 0
+    sim = Simulation(seed=2)
+    sim.initialize_map()
+    screen = pygame.Surface((constants.WIDTH, constants.HEIGHT))
+    # Sin recursos ni vehículos, y con flotas de distinto tamaño
+    world.draw_premium_hud(screen, [], [], 0)
+    for v in sim.player2_vehicles[:6]:
+        v.alive = False
+    world.draw_premium_hud(screen, sim.player1_vehicles[:3], sim.player2_vehicles, 120)
+
+    # Barras de vivos (y = 102): 3/3 vivos es verde aunque sean menos de 6,
+    # y 4/10 es rojo
+    bar_y = 106
+    assert screen.get_at((40, bar_y))[:3] == (100, 255, 100)
+    assert screen.get_at((constants.WIDTH - 200 + 30, bar_y))[:3] == (255, 100, 100)